@@ -412,6 +412,8 @@ export interface SoloAnalyticsOverview {
   total_chats: number;
   total_sessions: number;
   avg_response_time_ms: number;
+  avg_time_to_first_token_ms: number;
+  avg_tokens_per_second: number;
   recent_chats_30d: number;
   engagement_rate: number;
 }
@@ -437,6 +439,7 @@ export interface TrendDataPoint {
   date: string;
   chats: number;
   avg_response_time: number;
+  avg_time_to_first_token: number;
 }
 
 export interface SoloAnalyticsTrends {
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import (
-    User, Associate, BlogCategory, BlogPost, AIConversation,
+    User, Associate, BlogCategory, BlogPost, AIConversation, ChatMessage,
     ContactSubmission, Grant, ConsultationService, ConsultationBooking
 )
 
@@ -90,19 +90,19 @@ class BlogPostAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('AI Features', {
-            'fields': ('ai_overview',),
+            'fields': ('ai_overview', 'ai_overview_status', 'ai_overview_attempts', 'ai_overview_error'),
             'classes': ('collapse',)
         }),
         ('Status & Priority', {
             'fields': ('is_published', 'is_featured', 'order_priority', 'publish_date')
         }),
         ('Statistics', {
-            'fields': ('view_count',),
+            'fields': ('view_count', 'word_count', 'read_time'),
             'classes': ('collapse',)
         }),
     )
 
-    readonly_fields = ['view_count']
+    readonly_fields = ['view_count', 'word_count', 'read_time', 'ai_overview_attempts', 'ai_overview_error']
 
     def save_model(self, request, obj, form, change):
         if not change:  # If creating new blog post
@@ -110,6 +110,18 @@ class BlogPostAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+class ChatMessageInline(admin.TabularInline):
+    model = ChatMessage
+    fields = ['seq', 'role', 'content', 'created_at']
+    readonly_fields = fields
+    ordering = ['seq']
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(AIConversation)
 class AIConversationAdmin(admin.ModelAdmin):
     """
@@ -117,12 +129,9 @@ class AIConversationAdmin(admin.ModelAdmin):
     """
     list_display = ['session_id', 'message_count', 'created_at', 'updated_at']
     search_fields = ['session_id']
-    readonly_fields = ['session_id', 'messages', 'created_at', 'updated_at']
+    readonly_fields = ['session_id', 'message_count', 'created_at', 'updated_at']
     ordering = ['-updated_at']
-
-    def message_count(self, obj):
-        return len(obj.messages) if isinstance(obj.messages, list) else 0
-    message_count.short_description = 'Messages'
+    inlines = [ChatMessageInline]
 
     def has_add_permission(self, request):
         return False
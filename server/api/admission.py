@@ -0,0 +1,357 @@
+"""
+Admission control for the AI endpoints
+
+Every request that would call the LLM passes two gates:
+
+1. Token buckets (per client IP, and per chat session where there is one),
+   kept in the configured cache. Workers only share a budget when they share
+   the cache backend (redis); with the default locmem each worker process has
+   its own buckets, so N workers allow N times the configured rate, and the
+   api.W001 system check warns about it. A request that finds its bucket
+   empty gets 429 with a Retry-After header telling it when the next token
+   is due. Staff are not rate limited.
+
+2. Concurrency limits, per process. Each endpoint has its own cap on
+   in-flight generations (AI_CONCURRENCY), and all of them share the
+   upstream pool (AI_UPSTREAM_CONCURRENCY). A request that can't start
+   immediately waits in a bounded queue for up to AI_QUEUE_TIMEOUT seconds;
+   if the queue is full or the wait runs out it gets 429. Waiters are served
+   by priority, so staff blog-assistant requests go ahead of anonymous
+   chat when the upstream pool is contended.
+
+Buckets are a non-atomic get/set on the cache without a lock, so two
+requests (threads or workers) racing on one bucket can both take the same
+token and let an extra request through; that is acceptable for abuse
+protection and avoids extra cache round trips per token.
+"""
+
+import asyncio
+import functools
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .response_cache import is_staff_viewer
+
+STAFF_PRIORITY = 0
+ANONYMOUS_PRIORITY = 1
+
+DEFAULT_CONCURRENCY = {'solo_chat': 8, 'blog_assistant': 4, 'ai_overview': 2}
+DEFAULT_RATE_LIMITS = {
+    # endpoint: {scope: (tokens per minute, burst)}
+    'solo_chat': {'ip': (20, 10), 'session': (10, 5)},
+    'ai_overview': {'ip': (10, 5)},
+    'blog_assistant': {'ip': (30, 10)},
+}
+
+
+class AdmissionRejected(Exception):
+    """
+    A request was refused; `retry_after` is in whole seconds
+    """
+
+    def __init__(self, reason, retry_after):
+        self.reason = reason
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+        super().__init__(reason)
+
+
+def client_ip(request):
+    """
+    Address of the client as seen by the nearest trusted proxy
+
+    Proxies append to X-Forwarded-For, so only the rightmost AI_TRUSTED_PROXIES
+    entries were written by infrastructure; anything to their left is whatever
+    the client sent. With no trusted proxies (or no header) REMOTE_ADDR is used.
+    """
+    hops = getattr(settings, 'AI_TRUSTED_PROXIES', 1)
+    forwarded = [
+        entry.strip() for entry in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if entry.strip()
+    ]
+    if hops and forwarded:
+        return forwarded[-min(hops, len(forwarded))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+# ==================== Token Buckets ====================
+
+def take_token(key, per_minute, burst, now=None):
+    """
+    Take one token from a cache-backed bucket
+
+    Returns:
+        float: 0 if a token was taken, otherwise seconds until one is available
+    """
+    now = time.time() if now is None else now
+    rate = per_minute / 60.0
+    tokens, updated = cache.get(key) or (burst, now)
+    tokens = min(burst, tokens + (now - updated) * rate)
+
+    if tokens >= 1:
+        # Keep the entry until the bucket would be full again
+        cache.set(key, (tokens - 1, now), timeout=int(burst / rate) + 1)
+        return 0.0
+    return (1 - tokens) / rate
+
+
+def check_rate_limits(endpoint, ip=None, session_id=None):
+    """
+    Raises:
+        AdmissionRejected: If any bucket for this request is empty
+    """
+    limits = getattr(settings, 'AI_RATE_LIMITS', DEFAULT_RATE_LIMITS).get(endpoint, {})
+    for scope, ident in (('ip', ip), ('session', session_id)):
+        if scope not in limits or not ident:
+            continue
+        per_minute, burst = limits[scope]
+        wait = take_token(f'admission:{endpoint}:{scope}:{ident}', per_minute, burst)
+        if wait:
+            raise AdmissionRejected('Too many requests, please slow down', wait)
+
+
+# ==================== Concurrency ====================
+
+class _Waiter:
+    def __init__(self, priority, seq, wake):
+        self.priority = priority
+        self.seq = seq
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ConcurrencyLimiter:
+    """
+    Counting semaphore with a bounded, priority-ordered wait queue
+
+    A released slot is handed straight to the best waiter, so a newcomer can
+    never overtake a queued request. Works from threads and event loops alike.
+    """
+
+    def __init__(self, name, limit, max_queue):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_use = 0
+        self._waiters = []
+        self._queued = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _try_acquire_or_enqueue(self, priority, wake):
+        with self._lock:
+            if self.in_use < self.limit and not self._queued:
+                self.in_use += 1
+                return None
+            if self._queued >= self.max_queue:
+                raise AdmissionRejected(f'{self.name} is busy, please try again shortly', 1)
+            waiter = _Waiter(priority, next(self._seq), wake)
+            heapq.heappush(self._waiters, waiter)
+            self._queued += 1
+            return waiter
+
+    def _give_up(self, waiter):
+        """Leave the queue after a timeout. Returns True if the slot arrived meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            self._queued -= 1
+            return False
+
+    def acquire(self, priority=ANONYMOUS_PRIORITY, timeout=None):
+        """
+        Raises:
+            AdmissionRejected: Queue full, or no slot within `timeout` seconds
+        """
+        event = threading.Event()
+        waiter = self._try_acquire_or_enqueue(priority, event.set)
+        if waiter is None:
+            return
+        timeout = queue_timeout() if timeout is None else timeout
+        if not event.wait(timeout) and not self._give_up(waiter):
+            raise AdmissionRejected(f'{self.name} is busy, please try again shortly', timeout or 1)
+
+    async def aacquire(self, priority=ANONYMOUS_PRIORITY, timeout=None):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._try_acquire_or_enqueue(priority, wake)
+        if waiter is None:
+            return
+        timeout = queue_timeout() if timeout is None else timeout
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            if not self._give_up(waiter):
+                raise AdmissionRejected(f'{self.name} is busy, please try again shortly', timeout or 1)
+        except asyncio.CancelledError:
+            # The client went away while queued; don't strand a slot handed over meanwhile
+            if self._give_up(waiter):
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = heapq.heappop(self._waiters)
+                if waiter.cancelled:
+                    continue
+                # Hand the slot over; in_use stays the same
+                waiter.granted = True
+                self._queued -= 1
+                waiter.wake()
+                return
+            self.in_use -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'limit': self.limit, 'in_use': self.in_use, 'queued': self._queued}
+
+
+def queue_timeout():
+    return getattr(settings, 'AI_QUEUE_TIMEOUT', 5)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name):
+    """
+    Process-wide limiter for an endpoint, or 'upstream' for the shared pool
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            if name == 'upstream':
+                limit = getattr(settings, 'AI_UPSTREAM_CONCURRENCY', 10)
+            else:
+                limit = getattr(settings, 'AI_CONCURRENCY', DEFAULT_CONCURRENCY).get(name, 4)
+            _limiters[name] = ConcurrencyLimiter(name, limit, getattr(settings, 'AI_QUEUE_SIZE', 16))
+        return _limiters[name]
+
+
+def limiter_snapshots():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
+
+
+def reset_limiters():
+    with _limiters_lock:
+        _limiters.clear()
+
+
+class Admission:
+    """
+    Slots held in the endpoint limiter and the upstream pool; release() is idempotent
+    """
+
+    def __init__(self, endpoint):
+        self.limiters = [get_limiter(endpoint), get_limiter('upstream')]
+        self.held = []
+        self._lock = threading.Lock()
+
+    def release(self):
+        # The stream's finally and the response's close() can race; only one gets the slots
+        with self._lock:
+            held, self.held = self.held, []
+        for limiter in reversed(held):
+            limiter.release()
+
+
+def admit(endpoint, priority=ANONYMOUS_PRIORITY):
+    admission = Admission(endpoint)
+    deadline = time.monotonic() + queue_timeout()
+    try:
+        for limiter in admission.limiters:
+            limiter.acquire(priority, timeout=max(0.0, deadline - time.monotonic()))
+            admission.held.append(limiter)
+    except AdmissionRejected:
+        admission.release()
+        raise
+    return admission
+
+
+async def aadmit(endpoint, priority=ANONYMOUS_PRIORITY):
+    admission = Admission(endpoint)
+    deadline = time.monotonic() + queue_timeout()
+    try:
+        for limiter in admission.limiters:
+            await limiter.aacquire(priority, timeout=max(0.0, deadline - time.monotonic()))
+            admission.held.append(limiter)
+    except BaseException:
+        admission.release()
+        raise
+    return admission
+
+
+class AdmittedStream:
+    """
+    Streaming content that gives its slots back when the response is closed,
+    even if the client disconnected before the stream was started
+    """
+
+    def __init__(self, iterable, admission):
+        self.iterable = iterable
+        self.admission = admission
+
+    def __aiter__(self):
+        return self.iterable.__aiter__()
+
+    def close(self):
+        self.admission.release()
+
+
+# ==================== Views ====================
+
+def rejected_response(error):
+    response = Response({'error': error.reason}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def admit_request(request, endpoint):
+    """
+    Rate limit a DRF request by IP (staff exempt), then take its slots
+
+    Raises:
+        AdmissionRejected: Over budget or no capacity
+    """
+    staff = is_staff_viewer(request)
+    if not staff:
+        check_rate_limits(endpoint, ip=client_ip(request))
+    return admit(endpoint, STAFF_PRIORITY if staff else ANONYMOUS_PRIORITY)
+
+
+def admission_control(endpoint):
+    """
+    Decorator for DRF AI views: admit_request() before the view, slots
+    released when it returns
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            try:
+                admission = admit_request(request, endpoint)
+            except AdmissionRejected as e:
+                return rejected_response(e)
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                admission.release()
+        return wrapper
+    return decorator
@@ -3,12 +3,98 @@ AI Service for LightField Legal Practitioners
 Uses Google Gemini via OpenAI SDK compatibility
 """
 
-from openai import OpenAI
 import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db.models import Q
+from django.db import close_old_connections
+import hashlib
 import re
 
+from .answer_cache import (
+    answer_cache_enabled, answer_cache_key, cache_answer, get_cached_answer, replay_answer,
+)
+from .keyword_matcher import KeywordMatcher
+from .llm_client import LLMError, LLMUnavailableError, ResilientLLMClient
+from .prompt_registry import prompts
+from .retrieval_index import get_retrieval_index, retrieval_index_ready
+from .singleflight import SingleFlight, StreamFlights, request_key
+
+logger = logging.getLogger(__name__)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+OVERVIEW_CONTENT_LIMIT = 3000
+
+# Solo context retrieval runs on these threads so a request can stop waiting for it at
+# SOLO_RETRIEVAL_TIMEOUT; the provider connection is warmed on its own thread meanwhile
+_retrieval_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='solo-retrieval')
+
+
+def retrieval_timeout():
+    return getattr(settings, 'SOLO_RETRIEVAL_TIMEOUT', 1.5)
+
+
+# Practice areas Solo recognises in a question, and the keywords that signal them
+PRACTICE_AREA_KEYWORDS = {
+    'artificial intelligence': ['ai', 'artificial intelligence', 'machine learning', 'neural network', 'algorithm'],
+    'blockchain': ['blockchain', 'cryptocurrency', 'bitcoin', 'ethereum', 'crypto', 'defi', 'nft', 'web3', 'smart contract'],
+    'intellectual property': ['ip', 'intellectual property', 'patent', 'trademark', 'copyright', 'trade secret'],
+    'regulatory compliance': ['compliance', 'regulation', 'regulatory', 'sec', 'finra', 'gdpr'],
+    'corporate law': ['corporate', 'company', 'startup', 'm&a', 'merger', 'acquisition', 'fundraising'],
+    'data privacy': ['privacy', 'data protection', 'gdpr', 'ccpa', 'personal data'],
+    'property law': ['property', 'real estate', 'land', 'lease', 'tenant', 'landlord'],
+    'litigation': ['litigation', 'lawsuit', 'dispute', 'court', 'trial', 'legal action'],
+    'grants and scholarships': ['grant', 'scholarship', 'award', 'fellowship', 'funding', 'bursary'],
+}
+
+# Questions about grants/scholarships get grant context
+GRANT_QUERY = 'grant query'
+GRANT_QUERY_KEYWORDS = [
+    'grant', 'scholarship', 'award', 'fellowship', 'funding', 'financial aid', 'bursary', 'sponsorship',
+    'education', 'student', 'apply', 'application', 'deadline', 'eligibility', 'opportunity',
+]
+
+SOLO_TOPIC_MATCHER = KeywordMatcher({GRANT_QUERY: GRANT_QUERY_KEYWORDS, **PRACTICE_AREA_KEYWORDS})
+
+# Blog assistant intents, checked in order; the first one with a prompt template picks it
+BLOG_INTENT_MATCHER = KeywordMatcher({
+    'blog_title': ['title', 'headline', 'heading'],
+    'blog_excerpt': ['excerpt', 'summary'],
+    'blog_meta_description': ['meta description', 'seo description'],
+    'blog_keywords': ['keyword', 'seo keyword'],
+    'blog_introduction': ['introduction', 'intro', 'opening'],
+    'blog_outline': ['outline', 'structure', 'key points', 'points to cover'],
+    # Sampling temperature hints
+    'creative': ['creative', 'headline', 'title'],
+    'seo': ['seo', 'keyword', 'meta'],
+})
+
+# Few-shot example sent with every blog assistant request
+BLOG_FEW_SHOT_MESSAGES = (
+    {"role": "user", "content": "Generate compelling excerpt"},
+    {"role": "assistant", "content": "Discover how artificial intelligence is reshaping legal compliance in 2025. From automated contract review to predictive risk analysis, AI technologies are revolutionizing how law firms serve clients. Learn the key implications, regulatory challenges, and opportunities that every business leader needs to understand in this rapidly evolving landscape."},
+)
+
+
+def normalize_overview_content(content):
+    """
+    The exact content generate_overview sends to the model:
+    HTML stripped, then truncated to avoid token limits
+    """
+    clean_content = re.sub('<[^<]+?>', '', content or '')
+    return clean_content[:OVERVIEW_CONTENT_LIMIT]
+
+
+def overview_input_hash(title, content):
+    """
+    Hash of everything that determines an overview, used to skip regenerating
+    it when an edit does not change the model input
+    """
+    normalized = f'{title or ""}\n{normalize_overview_content(content)}'
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
 
 class GeminiAIService:
     """
@@ -25,16 +111,18 @@ class GeminiAIService:
         if not api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
 
-        # Initialize OpenAI client pointing to Gemini
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-        )
+        # OpenAI-compatible client pointing to Gemini (timeouts, retries, circuit breaker)
+        self.llm = ResilientLLMClient(api_key, GEMINI_BASE_URL)
+
+        # Coalescing of identical in-flight completions and streams
+        self._completions = SingleFlight()
+        self._streams = StreamFlights()
+        self._warmups = set()
 
         # Default model
         self.model = "gemini-2.5-flash"
 
-    def generate_completion(self, messages, temperature=0.7, max_tokens=2000, model=None):
+    def generate_completion(self, messages, temperature=0.7, max_tokens=2000, model=None, operation='chat'):
         """
         Generate a completion using Gemini
 
@@ -42,22 +130,56 @@ class GeminiAIService:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
+            operation: Timeout/retry policy (see llm_client.OPERATIONS)
 
         Returns:
             str: The generated completion
+
+        Raises:
+            LLMUnavailableError: The provider is failing and calls are short-circuited
+            LLMError: The call failed after retries
         """
+        params = {
+            'model': model or self.model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+        }
         try:
-            response = self.client.chat.completions.create(
-                model=model or self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
+            # Identical concurrent requests share one upstream call
+            content, _ = self._completions.do(
+                request_key(operation=operation, **params),
+                lambda: self.llm.complete(operation, **params).choices[0].message.content,
             )
+            return content
 
-            return response.choices[0].message.content
-
+        except LLMUnavailableError:
+            raise
         except Exception as e:
-            raise Exception(f"AI generation failed: {str(e)}")
+            raise LLMError(f"AI generation failed: {str(e)}") from e
+
+    def summarize_conversation(self, previous_summary, messages):
+        """
+        Fold older chat messages into a short rolling summary
+
+        Args:
+            previous_summary: Existing summary (may be empty)
+            messages: List of {'role', 'content'} dicts to fold in, oldest first
+
+        Returns:
+            str: Updated summary
+        """
+        transcript = "\n".join(f"{m['role'].title()}: {m['content']}" for m in messages)
+
+        messages = [
+            {"role": "system", "content": prompts['conversation_summary'].text},
+            {"role": "user", "content": prompts['conversation_summary_request'].render(
+                previous_summary=previous_summary or '(none)',
+                transcript=transcript,
+            )}
+        ]
+
+        return self.generate_completion(messages, temperature=0.2, max_tokens=300, operation='summary').strip()
 
     def blog_assistant(self, prompt, context=None):
         """
@@ -70,110 +192,23 @@ class GeminiAIService:
         Returns:
             str: AI-generated suggestion with markdown formatting
         """
-        # Determine the type of request for specialized handling
-        prompt_lower = prompt.lower()
+        # Determine the type of request for specialized handling (one scan of the prompt)
+        found = BLOG_INTENT_MATCHER.find(prompt)
+        intents = BLOG_INTENT_MATCHER.labels(found=found)
 
         # Build context intelligently
         has_title = context and context.get('title')
         has_content = context and context.get('content') and len(context.get('content', '')) > 50
         has_excerpt = context and context.get('excerpt')
 
-        # Specialized system messages based on request type
-        if any(word in prompt_lower for word in ['title', 'headline', 'heading']):
-            system_message = """You are an expert SEO copywriter for LightField Legal Practitioners, a law firm specializing in AI and blockchain law.
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY the optimized title, nothing else
-- No explanations, no options, no questions
-- Be decisive and direct
-- Make it compelling and SEO-friendly
-- 50-70 characters optimal
-- Professional legal tone for emerging tech topics
-
-If you have content context, base the title on that. If not, create a compelling title about legal tech topics."""
-
-        elif any(word in prompt_lower for word in ['excerpt', 'summary']):
-            system_message = """You are a content strategist for LightField Legal Practitioners, a tech law firm.
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY the excerpt, nothing else
-- No questions, no options, no meta-commentary
-- Be decisive - just write it
-- 60-120 words optimal
-- Hook the reader immediately with value
-- Professional yet engaging tone
-- End with intrigue or subtle call-to-action
-
-If you have title/content context, summarize it. If not, create an excerpt about a relevant legal tech topic."""
-
-        elif any(word in prompt_lower for word in ['meta description', 'seo description']):
-            system_message = """You are an SEO specialist for a premium tech law firm.
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY the meta description, nothing else
-- Exactly 150-155 characters
-- No questions, no explanations
-- Include relevant keywords naturally
-- Make it compelling and action-oriented
-- Professional tone
-
-If you have context, use it. If not, create one about tech law services."""
-
-        elif any(word in prompt_lower for word in ['keyword', 'seo keyword']):
-            system_message = """You are an SEO keyword specialist for legal tech content.
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY comma-separated keywords
-- No explanations, no categories, no formatting except commas
-- 8-12 keywords total
-- Mix of short-tail and long-tail keywords
-- Include: legal terms, tech terms, industry terms
-- Relevant to blockchain, AI, or tech law
-
-Example format: blockchain law, smart contract regulation, cryptocurrency compliance, AI legal frameworks"""
-
-        elif any(word in prompt_lower for word in ['introduction', 'intro', 'opening']):
-            system_message = """You are a legal content writer for LightField Legal Practitioners.
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY the introduction paragraphs
-- No meta-commentary, just write it
-- 2-3 compelling paragraphs
-- Hook with relevant question, statistic, or insight
-- Preview what article covers
-- Professional but engaging
-- Use **bold** for key terms
-- If you have context, reference it. If not, write about a relevant tech law topic."""
-
-        elif any(word in prompt_lower for word in ['outline', 'structure', 'key points', 'points to cover']):
-            system_message = """You are a content strategist for legal blog posts.
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY the structured outline using markdown
-- No questions, no options
-- Format: ## Main Section, ### Subsection, - bullet points
-- 4-6 main sections
-- Professional legal content structure
-- Each section should have 2-4 key points
-
-If you have context, create outline based on it. If not, create outline for a tech law topic."""
-
-        else:
-            # General blog writing assistant
-            system_message = """You are Solo, an expert legal content writer for LightField Legal Practitioners, a law firm specializing in AI, blockchain, and emerging technology law.
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY the requested content
-- NO meta-commentary, NO questions, NO "here's a suggestion"
-- Be decisive and direct
-- Professional, authoritative yet accessible
-- Use markdown formatting (**bold**, lists, etc.)
-- Focus on practical insights and real-world implications
-
-If you have context, use it intelligently. If not, generate high-quality content about tech law topics."""
+        # Specialized system messages based on request type (first matching intent wins),
+        # falling back to the general blog writing assistant
+        template_name = next((intent for intent in intents if intent in prompts), 'blog_general')
 
+        # Static prefix first: the role prompt and a few-shot example to reinforce direct responses
         messages = [
-            {"role": "system", "content": system_message},
+            {"role": "system", "content": prompts[template_name].text},
+            *BLOG_FEW_SHOT_MESSAGES,
         ]
 
         # Add context if provided - be more specific about what's available
@@ -192,38 +227,31 @@ If you have context, use it intelligently. If not, generate high-quality content
                 context_parts.append(f"Content: {content_preview}")
 
             if context_parts:
-                context_message = "USE THIS CONTEXT TO GENERATE YOUR RESPONSE:\n\n" + "\n\n".join(context_parts)
-                context_message += "\n\nIMPORTANT: Generate content directly based on this context. Do NOT ask for more information."
-
                 messages.append({
                     "role": "system",
-                    "content": context_message
+                    "content": prompts['blog_context'].render(context="\n\n".join(context_parts))
                 })
             else:
                 # No meaningful context provided
                 messages.append({
                     "role": "system",
-                    "content": "No context provided. Generate high-quality content about AI law, blockchain law, or technology law topics. Be specific and professional."
+                    "content": prompts['blog_no_context'].text
                 })
 
-        # Add few-shot example to reinforce direct responses
-        messages.extend([
-            {"role": "user", "content": "Generate compelling excerpt"},
-            {"role": "assistant", "content": "Discover how artificial intelligence is reshaping legal compliance in 2025. From automated contract review to predictive risk analysis, AI technologies are revolutionizing how law firms serve clients. Learn the key implications, regulatory challenges, and opportunities that every business leader needs to understand in this rapidly evolving landscape."},
-        ])
-
         # Add user prompt
         messages.append({"role": "user", "content": prompt})
 
         # Generate with appropriate temperature based on task
-        if any(word in prompt_lower for word in ['creative', 'headline', 'title']):
+        if 'creative' in intents:
             temperature = 0.7  # Balanced creativity for titles
-        elif any(word in prompt_lower for word in ['seo', 'keyword', 'meta']):
+        elif 'seo' in intents:
             temperature = 0.4  # More focused for SEO
         else:
             temperature = 0.6  # Conservative for general content
 
-        response = self.generate_completion(messages, temperature=temperature, max_tokens=500, model="gemini-2.0-flash")
+        response = self.generate_completion(
+            messages, temperature=temperature, max_tokens=500, model="gemini-2.0-flash", operation='blog_assistant'
+        )
 
         # Aggressive post-processing to remove ALL meta-commentary
         # Remove questions
@@ -243,11 +271,11 @@ If you have context, use it intelligently. If not, generate high-quality content
         response = re.sub(r'^.*?(once I have|give me the|tell me about|what is the).*$', '', response, flags=re.MULTILINE | re.IGNORECASE)
 
         # Remove blockquote markers for inline content
-        if any(word in prompt_lower for word in ['title', 'keyword', 'meta']):
+        if found & {'title', 'keyword', 'meta'}:
             response = re.sub(r'^>\s*', '', response, flags=re.MULTILINE)
 
         # Remove asterisks for titles and keywords (keep for content)
-        if any(word in prompt_lower for word in ['title', 'keyword', 'meta description']):
+        if found & {'title', 'keyword', 'meta description'}:
             response = re.sub(r'\*', '', response)
 
         # Clean up excessive whitespace
@@ -261,13 +289,13 @@ If you have context, use it intelligently. If not, generate high-quality content
 
         # If response is still empty or has questions, provide default
         if not response or '?' in response[:50]:
-            if 'title' in prompt_lower:
+            if 'title' in found:
                 response = "Navigating AI and Blockchain Law: Expert Legal Guidance for Emerging Technologies"
-            elif 'excerpt' in prompt_lower:
+            elif 'excerpt' in found:
                 response = "Explore the intersection of law and cutting-edge technology. LightField Legal Practitioners provides specialized counsel in AI regulation, blockchain compliance, and digital asset law. Discover how expert legal guidance can protect your innovation."
-            elif 'keyword' in prompt_lower:
+            elif 'keyword' in found:
                 response = "AI law, blockchain legal services, cryptocurrency regulation, smart contract law, technology compliance, digital asset law, Web3 legal counsel, emerging tech law"
-            elif 'meta' in prompt_lower:
+            elif 'meta' in found:
                 response = "Expert legal counsel for AI, blockchain, and emerging technologies. LightField Legal Practitioners delivers specialized guidance for tech innovation."
 
         return response
@@ -283,30 +311,14 @@ If you have context, use it intelligently. If not, generate high-quality content
         Returns:
             str: AI-generated overview (2-3 sentences)
         """
-        # Strip HTML tags for better processing
-        import re
-        clean_content = re.sub('<[^<]+?>', '', content)
-
-        # Limit content length to avoid token limits
-        truncated_content = clean_content[:3000] if len(clean_content) > 3000 else clean_content
-
-        system_message = """You are an expert at creating concise, engaging summaries of legal blog posts.
-Create a 2-3 sentence overview that captures the key insights and value of the article.
-The overview should be professional, clear, and enticing for readers interested in law and technology."""
-
-        prompt = f"""Title: {title}
-
-Content:
-{truncated_content}
-
-Generate a compelling 2-3 sentence overview for this blog post."""
+        truncated_content = normalize_overview_content(content)
 
         messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": prompts['overview'].text},
+            {"role": "user", "content": prompts['overview_request'].render(title=title, content=truncated_content)}
         ]
 
-        return self.generate_completion(messages, temperature=0.7, max_tokens=200)
+        return self.generate_completion(messages, temperature=0.7, max_tokens=200, operation='overview')
 
     def solo_chat(self, user_message, conversation_history=None):
         """
@@ -319,107 +331,7 @@ Generate a compelling 2-3 sentence overview for this blog post."""
         Returns:
             str: AI assistant's response
         """
-        system_message = """You are Solo, the AI legal assistant for Lightfield Legal Practitioners (Lightfield LP).
-You are a knowledgeable, professional, and helpful assistant that answers questions about the firm, its services, and general legal concepts.
-
-=== ABOUT LIGHTFIELD LP ===
-
-Lightfield LP is a forward-thinking Nigerian law firm delivering innovative, research-grounded advisory and litigation services. The firm was established with a vision to provide tech-driven, innovative legal solutions for Africa's digital economy.
-
-**Tagline**: "Your Trusted Legal Partner in a Fast-Changing Digital World"
-
-**Founder and Managing Partner**: Balogun Sofiyullahi
-
-**Mission Statement**:
-At Lightfield LP, our mission is to deliver forward-thinking, research-driven, and technology-aligned legal solutions that empower individuals, founders, corporations, and emerging industries in the digital era. We are committed to excellence in blockchain, Web3, digital assets, technology law, data privacy, constitutional law, property law, corporate legal advisory and litigation. Through innovative strategy and deep legal insight, we simplify complex regulatory landscapes, protect rights, secure digital ecosystems, structure sound business transactions, and provide accessible, reliable, and client-centric legal services that drive sustainable growth and compliance.
-
-**Vision Statement**:
-Our vision is to become Africa's leading tech-driven and innovation-focused law firm; setting the benchmark for excellence in corporate legal advisory and shaping the future of digital regulation. We aspire to be recognized as a powerhouse of young, ambitious legal minds who redefine legal practice, influence global legal frameworks in emerging technologies, strengthen constitutional governance, and deliver transformative legal solutions that accelerate digital transformation, business sustainability, and economic progress across Africa and beyond.
-
-=== PRACTICE AREAS ===
-
-1. **Blockchain and Web3 Law**: Regulatory guidance, compliance structuring, tokenization advisory, smart contract review, digital asset transaction support, representation before regulators
-2. **Digital Assets**: Legal status of tokens, capital markets compliance, taxation implications, anti-money laundering requirements, digital asset exchange regulations, whitepaper review, compliant token model structuring
-3. **Technology and Innovation Law**: Tech regulatory compliance, product development legal support, platform terms of use, SaaS agreements, software licensing contracts
-4. **Data Privacy and Protection**: Nigeria Data Protection Act (NDPA) compliance, GDPR-aligned frameworks, cybersecurity standards, internal policy structuring, compliance audits, data breach response
-5. **Constitutional Law**: Constitutional matters, governance frameworks, regulatory challenges
-6. **Property Law**: Property disputes, real estate transactions
-7. **Corporate and Commercial Advisory**: Incorporation, fundraising, shareholder agreements, CAC and regulatory filings, corporate governance, M&A, organizational structuring
-8. **Litigation**: Technology disputes, commercial litigation, contract enforcement, regulatory challenges
-
-=== OFFICE LOCATIONS ===
-
-**Lagos Office (Head Office)**:
-Road 5, J59, Ikota Shopping Complex,
-VGC, Lekki,
-Lagos State, Nigeria.
-
-**Abuja Office**:
-Suite T7, 3rd Floor,
-Alibro Atrium Plaza,
-Utako District, FCT Abuja, Nigeria.
-
-
-=== CONTACT INFORMATION ===
-
-- Phone: +234 814 876 7744
-- Phone: +234 703 267 6039
-- Email: lightfieldlegalpractitioners@gmail.com
-
-=== KEY DIFFERENTIATORS ===
-
-- Deep understanding of blockchain, Web3, and emerging technologies
-- Research-driven approach to regulatory compliance and risk management
-- Young, ambitious legal minds redefining legal practice
-- Client-centric solutions that drive sustainable growth
-- Excellence in corporate legal advisory and litigation
-- Fusion of deep legal research, technological insight, and innovative strategy
-
-=== CLIENT SERVICES ===
-
-**Who We Serve**:
-- Startups, founders, and early-stage companies
-- International clients expanding into Nigeria's digital market
-- Corporations navigating digital transformation
-- Innovators in blockchain, Web3, and digital assets space
-- Businesses requiring technology law compliance
-
-**Engagement Process**:
-1. Contact through website, email, or office
-2. Initial consultation to assess the matter
-3. Define scope of work
-4. Formal engagement letter provided
-5. Work begins upon acceptance
-
-**Fee Structure**:
-- Hourly billing
-- Fixed-fee arrangements
-- Project-based pricing
-- Retainer agreements for ongoing advisory needs
-- All fees discussed upfront with transparency
-=== RESPONSE GUIDELINES ===
-
-1. Be professional, clear, and helpful
-2. Provide accurate information about the firm based on the context above
-3. For specific legal advice, always recommend contacting the firm directly via provided contact details
-4. If asked about specific team members or blog posts not in your context, mention that you can help find that information if they search the website
-5. Stay focused on legal topics related to technology, AI, blockchain, and the firm's practice areas
-6. Be concise but thorough in your responses
-7. Use markdown formatting for emphasis and structure
-8. When recommending contact, provide the actual phone numbers and email
-
-IMPORTANT: You can discuss all information provided above about Lightfield LP. For specific blog posts or associate details, reference them only if explicitly provided in the conversation context through the RAG system."""
-
-        messages = [
-            {"role": "system", "content": system_message}
-        ]
-
-        # Add conversation history if provided
-        if conversation_history:
-            messages.extend(conversation_history)
-
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
+        messages = self._build_solo_messages(user_message, conversation_history)
 
         return self.generate_completion(messages, temperature=0.55, max_tokens=1500)
 
@@ -433,7 +345,7 @@ IMPORTANT: You can discuss all information provided above about Lightfield LP. F
         Returns:
             dict: Context containing blog_posts, associates, services
         """
-        from .models import BlogPost, Associate, Grant
+        from .embeddings import semantic_search
 
         context = {
             'blog_posts': [],
@@ -442,40 +354,25 @@ IMPORTANT: You can discuss all information provided above about Lightfield LP. F
             'services': []
         }
 
-        # Extract keywords from user message
-        keywords = self._extract_keywords(user_message.lower())
-
-        # Search for relevant blog posts
-        if keywords:
-            query = Q()
-            for keyword in keywords:
-                query |= Q(title__icontains=keyword) | Q(content__icontains=keyword) | Q(excerpt__icontains=keyword)
-
-            blog_posts = BlogPost.objects.filter(
-                query,
-                is_published=True
-            ).order_by('-created_at')[:3]
-
-            context['blog_posts'] = [
-                {
-                    'id': post.id,
-                    'title': post.title,
-                    'excerpt': post.excerpt,
-                    'slug': post.slug,
-                }
-                for post in blog_posts
-            ]
-
-        # Search for relevant associates
-        associate_query = Q(is_active=True)
-        for keyword in keywords:
-            associate_query &= (
-                Q(name__icontains=keyword) |
-                Q(bio__icontains=keyword) |
-                Q(title__icontains=keyword)
-            )
+        # Rank published posts, active associates and grants with the in-memory BM25 index,
+        # fused with semantic (embedding) matches when documents have been embedded
+        index = get_retrieval_index()
+        semantic = {}
+        if getattr(settings, 'SOLO_SEMANTIC_RETRIEVAL', True):
+            try:
+                semantic = semantic_search(user_message)
+            except Exception as e:
+                logger.warning(f'Semantic retrieval failed: {e}')
 
-        associates = Associate.objects.filter(associate_query)[:2]
+        context['blog_posts'] = [
+            {
+                'id': post.id,
+                'title': post.title,
+                'excerpt': post.excerpt,
+                'slug': post.slug,
+            }
+            for post in index.search('blog_posts', user_message, 3, semantic.get('blog_posts'))
+        ]
 
         context['associates'] = [
             {
@@ -486,22 +383,21 @@ IMPORTANT: You can discuss all information provided above about Lightfield LP. F
                 'slug': assoc.slug,
                 'bio': assoc.bio,
             }
-            for assoc in associates
+            for assoc in index.search('associates', user_message, 2, semantic.get('associates'))
         ]
 
-         # Search for relevant grants and scholarships
-        grant_keywords = ['grant', 'scholarship', 'award', 'fellowship', 'funding', 'financial aid',
-                         'bursary', 'sponsorship', 'education', 'student', 'apply', 'application',
-                         'deadline', 'eligibility', 'opportunity']
-
-        message_lower = user_message.lower()
+        # Grant intent and practice areas in one pass over the message
+        topics = SOLO_TOPIC_MATCHER.labels(user_message)
 
-        # Check if user is asking about grants/scholarships
-        is_grant_query = any(kw in message_lower for kw in grant_keywords)
-
-        if is_grant_query or any(kw in keywords for kw in ['grant', 'scholarship', 'award', 'fellowship']):
-            grant_query = Q(is_active=True)
-            grants = Grant.objects.filter(grant_query).order_by('-is_featured', 'order_priority', '-created_at')[:3]
+        # Search for relevant grants and scholarships
+        if GRANT_QUERY in topics:
+            grants = index.search('grants', user_message, 3, semantic.get('grants'))
+            if not grants:
+                # Generic grant question: show featured grants first
+                grants = sorted(
+                    index.all('grants'),
+                    key=lambda grant: (not grant.is_featured, grant.order_priority, -grant.created_at.timestamp())
+                )[:3]
 
             context['grants'] = [
                 {
@@ -524,41 +420,44 @@ IMPORTANT: You can discuss all information provided above about Lightfield LP. F
             ]
 
         # Identify relevant practice areas/services
-        practice_areas = {
-            'artificial intelligence': ['ai', 'artificial intelligence', 'machine learning', 'neural network', 'algorithm'],
-            'blockchain': ['blockchain', 'cryptocurrency', 'bitcoin', 'ethereum', 'crypto', 'defi', 'nft', 'web3', 'smart contract'],
-            'intellectual property': ['ip', 'intellectual property', 'patent', 'trademark', 'copyright', 'trade secret'],
-            'regulatory compliance': ['compliance', 'regulation', 'regulatory', 'sec', 'finra', 'gdpr'],
-            'corporate law': ['corporate', 'company', 'startup', 'm&a', 'merger', 'acquisition', 'fundraising'],
-            'data privacy': ['privacy', 'data protection', 'gdpr', 'ccpa', 'personal data'],
-            'property law': ['property', 'real estate', 'land', 'lease', 'tenant', 'landlord'],
-            'litigation': ['litigation', 'lawsuit', 'dispute', 'court', 'trial', 'legal action'],
-            'grants and scholarships': ['grant', 'scholarship', 'award', 'fellowship', 'funding', 'bursary'],
-        }
-
-        for area, area_keywords in practice_areas.items():
-            if any(keyword in message_lower for keyword in area_keywords):
-                context['services'].append(area)
+        context['services'] = [topic for topic in topics if topic in PRACTICE_AREA_KEYWORDS]
 
         return context
 
-    def _extract_keywords(self, text):
-        """
-        Extract meaningful keywords from text
-        """
-        # Remove common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
-                     'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-                     'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-                     'can', 'could', 'may', 'might', 'what', 'which', 'who', 'when', 'where',
-                     'why', 'how', 'i', 'you', 'me', 'my', 'your', 'tell', 'about', 'need', 'want'}
+    def _retrieve_in_worker(self, user_message):
+        try:
+            return self.retrieve_relevant_context(user_message)
+        finally:
+            close_old_connections()
 
-        # Extract words
-        words = re.findall(r'\b[a-z]{3,}\b', text)
+    @staticmethod
+    def _degraded_context(reason, error):
+        """Empty context for a context-free answer; `retrieval` records why"""
+        logger.warning(f'Solo context retrieval gave up ({reason}), answering without context: {error}')
+        return {'blog_posts': [], 'associates': [], 'grants': [], 'services': [], 'retrieval': reason}
 
-        # Filter stop words and return unique keywords
-        keywords = [word for word in words if word not in stop_words]
-        return list(set(keywords))[:10]  # Limit to 10 keywords
+    async def aretrieve_solo_context(self, user_message):
+        """
+        retrieve_relevant_context() with a hard deadline (SOLO_RETRIEVAL_TIMEOUT)
+
+        Retrieval runs on a worker thread. A slow or failing database costs the
+        answer its context, not its first token. On a cold worker the index build
+        counts against the same deadline; if it runs over, the answer goes out
+        without context ('index_cold') and the build carries on in the worker
+        thread for the next request. With no timeout configured, retrieval is
+        waited for.
+        """
+        if not retrieval_timeout():
+            return await sync_to_async(self.retrieve_relevant_context)(user_message)
+        reason = 'timeout' if retrieval_index_ready() else 'index_cold'
+        future = _retrieval_executor.submit(self._retrieve_in_worker, user_message)
+        try:
+            # shield() so the deadline doesn't cancel the wrapper; the thread keeps going either way
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), retrieval_timeout())
+        except asyncio.TimeoutError:
+            return self._degraded_context(reason, f'no result after {retrieval_timeout()}s')
+        except Exception as e:
+            return self._degraded_context('failed', e)
 
     def _format_context_for_prompt(self, context):
         """
@@ -612,123 +511,130 @@ IMPORTANT: You can discuss all information provided above about Lightfield LP. F
 
         return "\n".join(parts) if parts else None
 
-    def solo_chat_stream(self, user_message, conversation_history=None, inject_context=True):
+    def _build_solo_messages(self, user_message, conversation_history=None, context_text=None):
+        """
+        Solo messages: the static system prompt, the history, the retrieved
+        context (a separate message, so the prefix stays byte-identical across
+        requests), then the user's message
         """
-        Solo AI assistant with streaming support
+        messages = [
+            {"role": "system", "content": prompts['solo_system'].text}
+        ]
+
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+
+        # Add context if available
+        if context_text:
+            messages.append({"role": "system", "content": prompts['solo_context'].render(context=context_text)})
+
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _prepare_solo_chat(self, user_message, conversation_history=None, inject_context=True, context=None):
+        """
+        Build the Solo prompt and look up a cached first-turn answer
 
         Args:
-            user_message: User's question
-            conversation_history: List of previous messages (optional)
-            inject_context: Whether to inject relevant context from database
+            context: Context retrieved by aretrieve_solo_context (used when inject_context)
 
         Returns:
-            tuple: (generator of chunks, context dict)
+            tuple: (messages, context dict, answer cache key or None, cached answer or None)
         """
         # Retrieve relevant context if enabled
-        context = {}
         context_text = None
 
         if inject_context:
-            context = self.retrieve_relevant_context(user_message)
-            context_text = self._format_context_for_prompt(context)
-
-        system_message = """You are Solo, the AI legal assistant for Lightfield Legal Practitioners (Lightfield LP).
-You are a knowledgeable, professional, and helpful assistant that answers questions about the firm, its services, and general legal concepts.
-
-=== ABOUT LIGHTFIELD LP ===
-
-Lightfield LP is a forward-thinking Nigerian law firm delivering innovative, research-grounded advisory and litigation services. The firm was established with a vision to provide tech-driven, innovative legal solutions for Africa's digital economy.
-
-**Tagline**: "Your Trusted Legal Partner in a Fast-Changing Digital World"
-
-**Mission Statement**:
-At Lightfield LP, our mission is to deliver forward-thinking, research-driven, and technology-aligned legal solutions that empower individuals, founders, corporations, and emerging industries in the digital era. We are committed to excellence in blockchain, Web3, digital assets, technology law, data privacy, constitutional law, property law, corporate legal advisory and litigation.
-
-**Vision Statement**:
-Our vision is to become Africa's leading tech-driven and innovation-focused law firm; setting the benchmark for excellence in corporate legal advisory and shaping the future of digital regulation.
-
-=== PRACTICE AREAS ===
-
-1. **Blockchain and Web3 Law**: Regulatory guidance, compliance structuring, tokenization advisory, smart contract review, digital asset transaction support
-2. **Digital Assets**: Legal status of tokens, capital markets compliance, taxation, AML requirements, exchange regulations
-3. **Technology and Innovation Law**: Tech regulatory compliance, platform terms, SaaS agreements, software licensing
-4. **Data Privacy and Protection**: NDPA compliance, GDPR frameworks, cybersecurity, compliance audits, data breach response
-5. **Constitutional Law**: Constitutional matters, governance frameworks
-6. **Property Law**: Property disputes, real estate transactions
-7. **Corporate and Commercial Advisory**: Incorporation, fundraising, shareholder agreements, corporate governance
-8. **Litigation**: Technology disputes, commercial litigation, contract enforcement
-
-=== OFFICE LOCATIONS ===
-
-**Lagos Office (Head Office)**:
-Road 5, J59, Ikota Shopping Complex, VGC, Lekki, Lagos State, Nigeria.
-
-**Abuja Office**:
-Suite T7, 3rd Floor, Alibro Atrium Plaza, Utako District, FCT Abuja, Nigeria.
-
-=== CONTACT INFORMATION ===
-
-- Phone: +234 814 876 7744
-- Phone: +234 703 267 6039
-- Email: lightfieldlegalpractitioners@gmail.com
-
-=== KEY DIFFERENTIATORS ===
+            if 'retrieval' not in context:
+                context_text = self._format_context_for_prompt(context)
+        else:
+            context = {}
 
-- Deep understanding of blockchain, Web3, and emerging technologies
-- Research-driven approach to regulatory compliance
-- Young, ambitious legal minds redefining legal practice
-- Client-centric solutions for sustainable growth
-- Excellence in corporate legal advisory and litigation
+        messages = self._build_solo_messages(user_message, conversation_history, context_text)
+        context['prompt_version'] = prompts['solo_system'].label
 
-=== RESPONSE GUIDELINES ===
+        # First-turn answers only depend on the question and prompt, so they can be reused
+        # (but not a context-free answer given because retrieval was degraded)
+        cache_key = None
+        cached = None
+        if not conversation_history and answer_cache_enabled() and 'retrieval' not in context:
+            prompt = '\n'.join(message['content'] for message in messages[:-1])
+            cache_key = answer_cache_key(user_message, f'{self.model}\n{prompt}')
+            cached = get_cached_answer(cache_key)
+            if cached is not None:
+                context['answer_cache'] = 'hit'
 
-- Be professional, clear, and helpful
-- When relevant context is provided below, reference specific blog posts, team members, or services
-- Include clickable links using markdown: [Link Text](URL)
-- For blog posts: [Read more: Article Title](/blog/slug)
-- For team profiles: [Meet Name](/team/slug)
-- For specific legal advice, recommend contacting the firm with actual contact details
-- Use markdown formatting: **bold** for emphasis, bullet points for lists
-- Be concise but thorough
+        return messages, context, cache_key, cached
 
-"""
+    async def solo_chat_stream_async(self, user_message, conversation_history=None, inject_context=True):
+        """
+        Solo AI assistant, streamed, for the ASGI chat view
 
-        # Add context if available
-        if context_text:
-            system_message += f"\n\n{context_text}\n\n**IMPORTANT**: Reference the above information when relevant to the user's question."
+        Context retrieval runs in a worker thread, under its deadline, while the
+        provider connection is warmed up; the completion is streamed with
+        AsyncOpenAI so waiting on Gemini does not hold a thread.
 
-        messages = [
-            {"role": "system", "content": system_message}
-        ]
+        Args:
+            user_message: User's question
+            conversation_history: List of previous messages (optional)
+            inject_context: Whether to inject relevant context from database
 
-        # Add conversation history if provided
-        if conversation_history:
-            messages.extend(conversation_history)
+        Returns:
+            tuple: (async generator of chunks, context dict); the generator
+            raises LLMError if the completion fails, so the view can report it
+            in its own format. Once the provider reports usage, the context
+            gains `usage` ({'completion_tokens': ...}); replayed and coalesced
+            answers have none
+        """
+        context = None
+        if inject_context:
+            # Open the provider connection while the context is being retrieved; the
+            # warm-up is not awaited, so a slow handshake never holds up the answer
+            self._start_warmup()
+            context = await self.aretrieve_solo_context(user_message)
 
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
+        messages, context, cache_key, cached = await sync_to_async(self._prepare_solo_chat)(
+            user_message, conversation_history, inject_context, context
+        )
 
-        def generate_stream():
-            """Inner generator function"""
-            try:
-                # Create streaming completion
-                stream = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=0.8,
-                    max_tokens=1500,
-                    stream=True
-                )
-
-                # Yield chunks as they arrive
-                for chunk in stream:
-                    if chunk.choices[0].delta.content is not None:
-                        yield chunk.choices[0].delta.content
+        if cached is not None:
+            async def replay_stream():
+                for part in replay_answer(cached):
+                    yield part
+            return replay_stream(), context
 
-            except Exception as e:
-                yield f"Error: {str(e)}"
+        params = {
+            'model': self.model, 'messages': messages, 'temperature': 0.8, 'max_tokens': 1500,
+            # The final chunk then carries the completion's usage (with no choices)
+            'stream_options': {'include_usage': True},
+        }
 
-        return generate_stream(), context
+        async def generate_stream():
+            parts = []
+            stream = await self.llm.astream('chat_stream', **params)
+
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    context['usage'] = {'completion_tokens': chunk.usage.completion_tokens}
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+
+            if cache_key:
+                await sync_to_async(cache_answer)(cache_key, ''.join(parts))
+
+        chunks, joined = self._streams.ajoin(request_key(operation='chat_stream', **params), generate_stream)
+        if joined:
+            context['coalesced'] = True
+        return chunks, context
+
+    def _start_warmup(self):
+        task = asyncio.get_running_loop().create_task(self.llm.awarm())
+        # Keep a reference until it finishes, or the task may be garbage collected
+        self._warmups.add(task)
+        task.add_done_callback(self._warmups.discard)
 
 
 # Singleton instance
@@ -0,0 +1,76 @@
+"""
+Answer cache for first-turn Solo questions
+
+Many visitors open with the same question ("What services do you offer?").
+For a first turn (no conversation history) the answer depends only on the
+question and the prompt built from the retrieved context, so it is cached
+under a hash of the normalized question, that prompt, and the current
+versions of the blog post, associate and grant cache tags. Any change to
+that content bumps a tag (see signals.py), so stale answers are never
+served; they simply expire after SOLO_ANSWER_CACHE_TTL.
+
+Cached answers are replayed as a stream so clients handle them like a live one.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'solo-answer'
+REPLAY_CHUNK_SIZE = 64
+
+
+def answer_cache_enabled():
+    return getattr(settings, 'SOLO_ANSWER_CACHE_ENABLED', True)
+
+
+def normalize_question(text):
+    """
+    Fold case, accents-compatible forms, punctuation and whitespace, so
+    'What services do you offer?' and 'what services do you offer' match
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ' '.join(re.findall(r'\w+', text))
+
+
+def _content_tags():
+    from .models import Associate, BlogPost, Grant
+    from .response_cache import tag_for_model
+    return [tag_for_model(model) for model in (BlogPost, Associate, Grant)]
+
+
+def answer_cache_key(question, prompt):
+    """
+    Build the cache key for a first-turn question
+
+    Args:
+        question: The user's message
+        prompt: The system prompt sent with it (includes the retrieved context)
+    """
+    from .response_cache import get_tag_versions
+
+    versions = get_tag_versions(_content_tags())
+    raw = '|'.join([
+        normalize_question(question),
+        hashlib.sha256(prompt.encode('utf-8')).hexdigest(),
+        ','.join(f'{tag}:{versions[tag]}' for tag in sorted(versions)),
+    ])
+    return f'{KEY_PREFIX}:{hashlib.sha256(raw.encode("utf-8")).hexdigest()}'
+
+
+def get_cached_answer(key):
+    return cache.get(key)
+
+
+def cache_answer(key, answer):
+    if answer:
+        cache.set(key, answer, getattr(settings, 'SOLO_ANSWER_CACHE_TTL', 60 * 60 * 6))
+
+
+def replay_answer(answer, chunk_size=REPLAY_CHUNK_SIZE):
+    """Yield a cached answer in stream-sized chunks, without delay"""
+    for start in range(0, len(answer), chunk_size):
+        yield answer[start:start + chunk_size]
@@ -0,0 +1,149 @@
+"""
+Token-budgeted conversation history for Solo
+
+Each turn sends the most recent messages that fit SOLO_HISTORY_TOKEN_BUDGET
+(estimated tokens), newest first, instead of a fixed ten messages of any
+length. Messages that fall out of that window are folded into a rolling
+summary stored on the conversation and sent ahead of the recent messages.
+
+The summary is only refreshed after a turn, and only when unsummarized
+messages have drifted out of the window. It then folds everything except
+the newest messages fitting half the budget, so the next few turns fit
+without another summarization call.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+MAX_UNSUMMARIZED_MESSAGES = 60  # Cap on rows read when a long conversation is first compacted
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-summary')
+
+
+def history_token_budget():
+    return getattr(settings, 'SOLO_HISTORY_TOKEN_BUDGET', 1500)
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token for English text)"""
+    return len(text or '') // CHARS_PER_TOKEN + 1
+
+
+def message_tokens(message):
+    return estimate_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _unsummarized_messages(conversation):
+    """Messages newer than the summary, oldest first, with their seq"""
+    rows = conversation.chat_messages.filter(
+        seq__gt=conversation.summary_through_seq
+    ).order_by('-seq').values('seq', 'role', 'content')[:MAX_UNSUMMARIZED_MESSAGES]
+    return list(rows)[::-1]
+
+
+def split_window(messages, budget):
+    """
+    Split messages (oldest first) into (older, recent) where `recent` is the
+    longest suffix within `budget` tokens. The newest message is always kept,
+    and `recent` never starts with an assistant reply.
+    """
+    used = 0
+    start = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        cost = message_tokens(messages[index])
+        if used + cost > budget and start < len(messages):
+            break
+        used += cost
+        start = index
+    while start < len(messages) - 1 and messages[start]['role'] == 'assistant':
+        start += 1
+    return messages[:start], messages[start:]
+
+
+def summary_message(summary):
+    return {
+        'role': 'system',
+        'content': f"Summary of the earlier conversation with this visitor:\n{summary}",
+    }
+
+
+def build_history(conversation, budget=None):
+    """
+    History to send with the next turn: the rolling summary (if any) followed
+    by the recent messages that fit the token budget
+
+    Returns:
+        list: Message dicts with 'role' and 'content'
+    """
+    budget = budget or history_token_budget()
+    summary_cost = estimate_tokens(conversation.summary) if conversation.summary else 0
+
+    _, recent = split_window(_unsummarized_messages(conversation), max(budget - summary_cost, 0))
+    history = [summary_message(conversation.summary)] if conversation.summary else []
+    history.extend({'role': m['role'], 'content': m['content']} for m in recent)
+    return history
+
+
+def refresh_summary(conversation, summarize, budget=None):
+    """
+    Fold messages that drifted out of the history window into the summary
+
+    Args:
+        conversation: AIConversation
+        summarize: Callable(previous_summary, messages) -> new summary
+        budget: History token budget (defaults to SOLO_HISTORY_TOKEN_BUDGET)
+
+    Returns:
+        bool: True if the summary was refreshed
+    """
+    from .models import AIConversation
+
+    budget = budget or history_token_budget()
+    messages = _unsummarized_messages(conversation)
+    older, _ = split_window(messages, budget)
+    if not older:
+        return False
+
+    # Fold down to half the budget so the next turns don't summarize again
+    older, _ = split_window(messages, budget // 2)
+    try:
+        summary = summarize(
+            conversation.summary,
+            [{'role': m['role'], 'content': m['content']} for m in older],
+        )
+    except Exception as e:
+        logger.warning(f'Failed to summarize conversation {conversation.session_id}: {e}')
+        return False
+
+    conversation.summary = summary or conversation.summary
+    conversation.summary_through_seq = older[-1]['seq']
+    AIConversation.objects.filter(pk=conversation.pk).update(
+        summary=conversation.summary, summary_through_seq=conversation.summary_through_seq,
+    )
+    return True
+
+
+def schedule_summary_refresh(conversation, summarize):
+    """
+    Run refresh_summary in the background so the finished stream isn't held open
+    (inline when SOLO_SUMMARY_ASYNC is off). If the worker is lost, the next
+    turn simply tries again.
+    """
+    if not getattr(settings, 'SOLO_SUMMARY_ASYNC', True):
+        refresh_summary(conversation, summarize)
+        return
+
+    def run():
+        try:
+            refresh_summary(conversation, summarize)
+        finally:
+            close_old_connections()
+
+    _executor.submit(run)
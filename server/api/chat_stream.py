@@ -0,0 +1,122 @@
+"""
+Wire formats and timing for the Solo chat stream
+
+By default the chat view streams the answer as plain text. A client that
+sends `Accept: text/event-stream` (or `"stream": "sse"` in the body) gets
+Server-Sent Events instead, one typed event per step:
+
+    event: context   {"session_id": ..., "context": {...}}   before the answer
+    event: token     {"text": "..."}                         each chunk
+    event: done      {"session_id", "usage", "timing"}       after the last chunk
+    event: error     {"error": "...", "retryable": bool}     instead of done
+
+While the model is thinking a `: keep-alive` comment is sent every
+SOLO_SSE_HEARTBEAT_SECONDS, so proxies don't close an idle connection and
+the client can tell a slow answer from a dead one.
+
+StreamTiming measures time to first token (what the user feels) separately
+from total time. The completion token count is the provider's, reported in
+the stream's final usage chunk; answers replayed from the answer cache or
+shared with a coalesced stream have none, so theirs is estimated with the
+same heuristic as the history budget.
+"""
+
+import asyncio
+import json
+import time
+
+from django.conf import settings
+
+from .chat_history import estimate_tokens
+
+EVENT_STREAM = 'text/event-stream'
+HEARTBEAT = ': keep-alive\n\n'
+
+
+def wants_event_stream(request, data):
+    """Whether the client asked for SSE rather than plain text"""
+    return data.get('stream') == 'sse' or EVENT_STREAM in request.headers.get('Accept', '')
+
+
+def sse_event(event, data):
+    """One SSE frame with a JSON payload"""
+    return f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+def heartbeat_interval():
+    return getattr(settings, 'SOLO_SSE_HEARTBEAT_SECONDS', 15)
+
+
+async def with_heartbeats(chunks, interval):
+    """
+    Yield the chunks of an async iterator, and None whenever `interval`
+    seconds pass without one. The pending read is never cancelled, so a
+    heartbeat doesn't disturb the stream.
+    """
+    iterator = chunks.__aiter__()
+    while True:
+        pending = asyncio.ensure_future(iterator.__anext__())
+        try:
+            while True:
+                done, _ = await asyncio.wait({pending}, timeout=interval)
+                if done:
+                    break
+                yield None
+        except BaseException:
+            pending.cancel()
+            raise
+        try:
+            yield pending.result()
+        except StopAsyncIteration:
+            return
+
+
+class StreamTiming:
+    """
+    Time to first token, total time and throughput of one streamed answer
+    """
+
+    def __init__(self, started=None):
+        self.started = time.monotonic() if started is None else started
+        self.first_token_at = None
+        self.finished_at = None
+
+    def token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    @staticmethod
+    def _ms(seconds):
+        return int(seconds * 1000)
+
+    def metrics(self, text, completion_tokens=None):
+        """
+        Args:
+            text: The streamed answer
+            completion_tokens: Provider-reported token count, if any; the
+                count is estimated from `text` otherwise
+
+        Returns:
+            dict: ttft_ms (None if nothing was streamed), total_ms,
+            completion_tokens and tokens_per_second (over the generation
+            time after the first token)
+        """
+        finished = self.finished_at or time.monotonic()
+        if completion_tokens is not None:
+            tokens = completion_tokens
+        else:
+            tokens = estimate_tokens(text) if text else 0
+        ttft = None if self.first_token_at is None else self.first_token_at - self.started
+        tokens_per_second = None
+        if ttft is not None and tokens:
+            generation = finished - self.first_token_at
+            tokens_per_second = round(tokens / generation, 2) if generation > 0 else None
+        return {
+            'ttft_ms': None if ttft is None else self._ms(ttft),
+            'total_ms': self._ms(finished - self.started),
+            'completion_tokens': tokens,
+            'tokens_per_second': tokens_per_second,
+        }
@@ -0,0 +1,27 @@
+"""
+System checks for deployment settings the API relies on
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=False)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Rate limit buckets, response cache purges and the blog view buffer assume
+    every worker shares one cache. locmem gives each process its own.
+    """
+    if getattr(settings, 'CACHE_BACKEND', 'locmem') != 'locmem':
+        return []
+    return [
+        Warning(
+            'CACHE_BACKEND is locmem, which is private to each worker process.',
+            hint=(
+                'AI rate limits are enforced per worker (N workers allow N times the configured '
+                'budget) and cache purges only reach the worker that saved. Set CACHE_BACKEND=redis '
+                'when running more than one worker.'
+            ),
+            id='api.W001',
+        )
+    ]
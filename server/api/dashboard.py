@@ -0,0 +1,131 @@
+"""
+Admin dashboard statistics
+
+The counters are computed with one aggregate() per table, using conditional
+Count(filter=...) for the subsets (published posts, unread contacts, paid
+bookings, ...), so a full refresh is six queries however many figures the
+dashboard shows.
+
+The result is kept as a snapshot in the shared cache. A snapshot younger
+than DASHBOARD_STATS_TTL seconds is served as is; an older one is still
+served, and a single background refresh replaces it (stale-while-revalidate),
+so a dashboard load never waits on the aggregates unless there is no
+snapshot at all. Figures can lag the database by about one TTL.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'dashboard:stats'
+REFRESH_LOCK_KEY = 'dashboard:stats:refreshing'
+SNAPSHOT_LIFETIME_FACTOR = 20  # Stale snapshots are kept this many TTLs before the cache drops them
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dashboard-stats')
+
+
+def stats_ttl():
+    return getattr(settings, 'DASHBOARD_STATS_TTL', 30)
+
+
+def compute_dashboard_stats():
+    """
+    Returns:
+        dict: Every dashboard counter, from one query per table
+    """
+    from .models import Associate, BlogPost, ConsultationBooking, ContactSubmission, Grant, Testimonial
+
+    blogs = BlogPost.objects.aggregate(
+        total=Count('id'),
+        published=Count('id', filter=Q(is_published=True)),
+        views=Coalesce(Sum('view_count'), 0),
+    )
+    associates = Associate.objects.aggregate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    contacts = ContactSubmission.objects.aggregate(total=Count('id'), unread=Count('id', filter=Q(status='unread')))
+    testimonials = Testimonial.objects.aggregate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    grants = Grant.objects.aggregate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    bookings = ConsultationBooking.objects.aggregate(
+        total=Count('id'),
+        paid=Count('id', filter=Q(payment_verified=True)),
+        revenue=Sum('amount', filter=Q(payment_verified=True)),
+        pending_confirmations=Count('id', filter=Q(status='paid')),
+    )
+
+    return {
+        'total_blogs': blogs['total'],
+        'published_blogs': blogs['published'],
+        'draft_blogs': blogs['total'] - blogs['published'],
+        'total_associates': associates['total'],
+        'active_associates': associates['active'],
+        'total_contacts': contacts['total'],
+        'unread_contacts': contacts['unread'],
+        'total_views': blogs['views'],
+        'total_testimonials': testimonials['total'],
+        'active_testimonials': testimonials['active'],
+        'total_grants': grants['total'],
+        'active_grants': grants['active'],
+        'total_bookings': bookings['total'],
+        'paid_bookings': bookings['paid'],
+        'consultation_revenue': float(bookings['revenue'] or 0),
+        'pending_confirmations': bookings['pending_confirmations'],
+    }
+
+
+def refresh_dashboard_stats():
+    """
+    Recompute the stats and store them as the current snapshot
+
+    Returns:
+        dict: The new snapshot ({'stats', 'computed_at'})
+    """
+    snapshot = {'stats': compute_dashboard_stats(), 'computed_at': time.time()}
+    cache.set(SNAPSHOT_KEY, snapshot, timeout=int(stats_ttl() * SNAPSHOT_LIFETIME_FACTOR))
+    return snapshot
+
+
+def schedule_stats_refresh():
+    """
+    Refresh the snapshot in the background, once, however many requests
+    find it stale (inline when DASHBOARD_STATS_ASYNC is off)
+    """
+    if not cache.add(REFRESH_LOCK_KEY, True, timeout=max(1, int(stats_ttl()))):
+        return  # Another request (or worker process) is already refreshing
+
+    def run():
+        try:
+            refresh_dashboard_stats()
+        except Exception as e:
+            logger.warning(f'Dashboard stats refresh failed: {e}')
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+            close_old_connections()
+
+    if not getattr(settings, 'DASHBOARD_STATS_ASYNC', True):
+        run()
+        return
+    _executor.submit(run)
+
+
+def get_dashboard_stats():
+    """
+    Current dashboard stats, from the snapshot when there is one
+
+    Returns:
+        tuple: (stats dict, snapshot age in seconds)
+    """
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        snapshot = refresh_dashboard_stats()
+
+    age = max(0.0, time.time() - snapshot['computed_at'])
+    if age >= stats_ttl():
+        schedule_stats_refresh()
+    return snapshot['stats'], age
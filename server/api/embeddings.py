@@ -0,0 +1,437 @@
+"""
+Local embedding store for semantic Solo retrieval
+
+Blog posts, associate bios and grant descriptions are split into chunks and
+embedded by a pluggable embedder (settings.SOLO_EMBEDDER, a dotted path).
+Vectors live in the DocumentEmbedding table and are loaded into one
+normalized NumPy matrix per process, so a query is a single matrix product
+followed by a top-k selection. `manage.py embed_documents` only embeds chunks
+whose text changed since the last run.
+
+Hits scoring below SOLO_SEMANTIC_MIN_SCORE are dropped, so a greeting or an
+off-topic question retrieves nothing rather than the k least-bad documents.
+The floor depends on the embedder: hashed vectors of unrelated texts score
+near 0, while dense embeddings of unrelated texts often score 0.5 or more.
+
+Each process reloads its matrix when the stored vectors change. The version
+is read from the database (row count and latest update), at most every
+SOLO_EMBEDDINGS_RECHECK seconds, so a run of embed_documents in another
+process is picked up without a shared cache.
+
+HashingEmbedder is deterministic and fully local (used by default and in
+tests). GeminiEmbedder calls the Gemini embeddings endpoint and is what makes
+paraphrases ("crypto startup fundraising" vs "token offerings") match.
+
+NumPy is optional, to keep the serverless bundle under its size limit.
+Without it vectors are float32 arrays from the standard library and a query
+is scored with a plain-Python dot product over its non-zero entries, which
+suits the sparse hashed vectors. Install numpy for dense embedders or large
+stores.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.module_loading import import_string
+
+from .retrieval_index import analyze
+
+try:
+    import numpy as np
+except ImportError:  # Optional, see the module docstring
+    np = None
+
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+
+
+# ==================== Embedders ====================
+
+class BaseEmbedder:
+    """
+    Turns texts into L2-normalized float32 vectors
+
+    Subclasses set `name` and `dimensions` and implement embed_batch().
+    """
+    name = 'base'
+    dimensions = 0
+
+    @property
+    def key(self):
+        """Identifies vectors produced by this embedder in the store"""
+        return f'{self.name}:{self.dimensions}'
+
+    def embed_batch(self, texts):
+        raise NotImplementedError
+
+    def embed(self, texts):
+        """
+        Returns:
+            (len(texts), dimensions) float32 matrix with unit rows: an
+            np.ndarray, or a list of array('f') rows without NumPy
+        """
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32) if np is not None else []
+        vectors = self.embed_batch(list(texts))
+        if np is not None:
+            vectors = np.asarray(vectors, dtype=np.float32)
+        return normalize_rows(vectors)
+
+
+class HashingEmbedder(BaseEmbedder):
+    """
+    Deterministic local embedder: signed feature hashing of stemmed terms and bigrams
+    """
+    name = 'hashing'
+
+    def __init__(self, dimensions=512):
+        self.dimensions = dimensions
+
+    def _features(self, text):
+        terms = analyze(text)
+        return terms + [f'{a} {b}' for a, b in zip(terms, terms[1:])]
+
+    def embed_batch(self, texts):
+        matrix = [[0.0] * self.dimensions for _ in texts]
+        for row, text in zip(matrix, texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                value = int.from_bytes(digest, 'little')
+                sign = 1.0 if value & 1 else -1.0
+                row[(value >> 1) % self.dimensions] += sign
+        return matrix
+
+
+class GeminiEmbedder(BaseEmbedder):
+    """
+    Gemini embeddings through the OpenAI-compatible endpoint
+    """
+    name = 'gemini-embedding-001'
+
+    def __init__(self, dimensions=768, batch_size=64):
+        from .ai_service import GEMINI_BASE_URL
+        from .llm_client import ResilientLLMClient
+
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+        self.llm = ResilientLLMClient(api_key, GEMINI_BASE_URL)
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+
+    def embed_batch(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.llm.embed(
+                model=self.name,
+                input=texts[start:start + self.batch_size],
+                dimensions=self.dimensions,
+            )
+            vectors.extend(item.embedding for item in response.data)
+        return vectors
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """
+    Get or create the configured embedder (settings.SOLO_EMBEDDER)
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            path = getattr(settings, 'SOLO_EMBEDDER', 'api.embeddings.HashingEmbedder')
+            _embedder = import_string(path)()
+        return _embedder
+
+
+def normalize_rows(matrix):
+    if np is not None:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    rows = []
+    for row in matrix:
+        norm = math.sqrt(sum(x * x for x in row)) or 1.0
+        rows.append(array('f', (x / norm for x in row)))
+    return rows
+
+
+def vector_bytes(vector):
+    """float32 bytes of one vector, as stored in DocumentEmbedding.vector"""
+    if np is not None:
+        return np.asarray(vector, dtype=np.float32).tobytes()
+    return array('f', vector).tobytes()
+
+
+# ==================== Documents ====================
+
+def chunk_text(text, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """Split text into overlapping windows of `size` words"""
+    words = (text or '').split()
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    step = size - overlap
+    return [' '.join(words[start:start + size]) for start in range(0, len(words) - overlap, step)]
+
+
+def _strip_html(text):
+    return re.sub('<[^<]+?>', ' ', text or '')
+
+
+def iter_documents():
+    """
+    Yield (kind, object_id, [chunk texts]) for everything Solo can cite
+    """
+    from .models import Associate, BlogPost, Grant
+
+    for post in BlogPost.objects.filter(is_published=True).only('id', 'title', 'excerpt', 'content').iterator():
+        body = chunk_text(_strip_html(post.content))
+        header = f'{post.title}. {post.excerpt}'
+        yield 'blog_posts', post.id, [header] + body
+
+    for associate in Associate.objects.filter(is_active=True).only('id', 'name', 'title', 'bio', 'expertise'):
+        expertise = ', '.join(associate.expertise or [])
+        text = f'{associate.name}, {associate.title}. Expertise: {expertise}. {associate.bio}'
+        yield 'associates', associate.id, chunk_text(text)
+
+    for grant in Grant.objects.filter(is_active=True).only(
+        'id', 'title', 'short_description', 'full_description', 'target_audience'
+    ):
+        text = f'{grant.title}. {grant.short_description} {grant.target_audience}. {_strip_html(grant.full_description)}'
+        yield 'grants', grant.id, chunk_text(text)
+
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def sync_embeddings(embedder=None, batch_size=32, rebuild=False):
+    """
+    Embed new or changed chunks and delete ones whose source is gone
+
+    Args:
+        embedder: Embedder to use (defaults to the configured one)
+        batch_size: Chunks sent to the embedder per call
+        rebuild: Re-embed everything
+
+    Returns:
+        dict: Counts of 'embedded', 'unchanged' and 'deleted' chunks
+    """
+    from .models import DocumentEmbedding
+
+    embedder = embedder or get_embedder()
+    stored = {
+        (kind, object_id, chunk): (pk, text_hash)
+        for pk, kind, object_id, chunk, text_hash in DocumentEmbedding.objects.filter(
+            embedder=embedder.key
+        ).values_list('id', 'kind', 'object_id', 'chunk', 'text_hash')
+    }
+
+    pending = []
+    seen = set()
+    unchanged = 0
+    for kind, object_id, chunks in iter_documents():
+        for index, text in enumerate(chunks):
+            key = (kind, object_id, index)
+            seen.add(key)
+            text_hash = _text_hash(text)
+            if not rebuild and key in stored and stored[key][1] == text_hash:
+                unchanged += 1
+                continue
+            pending.append((key, text, text_hash))
+
+    stale_ids = [pk for key, (pk, _) in stored.items() if key not in seen]
+
+    embedded = 0
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        vectors = embedder.embed([text for _, text, _ in batch])
+        with transaction.atomic():
+            DocumentEmbedding.objects.filter(
+                embedder=embedder.key,
+                id__in=[stored[key][0] for key, _, _ in batch if key in stored],
+            ).delete()
+            DocumentEmbedding.objects.bulk_create([
+                DocumentEmbedding(
+                    embedder=embedder.key, kind=kind, object_id=object_id, chunk=chunk,
+                    text_hash=text_hash, vector=vector_bytes(vector),
+                )
+                for ((kind, object_id, chunk), _, text_hash), vector in zip(batch, vectors)
+            ])
+        embedded += len(batch)
+
+    if stale_ids:
+        DocumentEmbedding.objects.filter(id__in=stale_ids).delete()
+
+    if embedded or stale_ids:
+        invalidate_embedding_store()
+
+    return {'embedded': embedded, 'unchanged': unchanged, 'deleted': len(stale_ids)}
+
+
+# ==================== Search ====================
+
+class EmbeddingStore:
+    """
+    All chunk vectors of one embedder as a single normalized matrix
+    """
+
+    def __init__(self, embedder_key, dimensions):
+        from .models import DocumentEmbedding
+
+        rows = list(
+            DocumentEmbedding.objects.filter(embedder=embedder_key).values_list('kind', 'object_id', 'vector')
+        )
+        self.keys = [(kind, object_id) for kind, object_id, _ in rows]
+        if np is None:
+            self.matrix = normalize_rows(array('f', bytes(vector)) for _, _, vector in rows)
+        elif rows:
+            matrix = np.frombuffer(b''.join(bytes(vector) for _, _, vector in rows), dtype=np.float32)
+            self.matrix = normalize_rows(matrix.reshape(len(rows), dimensions))
+        else:
+            self.matrix = np.zeros((0, dimensions), dtype=np.float32)
+        kinds = [kind for kind, _ in self.keys]
+        self.kinds = np.array(kinds) if np is not None else kinds
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search_many(self, query_vectors, k, kind=None, min_score=None):
+        """
+        Batched cosine top-k over documents (best chunk per document)
+
+        Args:
+            query_vectors: (q, d) matrix of unit query vectors
+            k: Documents to return per query
+            kind: Optional kind to restrict to
+            min_score: Optional similarity floor; weaker hits are dropped
+
+        Returns:
+            list: One [(key, score), ...] list per query, where key is the
+                object id when `kind` is given and (kind, object_id) otherwise
+        """
+        if not len(self) or not len(query_vectors):
+            return [[] for _ in range(len(query_vectors))]
+        if np is None:
+            return [self._search_python(query, k, kind, min_score) for query in query_vectors]
+
+        scores = np.asarray(query_vectors, dtype=np.float32) @ self.matrix.T  # (q, n) cosine similarities
+        if kind is not None:
+            scores = np.where(self.kinds == kind, scores, -np.inf)
+        if min_score is not None:
+            scores = np.where(scores >= min_score, scores, -np.inf)
+
+        results = []
+        # Take extra candidates so several chunks of one document don't crowd others out
+        candidates = min(scores.shape[1], k * 4)
+        for row in scores:
+            top = np.argpartition(-row, candidates - 1)[:candidates]
+            ranked = [(int(index), float(row[index])) for index in top[np.argsort(-row[top])]]
+            results.append(self._best_per_document(ranked, k, kind))
+        return results
+
+    def _search_python(self, query, k, kind, min_score):
+        # Only the query's non-zero entries contribute (hashed vectors are sparse)
+        terms = [(i, x) for i, x in enumerate(query) if x]
+        ranked = []
+        for index, vector in enumerate(self.matrix):
+            if kind is not None and self.kinds[index] != kind:
+                continue
+            score = sum(x * vector[i] for i, x in terms)
+            if min_score is None or score >= min_score:
+                ranked.append((index, score))
+        ranked.sort(key=lambda item: -item[1])
+        return self._best_per_document(ranked, k, kind)
+
+    def _best_per_document(self, ranked, k, kind):
+        """Keep the best chunk per document from best-first (index, score) pairs"""
+        best = {}
+        for index, score in ranked:
+            if not math.isfinite(score):
+                break
+            kind_, object_id = self.keys[index]
+            key = object_id if kind is not None else (kind_, object_id)
+            if key not in best:
+                best[key] = score
+            if len(best) == k:
+                break
+        return list(best.items())
+
+    def search(self, query_vector, k, kind=None, min_score=None):
+        return self.search_many([query_vector], k, kind=kind, min_score=min_score)[0]
+
+
+def semantic_min_score():
+    return getattr(settings, 'SOLO_SEMANTIC_MIN_SCORE', 0.2)
+
+
+def store_version(embedder_key):
+    """Changes whenever vectors of the embedder are added, replaced or deleted"""
+    from .models import DocumentEmbedding
+
+    stats = DocumentEmbedding.objects.filter(embedder=embedder_key).aggregate(
+        count=Count('id'), updated=Max('updated_at'),
+    )
+    return (stats['count'], stats['updated'])
+
+
+_store = None
+_store_version = None
+_store_checked_at = 0.0
+_store_lock = threading.Lock()
+
+
+def invalidate_embedding_store():
+    """Make the next get_embedding_store() re-check the stored version"""
+    global _store_checked_at
+    with _store_lock:
+        _store_checked_at = 0.0
+
+
+def get_embedding_store():
+    """
+    Return the process-wide store, reloading it when the stored vectors changed
+    (checked at most every SOLO_EMBEDDINGS_RECHECK seconds)
+    """
+    global _store, _store_version, _store_checked_at
+    embedder = get_embedder()
+    with _store_lock:
+        now = time.monotonic()
+        if _store is not None and now - _store_checked_at < getattr(settings, 'SOLO_EMBEDDINGS_RECHECK', 60):
+            return _store
+        _store_checked_at = now
+        version = store_version(embedder.key)
+        if _store is None or version != _store_version:
+            _store = EmbeddingStore(embedder.key, embedder.dimensions)
+            _store_version = version
+        return _store
+
+
+def semantic_search(text, k=3):
+    """
+    Rank documents of every kind for a chat message
+
+    Returns:
+        dict: {kind: [object_id, ...]} best first (empty if nothing is embedded)
+    """
+    from .models import DocumentEmbedding
+
+    store = get_embedding_store()
+    if not len(store):
+        return {}
+    query = get_embedder().embed([text])[0]
+    return {
+        kind: [object_id for object_id, _ in store.search(query, k, kind=kind, min_score=semantic_min_score())]
+        for kind, _ in DocumentEmbedding.KIND_CHOICES
+    }
@@ -0,0 +1,67 @@
+"""
+Single-pass keyword matching for intent and practice-area detection
+
+A KeywordMatcher compiles every keyword of every label into one regular
+expression (longest alternatives first), so a message is scanned once
+instead of once per keyword. Matches respect word boundaries, so 'ip'
+matches "IP rights" but not "partnership", while a trailing plural
+('grants', 'patents') still counts.
+
+A longer keyword implies the shorter keywords it contains ("seo keyword"
+also counts as "seo" and "keyword"), so a longest match never hides a
+label that a shorter keyword would have triggered.
+"""
+
+import re
+
+PLURAL_SUFFIX = r'(?:e?s)?'
+
+
+def _contains_word(text, keyword):
+    return re.search(rf'(?<!\w){re.escape(keyword)}(?!\w)', text) is not None
+
+
+class KeywordMatcher:
+    """
+    Match many labelled keyword lists against a text in one pass
+    """
+
+    def __init__(self, keywords_by_label):
+        """
+        Args:
+            keywords_by_label: {label: [keyword, ...]}; label order is kept in results
+        """
+        self.keywords_by_label = {
+            label: frozenset(keyword.lower() for keyword in keywords)
+            for label, keywords in keywords_by_label.items()
+        }
+        keywords = sorted(set().union(*self.keywords_by_label.values()), key=lambda k: (-len(k), k))
+
+        # Everything a matched keyword stands for, itself included
+        self._implied = {
+            keyword: frozenset(other for other in keywords if _contains_word(keyword, other))
+            for keyword in keywords
+        }
+        alternation = '|'.join(re.escape(keyword) for keyword in keywords)
+        self._regex = re.compile(rf'(?<!\w)({alternation}){PLURAL_SUFFIX}(?!\w)', re.IGNORECASE)
+
+    def find(self, text):
+        """
+        Returns:
+            set: Keywords present in the text (lowercase)
+        """
+        found = set()
+        for match in self._regex.finditer(text or ''):
+            found |= self._implied[match.group(1).lower()]
+        return found
+
+    def labels(self, text=None, found=None):
+        """
+        Labels with at least one keyword present, in definition order
+
+        Args:
+            text: Text to scan (ignored when `found` is given)
+            found: Result of a previous find(), to avoid scanning again
+        """
+        found = self.find(text) if found is None else found
+        return [label for label, keywords in self.keywords_by_label.items() if found & keywords]
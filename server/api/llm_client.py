@@ -0,0 +1,408 @@
+"""
+Resilient client for the LLM provider
+
+Wraps one pooled OpenAI-compatible client (and one AsyncOpenAI client per
+event loop) with:
+
+- per-operation timeouts: a chat stream must connect quickly but may pause
+  between chunks, an overview job can wait longer for a whole answer;
+- retries with full-jitter exponential backoff on transient failures
+  (connection errors, timeouts, 429 and 5xx). Completions have no side
+  effects, so they are safe to repeat; a stream is only retried while it is
+  being opened, never after chunks were delivered;
+- a circuit breaker shared by all operations: after
+  LLM_BREAKER_FAILURE_THRESHOLD consecutive transient failures calls fail
+  fast with LLMUnavailableError for LLM_BREAKER_RESET_TIMEOUT seconds, then
+  a single trial call decides whether to close it again;
+- per-operation metrics (calls, failures, retries, fast-fail rejections,
+  p50/p95 latency), exposed to staff at /api/v1/solo/llm-metrics/;
+- connection warm-up: warm()/awarm() open a pooled connection to the
+  provider (TCP and TLS) while the caller is still preparing its request,
+  so the completion doesn't pay for the handshake. They do nothing when a
+  connection was used recently enough to still be in the pool.
+
+The SDK's own retries are disabled so these are the only ones. Metrics and
+breaker state are per process.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict, deque
+
+import httpx
+from django.conf import settings
+from openai import (
+    APIConnectionError, APIStatusError, AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI,
+    RateLimitError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """
+    An LLM call failed (after any retries)
+    """
+
+
+class LLMUnavailableError(LLMError):
+    """
+    The circuit breaker is open; the call was not attempted
+    """
+
+
+class Operation:
+    """
+    Timeout and retry policy for one kind of call
+    """
+
+    def __init__(self, name, connect, read, max_attempts):
+        self.name = name
+        self.timeout = httpx.Timeout(read, connect=connect)
+        self.max_attempts = max_attempts
+
+
+# For streams `read` bounds the pause between two chunks, not the whole answer
+OPERATIONS = {
+    'chat_stream': Operation('chat_stream', connect=3.0, read=30.0, max_attempts=2),
+    'chat': Operation('chat', connect=3.0, read=60.0, max_attempts=2),
+    'blog_assistant': Operation('blog_assistant', connect=3.0, read=45.0, max_attempts=2),
+    'overview': Operation('overview', connect=5.0, read=60.0, max_attempts=3),
+    'summary': Operation('summary', connect=5.0, read=30.0, max_attempts=2),
+    'embeddings': Operation('embeddings', connect=5.0, read=30.0, max_attempts=3),
+}
+
+# Pooled connections idle longer than this are dropped by httpx (the SDK's keepalive_expiry)
+WARM_CONNECTION_SECONDS = 4.0
+
+
+def is_retryable(error):
+    """Transient failures worth retrying (and counting against the provider)"""
+    if isinstance(error, (APIConnectionError, RateLimitError)):  # includes timeouts
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def backoff_delay(attempt, error=None):
+    """
+    Full-jitter exponential backoff, honouring a Retry-After header when present
+    """
+    base = getattr(settings, 'LLM_RETRY_BASE_DELAY', 0.5)
+    cap = getattr(settings, 'LLM_RETRY_MAX_DELAY', 4.0)
+    delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), cap))
+        except ValueError:
+            pass
+    return delay
+
+
+# ==================== Circuit Breaker ====================
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def failure_threshold(self):
+        return self._failure_threshold or getattr(settings, 'LLM_BREAKER_FAILURE_THRESHOLD', 5)
+
+    @property
+    def reset_timeout(self):
+        if self._reset_timeout is not None:
+            return self._reset_timeout
+        return getattr(settings, 'LLM_BREAKER_RESET_TIMEOUT', 30)
+
+    def allow(self):
+        """
+        Whether a call may go out now. In the half-open state only one trial
+        call is let through until it reports back.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self.trial_in_flight:
+                    return False
+                self.trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f'LLM circuit {self.name} closed')
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(f'LLM circuit {self.name} opened after {self.failures} failures')
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return {
+                'name': self.name,
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'times_opened': self.times_opened,
+                'retry_in_seconds': round(retry_in, 1),
+            }
+
+
+# ==================== Metrics ====================
+
+class LLMMetrics:
+    """
+    Per-operation counters and a rolling window of latencies
+    """
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(Counter)
+        self.latencies = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, operation, outcome, latency=None):
+        """
+        Args:
+            outcome: 'success', 'failure', 'retry' or 'rejected'
+            latency: Seconds, for completed attempts
+        """
+        with self._lock:
+            self.counters[operation][outcome] += 1
+            if latency is not None:
+                self.latencies[operation].append(latency)
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return round(ordered[index] * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            operations = {}
+            for name in sorted(set(self.counters) | set(self.latencies)):
+                ordered = sorted(self.latencies[name])
+                counts = self.counters[name]
+                operations[name] = {
+                    'successes': counts['success'],
+                    'failures': counts['failure'],
+                    'retries': counts['retry'],
+                    'rejected': counts['rejected'],
+                    'p50_ms': self._percentile(ordered, 0.5),
+                    'p95_ms': self._percentile(ordered, 0.95),
+                }
+            return operations
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.latencies.clear()
+
+
+# Shared by every client in the process: they all talk to the same provider
+provider_breaker = CircuitBreaker('gemini')
+llm_metrics = LLMMetrics()
+
+
+# ==================== Client ====================
+
+class ResilientLLMClient:
+    """
+    OpenAI-compatible client with timeouts, retries, a circuit breaker and metrics
+    """
+
+    def __init__(self, api_key, base_url, breaker=None, metrics=None, operations=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.breaker = breaker or provider_breaker
+        self.metrics = metrics or llm_metrics
+        self.operations = {**OPERATIONS, **(operations or {})}
+        self.http = DefaultHttpxClient()
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0, http_client=self.http)
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> (AsyncOpenAI, its httpx client)
+        self._last_used = 0.0
+        self._async_last_used = weakref.WeakKeyDictionary()  # event loop -> monotonic time
+
+    def _async_pair(self):
+        loop = asyncio.get_running_loop()
+        pair = self._async_clients.get(loop)
+        if pair is None:
+            http = DefaultAsyncHttpxClient()
+            pair = (AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0, http_client=http), http)
+            self._async_clients[loop] = pair
+        return pair
+
+    def async_client(self):
+        """
+        AsyncOpenAI client for the running event loop (its connection pool is loop-bound)
+        """
+        return self._async_pair()[0]
+
+    # ==================== Warm-up ====================
+
+    def _warm_timeout(self):
+        return httpx.Timeout(self.operations['chat_stream'].timeout.connect)
+
+    def warm(self):
+        """
+        Open a pooled connection to the provider unless one is likely still alive
+
+        Any HTTP answer will do (the request is unauthenticated and cheap); failures are
+        ignored because the real call will report them.
+
+        Returns:
+            bool: Whether a warm-up request was sent
+        """
+        now = time.monotonic()
+        if now - self._last_used < WARM_CONNECTION_SECONDS or self.breaker.state == CircuitBreaker.OPEN:
+            return False
+        self._last_used = now
+        try:
+            self.http.head(self.base_url, timeout=self._warm_timeout())
+        except httpx.HTTPError as e:
+            logger.info(f'LLM connection warm-up failed: {e}')
+        return True
+
+    async def awarm(self):
+        """
+        Async variant of warm() for the running event loop's pool
+        """
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        if (now - self._async_last_used.get(loop, 0.0) < WARM_CONNECTION_SECONDS
+                or self.breaker.state == CircuitBreaker.OPEN):
+            return False
+        self._async_last_used[loop] = now
+        http = self._async_pair()[1]
+        try:
+            await http.head(self.base_url, timeout=self._warm_timeout())
+        except httpx.HTTPError as e:
+            logger.info(f'LLM connection warm-up failed: {e}')
+        return True
+
+    def _admit(self, operation):
+        if not self.breaker.allow():
+            self.metrics.record(operation.name, 'rejected')
+            raise LLMUnavailableError('AI service is temporarily unavailable, please try again shortly')
+
+    def _settle(self, operation, error, attempt, started):
+        """
+        Record a failed attempt. Returns True if it should be retried.
+        """
+        latency = time.monotonic() - started
+        if is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            # The provider answered (e.g. 400/401), so it isn't degraded
+            self.breaker.record_success()
+        self.metrics.record(operation.name, 'failure', latency)
+
+        if is_retryable(error) and attempt < operation.max_attempts:
+            self.metrics.record(operation.name, 'retry')
+            return True
+        return False
+
+    def _call(self, name, request):
+        operation = self.operations[name]
+        for attempt in range(1, operation.max_attempts + 1):
+            self._admit(operation)
+            started = self._last_used = time.monotonic()
+            try:
+                result = request(timeout=operation.timeout)
+            except Exception as e:
+                if not self._settle(operation, e, attempt, started):
+                    raise LLMError(f'{name} failed: {e}') from e
+                time.sleep(backoff_delay(attempt, e))
+                continue
+            self.breaker.record_success()
+            self.metrics.record(name, 'success', time.monotonic() - started)
+            return result
+
+    async def _acall(self, name, request):
+        operation = self.operations[name]
+        for attempt in range(1, operation.max_attempts + 1):
+            self._admit(operation)
+            started = self._async_last_used[asyncio.get_running_loop()] = time.monotonic()
+            try:
+                result = await request(timeout=operation.timeout)
+            except Exception as e:
+                if not self._settle(operation, e, attempt, started):
+                    raise LLMError(f'{name} failed: {e}') from e
+                await asyncio.sleep(backoff_delay(attempt, e))
+                continue
+            self.breaker.record_success()
+            self.metrics.record(name, 'success', time.monotonic() - started)
+            return result
+
+    def complete(self, operation, **params):
+        """
+        Chat completion (non-streaming)
+
+        Args:
+            operation: Key of OPERATIONS selecting the timeout and retry policy
+            **params: Passed to chat.completions.create
+
+        Raises:
+            LLMUnavailableError: The circuit is open
+            LLMError: The call failed after retries
+        """
+        return self._call(operation, lambda **kw: self.client.chat.completions.create(**params, **kw))
+
+    def stream(self, operation, **params):
+        """
+        Open a streaming chat completion; retried only while opening
+        """
+        return self._call(
+            operation, lambda **kw: self.client.chat.completions.create(stream=True, **params, **kw)
+        )
+
+    async def astream(self, operation, **params):
+        """
+        Async variant of stream()
+        """
+        client = self.async_client()
+        return await self._acall(
+            operation, lambda **kw: client.chat.completions.create(stream=True, **params, **kw)
+        )
+
+    def embed(self, **params):
+        return self._call('embeddings', lambda **kw: self.client.embeddings.create(**params, **kw))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from api.models import BlogPost, calculate_reading_stats
+
+
+class Command(BaseCommand):
+    help = 'Backfill stored word_count and read_time for blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute stats for every post, not just those missing a word count',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of posts written per bulk update',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        blogs = BlogPost.objects.only('id', 'content', 'word_count', 'read_time').order_by('id')
+        if not options['all']:
+            blogs = blogs.filter(word_count=0).exclude(content='')
+
+        total = blogs.count()
+        if not total:
+            self.stdout.write(self.style.SUCCESS('No blog posts need reading stats'))
+            return
+
+        self.stdout.write(f'Updating reading stats for {total} blog posts...')
+
+        pending = []
+        updated = 0
+        for blog in blogs.iterator(chunk_size=batch_size):
+            word_count, read_time = calculate_reading_stats(blog.content)
+            if (word_count, read_time) == (blog.word_count, blog.read_time):
+                continue
+            blog.word_count, blog.read_time = word_count, read_time
+            pending.append(blog)
+
+            if len(pending) >= batch_size:
+                BlogPost.objects.bulk_update(pending, ['word_count', 'read_time'])
+                updated += len(pending)
+                pending = []
+
+        if pending:
+            BlogPost.objects.bulk_update(pending, ['word_count', 'read_time'])
+            updated += len(pending)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated: {updated}'))
+        self.stdout.write(self.style.SUCCESS('Done!'))
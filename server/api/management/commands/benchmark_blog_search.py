@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from api.models import BlogPost
+from api.search import icontains_search, search_blog_posts, full_text_search_supported
+
+
+DEFAULT_TERMS = ['blockchain', 'data privacy', 'smart contract', 'artificial intelligence regulation']
+
+
+class Command(BaseCommand):
+    help = 'Compare blog search latency: legacy icontains vs weighted full-text search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'terms',
+            nargs='*',
+            help='Search terms to benchmark (defaults to a built-in set)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Number of timed runs per term and strategy',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Rows fetched per query (one listing page)',
+        )
+
+    def handle(self, *args, **options):
+        terms = options['terms'] or DEFAULT_TERMS
+        iterations = options['iterations']
+        limit = options['limit']
+
+        if not full_text_search_supported():
+            self.stdout.write(self.style.WARNING(
+                'Database is not PostgreSQL - full-text search falls back to icontains'
+            ))
+
+        base = BlogPost.objects.filter(is_published=True)
+        self.stdout.write(f'Benchmarking {len(terms)} terms over {base.count()} published posts '
+                          f'({iterations} iterations, {limit} rows per query)')
+        self.stdout.write('')
+
+        strategies = [
+            ('icontains', lambda term: icontains_search(base, term).order_by('-publish_date')),
+            ('fulltext', lambda term: search_blog_posts(base, term).order_by('-rank', '-publish_date')),
+        ]
+
+        for term in terms:
+            self.stdout.write(self.style.SUCCESS(f'"{term}"'))
+            for name, build in strategies:
+                # Warm up once so connection setup and plan caching are not measured
+                list(build(term).values_list('id', flat=True)[:limit])
+
+                timings = []
+                rows = 0
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    rows = len(list(build(term).values_list('id', flat=True)[:limit]))
+                    timings.append((time.perf_counter() - start) * 1000)
+
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f'  {name:<10} mean {statistics.mean(timings):8.2f} ms  '
+                    f'p50 {statistics.median(timings):8.2f} ms  p95 {p95:8.2f} ms  rows {rows}'
+                )
+            self.stdout.write('')
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from api.embeddings import get_embedder, sync_embeddings
+
+
+class Command(BaseCommand):
+    help = 'Embed new or changed blog posts, associate bios and grant descriptions for Solo semantic retrieval'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=32,
+            help='Chunks sent to the embedder per request (default: 32)',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Re-embed every chunk, even unchanged ones',
+        )
+
+    def handle(self, *args, **options):
+        embedder = get_embedder()
+        self.stdout.write(f'Embedding documents with {embedder.key}...')
+
+        start = time.perf_counter()
+        stats = sync_embeddings(embedder, batch_size=options['batch_size'], rebuild=options['rebuild'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(f'Embedded: {stats["embedded"]} chunks in {elapsed:.2f}s'))
+        self.stdout.write(f'Unchanged: {stats["unchanged"]}')
+        if stats['deleted']:
+            self.stdout.write(self.style.WARNING(f'Deleted stale: {stats["deleted"]}'))
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -1,6 +1,62 @@
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 from django.core.management.base import BaseCommand
 from api.models import BlogPost
-from api.ai_service import get_ai_service
+from api.ai_service import get_ai_service, overview_input_hash
+from api.overview_jobs import overview_is_current, run_overview_job, store_overviews
+
+DEFAULT_CHECKPOINT = '.generate_ai_overviews.checkpoint'
+
+
+class RequestRateLimiter:
+    """
+    Spaces request starts evenly so all workers together stay under `per_minute`
+    """
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+
+class Checkpoint:
+    """
+    IDs of posts already handled by an interrupted run, one per line
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = {int(line) for line in f if line.strip().isdigit()}
+
+    def record(self, post_ids):
+        if not self.path or not post_ids:
+            return
+        with open(self.path, 'a') as f:
+            f.writelines(f'{post_id}\n' for post_id in post_ids)
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(post_ids)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = set()
 
 
 class Command(BaseCommand):
@@ -17,11 +73,55 @@ class Command(BaseCommand):
             type=str,
             help='Generate AI overview for a specific blog post by slug',
         )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Call the model even when the stored overview matches the current content',
+        )
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Run background overview jobs that are still pending or have failed',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Overviews generated concurrently (default: 1)',
+        )
+        parser.add_argument(
+            '--rpm',
+            type=int,
+            default=60,
+            help='Maximum model requests per minute across all workers, 0 for no limit (default: 60)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Overviews saved per bulk update and checkpoint (default: 20)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            default=DEFAULT_CHECKPOINT,
+            help=f'File recording finished post IDs so an interrupted run resumes (default: {DEFAULT_CHECKPOINT})',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore and delete an existing checkpoint',
+        )
 
     def handle(self, *args, **options):
         regenerate = options['regenerate']
+        force = options['force']
         slug = options.get('slug')
 
+        if options['pending']:
+            self.run_pending_jobs()
+            return
+
         ai_service = get_ai_service()
 
         # Get blogs to process
@@ -41,30 +141,125 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS('No blog posts need AI overview generation'))
             return
 
+        checkpoint = Checkpoint(None if slug else options['checkpoint'])
+        if options['restart']:
+            checkpoint.clear()
+        elif checkpoint.done:
+            self.stdout.write(self.style.WARNING(
+                f'Resuming: {len(checkpoint.done)} posts already done (use --restart to start over)'
+            ))
+
+        workers = max(1, options['workers'])
+        batch_size = max(1, options['batch_size'])
+        limiter = RequestRateLimiter(options['rpm'])
+
+        def generate(blog):
+            limiter.wait()
+            started = time.perf_counter()
+            overview = ai_service.generate_overview(blog.title, blog.content)
+            return overview, time.perf_counter() - started
+
         success_count = 0
+        skipped_count = 0
+        resumed_count = 0
         error_count = 0
+        latencies = []
+        batch = []       # (post_id, overview, input_hash) waiting for the next bulk update
+        finished = []    # Post IDs to checkpoint with that update
+
+        def flush():
+            store_overviews(batch)
+            checkpoint.record(finished)
+            batch.clear()
+            finished.clear()
+
+        run_started = time.perf_counter()
+        in_flight = {}
+        posts = blogs.only('id', 'title', 'content', 'ai_overview', 'ai_overview_hash').order_by('id')
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='overview') as executor:
+            def collect(done):
+                nonlocal success_count, error_count
+                for future in done:
+                    blog = in_flight.pop(future)
+                    try:
+                        overview, latency = future.result()
+                    except Exception as e:
+                        error_count += 1
+                        self.stdout.write(self.style.ERROR(f'  ✗ "{blog.title}": {str(e)}'))
+                        continue
+                    latencies.append(latency)
+                    batch.append((blog.id, overview, overview_input_hash(blog.title, blog.content)))
+                    finished.append(blog.id)
+                    success_count += 1
+                    self.stdout.write(self.style.SUCCESS(
+                        f'  ✓ "{blog.title}" ({len(overview)} chars, {latency:.1f}s)'
+                    ))
+                if len(batch) >= batch_size:
+                    flush()
 
-        for blog in blogs:
             try:
-                self.stdout.write(f'Processing: "{blog.title}"...')
+                for blog in posts.iterator(chunk_size=100):
+                    if blog.id in checkpoint.done:
+                        resumed_count += 1
+                        continue
 
-                # Generate AI overview
-                overview = ai_service.generate_overview(blog.title, blog.content)
+                    # Skip posts whose overview was generated from the same input
+                    if not force and overview_is_current(blog):
+                        skipped_count += 1
+                        finished.append(blog.id)
+                        continue
 
-                # Save to database
-                blog.ai_overview = overview
-                blog.save(update_fields=['ai_overview'])
+                    # Keep a bounded number of posts (and their content) in memory
+                    while len(in_flight) >= workers * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    self.stdout.write(f'Processing: "{blog.title}"...')
+                    in_flight[executor.submit(generate, blog)] = blog
 
-                success_count += 1
-                self.stdout.write(self.style.SUCCESS(f'  ✓ Generated ({len(overview)} chars)'))
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+            finally:
+                # Save whatever finished, even when interrupted
+                flush()
 
-            except Exception as e:
-                error_count += 1
-                self.stdout.write(self.style.ERROR(f'  ✗ Error: {str(e)}'))
+        elapsed = time.perf_counter() - run_started
+        if not error_count:
+            checkpoint.clear()
 
         # Summary
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS(f'Successfully generated: {success_count}'))
+        if skipped_count > 0:
+            self.stdout.write(f'Skipped (unchanged): {skipped_count}')
+        if resumed_count > 0:
+            self.stdout.write(f'Skipped (done in an earlier run): {resumed_count}')
         if error_count > 0:
-            self.stdout.write(self.style.ERROR(f'Failed: {error_count}'))
+            self.stdout.write(self.style.ERROR(f'Failed: {error_count} (run again to retry them)'))
+        if latencies:
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f'Throughput: {success_count / elapsed * 60:.1f} overviews/min over {elapsed:.1f}s '
+                f'({workers} workers)'
+            )
+            self.stdout.write(f'Latency: p50 {statistics.median(latencies):.2f}s  p95 {p95:.2f}s')
+        self.stdout.write(self.style.SUCCESS('Done!'))
+
+    def run_pending_jobs(self):
+        post_ids = list(
+            BlogPost.objects.filter(ai_overview_status__in=['pending', 'failed']).values_list('id', flat=True)
+        )
+        self.stdout.write(self.style.SUCCESS(f'Found {len(post_ids)} pending or failed overview jobs'))
+
+        results = {'ready': 0, 'failed': 0}
+        for post_id in post_ids:
+            status = run_overview_job(post_id)
+            if status in results:
+                results[status] += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully generated: {results["ready"]}'))
+        if results['failed']:
+            self.stdout.write(self.style.ERROR(f'Failed: {results["failed"]}'))
         self.stdout.write(self.style.SUCCESS('Done!'))
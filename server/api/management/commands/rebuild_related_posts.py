@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+from api.related_posts import rebuild_all_related_posts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed related posts index for all published blog posts'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding related posts index...')
+        start = time.perf_counter()
+        count = rebuild_all_related_posts()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} published posts in {elapsed:.2f}s'))
+        self.stdout.write(self.style.SUCCESS('Done!'))
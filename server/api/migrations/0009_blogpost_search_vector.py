@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    BlogPost = apps.get_model('api', 'BlogPost')
+    schema_editor.add_index(
+        BlogPost,
+        django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blog_posts_search_gin'),
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    BlogPost = apps.get_model('api', 'BlogPost')
+    schema_editor.remove_index(
+        BlogPost,
+        django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blog_posts_search_gin'),
+    )
+
+
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    BlogPost = apps.get_model('api', 'BlogPost')
+    BlogPost.objects.update(
+        search_vector=(
+            SearchVector('title', weight='A', config='english') +
+            SearchVector('excerpt', weight='B', config='english') +
+            SearchVector('content', weight='C', config='english')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_consultationservice_consultationbooking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='Weighted full-text index of title, excerpt and content', null=True),
+        ),
+        # GIN indexes only exist on PostgreSQL; keep the index in migration
+        # state everywhere but only create it on PostgreSQL.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='blogpost',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blog_posts_search_gin'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_blogpost_reading_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogPostDailyView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='api.blogpost')),
+            ],
+            options={
+                'verbose_name': 'Blog Post Daily Views',
+                'verbose_name_plural': 'Blog Post Daily Views',
+                'db_table': 'blog_post_daily_views',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='blog_post_d_date_79cdbc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'date'), name='unique_blog_post_daily_view')],
+            },
+        ),
+    ]
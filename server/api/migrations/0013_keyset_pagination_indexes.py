@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:24
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_relatedpost'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='consultationbooking',
+            name='consultatio_created_bd446c_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(models.OrderBy(django.db.models.functions.comparison.Coalesce('publish_date', 'created_at'), descending=True), models.OrderBy(models.F('id'), descending=True), name='blog_posts_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationbooking',
+            index=models.Index(fields=['-created_at', '-id'], name='booking_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['-created_at', '-id'], name='contact_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+def mark_existing_overviews_ready(apps, schema_editor):
+    BlogPost = apps.get_model('api', 'BlogPost')
+    BlogPost.objects.exclude(ai_overview__isnull=True).exclude(ai_overview='').update(ai_overview_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='ai_overview_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='ai_overview_error',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='ai_overview_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='', help_text='State of the background overview job (blank if never requested)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='ai_overview_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(mark_existing_overviews_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:29
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+
+def hash_existing_overviews(apps, schema_editor):
+    # Existing overviews are assumed to match the current content (same rules as
+    # api.ai_service.overview_input_hash, frozen here)
+    BlogPost = apps.get_model('api', 'BlogPost')
+    posts = list(
+        BlogPost.objects.exclude(ai_overview__isnull=True).exclude(ai_overview='').only('id', 'title', 'content')
+    )
+    for post in posts:
+        normalized = f'{post.title or ""}\n{re.sub("<[^<]+?>", "", post.content or "")[:3000]}'
+        post.ai_overview_hash = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    BlogPost.objects.bulk_update(posts, ['ai_overview_hash'], batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_blogpost_ai_overview_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='ai_overview_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Hash of the title and normalized content the overview was generated from', max_length=64),
+        ),
+        migrations.RunPython(hash_existing_overviews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_blogpost_ai_overview_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('embedder', models.CharField(help_text='Embedder name and dimensions', max_length=100)),
+                ('kind', models.CharField(choices=[('blog_posts', 'Blog Post'), ('associates', 'Associate'), ('grants', 'Grant')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('chunk', models.PositiveSmallIntegerField(default=0)),
+                ('text_hash', models.CharField(help_text='SHA-256 of the embedded chunk text', max_length=64)),
+                ('vector', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'document_embeddings',
+                'ordering': ['embedder', 'kind', 'object_id', 'chunk'],
+                'constraints': [models.UniqueConstraint(fields=('embedder', 'kind', 'object_id', 'chunk'), name='unique_document_embedding_chunk')],
+            },
+        ),
+    ]
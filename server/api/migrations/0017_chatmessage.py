@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def backfill_chat_messages(apps, schema_editor):
+    """Copy each conversation's messages JSON into ChatMessage rows"""
+    AIConversation = apps.get_model('api', 'AIConversation')
+    ChatMessage = apps.get_model('api', 'ChatMessage')
+
+    for conversation in AIConversation.objects.only('id', 'messages', 'updated_at').iterator():
+        messages = conversation.messages if isinstance(conversation.messages, list) else []
+        rows = []
+        for seq, message in enumerate(messages, start=1):
+            if not isinstance(message, dict):
+                continue
+            created_at = parse_datetime(message.get('timestamp') or '') or conversation.updated_at or timezone.now()
+            rows.append(ChatMessage(
+                conversation_id=conversation.id, seq=seq, role=message.get('role', 'user'),
+                content=message.get('content') or '', created_at=created_at,
+            ))
+        ChatMessage.objects.bulk_create(rows, batch_size=500)
+        AIConversation.objects.filter(id=conversation.id).update(message_count=len(messages))
+
+
+def restore_message_json(apps, schema_editor):
+    AIConversation = apps.get_model('api', 'AIConversation')
+    ChatMessage = apps.get_model('api', 'ChatMessage')
+
+    for conversation in AIConversation.objects.only('id').iterator():
+        conversation.messages = [
+            {'role': role, 'content': content, 'timestamp': created_at.isoformat()}
+            for role, content, created_at in ChatMessage.objects.filter(
+                conversation_id=conversation.id
+            ).order_by('seq').values_list('role', 'content', 'created_at')
+        ]
+        conversation.save(update_fields=['messages'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_documentembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiconversation',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ChatMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('role', models.CharField(choices=[('user', 'User'), ('assistant', 'Assistant')], max_length=20)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_messages', to='api.aiconversation')),
+            ],
+            options={
+                'db_table': 'ai_chat_messages',
+                'ordering': ['conversation', 'seq'],
+                'constraints': [models.UniqueConstraint(fields=('conversation', 'seq'), name='unique_chat_message_seq')],
+            },
+        ),
+        migrations.RunPython(backfill_chat_messages, restore_message_json),
+        migrations.RemoveField(
+            model_name='aiconversation',
+            name='messages',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_chatmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiconversation',
+            name='summary',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='aiconversation',
+            name='summary_through_seq',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Last message seq folded into the summary'),
+        ),
+    ]
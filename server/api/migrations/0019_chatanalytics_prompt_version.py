@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_aiconversation_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='prompt_version',
+            field=models.CharField(blank=True, default='', help_text='System prompt template and version used (e.g. solo_system@v1)', max_length=100),
+        ),
+    ]
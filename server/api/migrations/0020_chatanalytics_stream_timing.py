@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_chatanalytics_prompt_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='time_to_first_token_ms',
+            field=models.IntegerField(blank=True, help_text='Milliseconds until the first chunk of the answer was sent', null=True),
+        ),
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='completion_tokens',
+            field=models.IntegerField(blank=True, help_text='Estimated tokens in the answer', null=True),
+        ),
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='tokens_per_second',
+            field=models.FloatField(blank=True, help_text='Streaming rate after the first token', null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_chatanalytics_stream_timing'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grant',
+            index=models.Index(fields=['order_priority', '-created_at', '-id'], name='grant_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(fields=['order_priority', '-created_at', '-id'], name='testimonial_keyset_idx'),
+        ),
+    ]
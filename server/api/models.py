@@ -2,7 +2,10 @@ import random
 import string
 
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -62,6 +65,28 @@ class Associate(models.Model):
         return f"{self.name} - {self.title}"
 
 
+class BlogCategoryQuerySet(models.QuerySet):
+    def with_published_count(self):
+        """
+        Annotate `published_count` (number of published posts) per category
+
+        Uses a correlated subquery rather than Count() over the relation so the
+        annotation stays correct when used inside a categories Prefetch.
+        """
+        through = BlogPost.categories.through
+        counts = (
+            through.objects
+            .filter(blogcategory_id=models.OuterRef('pk'), blogpost__is_published=True)
+            .order_by()
+            .values('blogcategory_id')
+            .annotate(total=models.Count('*'))
+            .values('total')
+        )
+        return self.annotate(
+            published_count=Coalesce(models.Subquery(counts, output_field=models.IntegerField()), 0)
+        )
+
+
 class BlogCategory(models.Model):
     """
     Model for blog categories
@@ -74,6 +99,8 @@ class BlogCategory(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BlogCategoryQuerySet.as_manager()
+
     class Meta:
         db_table = 'blog_categories'
         ordering = ['order_priority', 'name']
@@ -89,10 +116,40 @@ class BlogCategory(models.Model):
         return self.name
 
 
+WORDS_PER_MINUTE = 200
+
+
+def calculate_reading_stats(content):
+    """
+    Return (word_count, read_time) for a blog post body
+    Read time is in minutes, assuming 200 words per minute
+    """
+    word_count = len((content or '').split())
+    read_time = max(1, round(word_count / WORDS_PER_MINUTE))
+    return word_count, read_time
+
+
+class BlogPostQuerySet(models.QuerySet):
+    def with_list_relations(self):
+        """
+        Load everything the blog serializers touch in a fixed number of queries:
+        the author via a join, and categories (with published counts) via one prefetch
+        """
+        return self.select_related('author').prefetch_related(
+            models.Prefetch('categories', queryset=BlogCategory.objects.with_published_count())
+        )
+
+
 class BlogPost(models.Model):
     """
     Model for blog posts
     """
+    AI_OVERVIEW_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     excerpt = models.TextField(max_length=500, help_text="Short summary of the blog post")
@@ -107,6 +164,17 @@ class BlogPost(models.Model):
     meta_keywords = models.CharField(max_length=255, blank=True, null=True)
 
     ai_overview = models.TextField(blank=True, null=True, help_text="AI-generated summary")
+    ai_overview_status = models.CharField(
+        max_length=20, choices=AI_OVERVIEW_STATUS_CHOICES, blank=True, default='',
+        help_text="State of the background overview job (blank if never requested)"
+    )
+    ai_overview_hash = models.CharField(
+        max_length=64, blank=True, default='', editable=False,
+        help_text="Hash of the title and normalized content the overview was generated from"
+    )
+    ai_overview_attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    ai_overview_error = models.TextField(blank=True, default='', editable=False)
+    ai_overview_updated_at = models.DateTimeField(blank=True, null=True, editable=False)
 
     is_published = models.BooleanField(default=False)
     is_featured = models.BooleanField(default=False)
@@ -114,10 +182,20 @@ class BlogPost(models.Model):
 
     view_count = models.IntegerField(default=0)
 
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    read_time = models.PositiveIntegerField(default=1, editable=False, help_text="Estimated read time in minutes")
+
+    search_vector = SearchVectorField(
+        blank=True, null=True, editable=False,
+        help_text="Weighted full-text index of title, excerpt and content"
+    )
+
     publish_date = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BlogPostQuerySet.as_manager()
+
     class Meta:
         db_table = 'blog_posts'
         ordering = ['order_priority', '-publish_date', '-created_at']
@@ -127,27 +205,116 @@ class BlogPost(models.Model):
             models.Index(fields=['slug']),
             models.Index(fields=['-publish_date']),
             models.Index(fields=['is_published']),
+            models.Index(
+                Coalesce('publish_date', 'created_at').desc(), models.F('id').desc(),
+                name='blog_posts_keyset_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='blog_posts_search_gin'),
         ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+
+        # Keep reading stats in sync with the body so listings never need to load it
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.word_count, self.read_time = calculate_reading_stats(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'word_count', 'read_time'}
+
         super().save(*args, **kwargs)
 
+        from .search import SEARCH_FIELDS
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(SEARCH_FIELDS):
+            self.update_search_vector()
+
+    def update_search_vector(self):
+        """
+        Recompute the stored search vector in the database (PostgreSQL only)
+        """
+        from .search import blog_search_vector, full_text_search_supported
+        if not full_text_search_supported():
+            return
+        BlogPost.objects.filter(pk=self.pk).update(search_vector=blog_search_vector())
+
     def increment_view_count(self):
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        """
+        Record a page view. Views are buffered and flushed in batches
+        with F() expressions, so concurrent hits are never lost.
+        """
+        from .view_counter import record_view
+        record_view(self.pk)
 
     def __str__(self):
         return self.title
 
 
+class RelatedPost(models.Model):
+    """
+    Precomputed related posts for a blog post (see api/related_posts.py)
+    """
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_post_links')
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_by_links')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField(help_text="0 is the most related")
+
+    class Meta:
+        db_table = 'blog_related_posts'
+        ordering = ['post', 'rank']
+        verbose_name = 'Related Post'
+        verbose_name_plural = 'Related Posts'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='unique_related_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.3f})"
+
+
+class BlogPostDailyView(models.Model):
+    """
+    Per-post, per-day view totals for traffic charts
+    """
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='daily_views')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'blog_post_daily_views'
+        ordering = ['-date']
+        verbose_name = 'Blog Post Daily Views'
+        verbose_name_plural = 'Blog Post Daily Views'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'date'], name='unique_blog_post_daily_view'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} - {self.date}: {self.views}"
+
+
 class AIConversation(models.Model):
     """
     Model for storing Solo AI assistant conversations
+    Messages live in ChatMessage rows; message_count is the last allocated seq.
     """
+    HISTORY_LIMIT = 10
+
     session_id = models.CharField(max_length=255, unique=True, db_index=True)
-    messages = models.JSONField(default=list, help_text="List of message objects")
+    message_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Rolling summary of messages that no longer fit the history token budget
+    summary = models.TextField(blank=True, default='', editable=False)
+    summary_through_seq = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Last message seq folded into the summary"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -158,26 +325,89 @@ class AIConversation(models.Model):
         verbose_name = 'AI Conversation'
         verbose_name_plural = 'AI Conversations'
 
+    def _history_queryset(self, limit):
+        return self.chat_messages.order_by('-seq').values('role', 'content')[:limit]
+
+    def get_history(self, limit=HISTORY_LIMIT):
+        """
+        Return the last `limit` messages, oldest first, as {'role', 'content'} dicts
+        (an indexed ORDER BY seq DESC LIMIT n)
+        """
+        return list(self._history_queryset(limit))[::-1]
+
+    async def aget_history(self, limit=HISTORY_LIMIT):
+        """Async version of get_history"""
+        return [message async for message in self._history_queryset(limit)][::-1]
+
+    def append_messages(self, messages):
+        """
+        Append (role, content) pairs with one INSERT instead of rewriting the whole history
+
+        The seqs are allocated by incrementing message_count in the database, in the
+        same transaction as the insert; the UPDATE's row lock makes concurrent turns
+        of one conversation take consecutive, non-overlapping ranges.
+        """
+        from django.db import transaction
+        from django.utils import timezone
+
+        now = timezone.now()
+        with transaction.atomic():
+            AIConversation.objects.filter(pk=self.pk).update(
+                message_count=models.F('message_count') + len(messages), updated_at=now
+            )
+            last_seq = AIConversation.objects.filter(pk=self.pk).values_list('message_count', flat=True).get()
+            first_seq = last_seq - len(messages) + 1
+            ChatMessage.objects.bulk_create([
+                ChatMessage(conversation=self, seq=first_seq + offset, role=role, content=content, created_at=now)
+                for offset, (role, content) in enumerate(messages)
+            ])
+        self.message_count = last_seq
+
+    async def aappend_messages(self, messages):
+        """Async version of append_messages (the transaction runs in a worker thread)"""
+        from asgiref.sync import sync_to_async
+
+        await sync_to_async(self.append_messages)(messages)
+
     def add_message(self, role, content):
         """
         Add a message to the conversation
         role: 'user' or 'assistant'
         """
-        from django.utils import timezone
-        message = {
-            'role': role,
-            'content': content,
-            'timestamp': timezone.now().isoformat()
-        }
-        if not isinstance(self.messages, list):
-            self.messages = []
-        self.messages.append(message)
-        self.save()
+        self.append_messages([(role, content)])
 
     def __str__(self):
         return f"Conversation {self.session_id}"
 
 
+class ChatMessage(models.Model):
+    """
+    One message of a Solo conversation, numbered by `seq` within it
+    """
+    ROLE_CHOICES = [
+        ('user', 'User'),
+        ('assistant', 'Assistant'),
+    ]
+
+    conversation = models.ForeignKey(AIConversation, on_delete=models.CASCADE, related_name='chat_messages')
+    seq = models.PositiveIntegerField()
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+    content = models.TextField()
+
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'ai_chat_messages'
+        ordering = ['conversation', 'seq']
+        constraints = [
+            # Also the index behind history reads (conversation_id = ? ORDER BY seq DESC)
+            models.UniqueConstraint(fields=['conversation', 'seq'], name='unique_chat_message_seq'),
+        ]
+
+    def __str__(self):
+        return f"{self.conversation.session_id} #{self.seq} ({self.role})"
+
+
 class ContactSubmission(models.Model):
     """
     Model for contact form submissions
@@ -204,6 +434,9 @@ class ContactSubmission(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Contact Submission'
         verbose_name_plural = 'Contact Submissions'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='contact_keyset_idx'),
+        ]
 
     def mark_as_read(self):
         self.status = 'read'
@@ -255,6 +488,7 @@ class Testimonial(models.Model):
         indexes = [
             models.Index(fields=['order_priority']),
             models.Index(fields=['is_active', 'is_featured']),
+            models.Index(fields=['order_priority', '-created_at', '-id'], name='testimonial_keyset_idx'),
         ]
 
     def __str__(self):
@@ -364,6 +598,7 @@ class Grant(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['is_active', 'is_featured']),
             models.Index(fields=['application_deadline']),
+            models.Index(fields=['order_priority', '-created_at', '-id'], name='grant_keyset_idx'),
         ]
 
     def save(self, *args, **kwargs):
@@ -404,12 +639,33 @@ class ChatAnalytics(models.Model):
     user_message = models.TextField()
     ai_response = models.TextField()
     response_time_ms = models.IntegerField(help_text="Response time in milliseconds")
+    time_to_first_token_ms = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Milliseconds until the first chunk of the answer was sent"
+    )
+    completion_tokens = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Estimated tokens in the answer"
+    )
+    tokens_per_second = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Streaming rate after the first token"
+    )
 
     # Context tracking
     context_used = models.JSONField(
         default=dict,
         help_text="What context was injected (blog_posts, associates, etc)"
     )
+    prompt_version = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="System prompt template and version used (e.g. solo_system@v1)"
+    )
 
     # User engagement
     user_clicked_action = models.BooleanField(
@@ -440,6 +696,40 @@ class ChatAnalytics(models.Model):
         return f"Chat {self.session_id[:8]}... - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
 
 
+class DocumentEmbedding(models.Model):
+    """
+    Embedding of one chunk of a blog post, associate bio or grant description
+    (see api/embeddings.py). Vectors are stored as raw float32 bytes and loaded
+    into a single NumPy matrix for search.
+    """
+    KIND_CHOICES = [
+        ('blog_posts', 'Blog Post'),
+        ('associates', 'Associate'),
+        ('grants', 'Grant'),
+    ]
+
+    embedder = models.CharField(max_length=100, help_text="Embedder name and dimensions")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    chunk = models.PositiveSmallIntegerField(default=0)
+    text_hash = models.CharField(max_length=64, help_text="SHA-256 of the embedded chunk text")
+    vector = models.BinaryField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'document_embeddings'
+        ordering = ['embedder', 'kind', 'object_id', 'chunk']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['embedder', 'kind', 'object_id', 'chunk'], name='unique_document_embedding_chunk'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} chunk {self.chunk} ({self.embedder})"
+
+
 def generate_booking_reference():
     """Generate a unique booking reference like LF-XXXX-XXXX"""
     chars = string.ascii_uppercase + string.digits
@@ -591,7 +881,7 @@ class ConsultationBooking(models.Model):
             models.Index(fields=['paystack_reference']),
             models.Index(fields=['status']),
             models.Index(fields=['client_email']),
-            models.Index(fields=['-created_at']),
+            models.Index(fields=['-created_at', '-id'], name='booking_keyset_idx'),
             models.Index(fields=['preferred_date']),
         ]
 
@@ -0,0 +1,222 @@
+"""
+Background AI overview generation
+
+Blog writes only mark the post as pending and enqueue a job; the Gemini call
+runs after the transaction commits on a small worker pool, so the admin's
+save request returns immediately. Failed calls are retried with exponential
+backoff before the post is marked as failed. The admin UI polls
+GET /api/v1/blogs/<slug>/ai-overview/ for the result.
+
+Generation is memoized on a hash of the exact model input (title plus the
+stripped, truncated content), so edits that do not change that input reuse
+the stored overview instead of calling the LLM again.
+
+Serverless workers may be frozen once the response is sent, so anything left
+pending or failed can be picked up by `manage.py generate_ai_overviews --pending`.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+AI_OVERVIEW_MEMO_TIMEOUT = 60 * 60 * 24  # Ad-hoc overviews (no post) kept for a day
+
+_executor = None
+_lock = threading.Lock()
+_queued = set()   # Posts with a job waiting or running
+_rerun = set()    # Posts edited again while their job was running
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_setting('AI_OVERVIEW_WORKERS', 2),
+                thread_name_prefix='ai-overview',
+            )
+        return _executor
+
+
+def needs_overview(post, content_changed=False, regenerate=False):
+    """
+    Decide whether a saved post needs a (new) overview
+    """
+    if not post.content:
+        return False
+    return bool(
+        not post.ai_overview or
+        regenerate or
+        (content_changed and len(post.content) > 100)
+    )
+
+
+def overview_is_current(post):
+    """Check if the stored overview was generated from the post's current title and content"""
+    from .ai_service import overview_input_hash
+    return bool(post.ai_overview) and post.ai_overview_hash == overview_input_hash(post.title, post.content)
+
+
+def store_overview(post_id, overview, input_hash, **extra):
+    """Save a freshly generated overview with the hash of its input"""
+    from .models import BlogPost
+    from .response_cache import purge_tags, tag_for_model
+
+    BlogPost.objects.filter(pk=post_id).update(
+        ai_overview=overview, ai_overview_hash=input_hash, ai_overview_status='ready',
+        ai_overview_error='', ai_overview_updated_at=timezone.now(), **extra
+    )
+    purge_tags(tag_for_model(BlogPost))
+
+
+def store_overviews(results):
+    """
+    Save many generated overviews with one bulk UPDATE and one cache purge
+
+    Args:
+        results: Iterable of (post_id, overview, input_hash)
+
+    Returns:
+        int: Number of posts written
+    """
+    from .models import BlogPost
+    from .response_cache import purge_tags, tag_for_model
+
+    now = timezone.now()
+    posts = [
+        BlogPost(
+            pk=post_id, ai_overview=overview, ai_overview_hash=input_hash, ai_overview_status='ready',
+            ai_overview_error='', ai_overview_updated_at=now,
+        )
+        for post_id, overview, input_hash in results
+    ]
+    if not posts:
+        return 0
+    BlogPost.objects.bulk_update(posts, [
+        'ai_overview', 'ai_overview_hash', 'ai_overview_status', 'ai_overview_error', 'ai_overview_updated_at',
+    ])
+    purge_tags(tag_for_model(BlogPost))
+    return len(posts)
+
+
+def enqueue_overview(post, force=False):
+    """
+    Mark a post's overview as pending and generate it once the current transaction commits
+
+    Sets the status on the instance too, so the response for the write shows it.
+
+    Args:
+        post: Saved BlogPost
+        force: Regenerate even if the input hash is unchanged
+    """
+    from .models import BlogPost
+
+    now = timezone.now()
+    changes = dict(
+        ai_overview_status='pending', ai_overview_attempts=0,
+        ai_overview_error='', ai_overview_updated_at=now,
+    )
+    if force:
+        changes['ai_overview_hash'] = ''
+        post.ai_overview_hash = ''
+    BlogPost.objects.filter(pk=post.pk).update(**changes)
+    post.ai_overview_status = 'pending'
+    post.ai_overview_attempts = 0
+    post.ai_overview_error = ''
+    post.ai_overview_updated_at = now
+
+    post_id = post.pk
+    transaction.on_commit(lambda: _submit(post_id))
+
+
+def _submit(post_id):
+    if not _setting('AI_OVERVIEW_ASYNC', True):
+        run_overview_job(post_id)
+        return
+
+    with _lock:
+        if post_id in _queued:
+            _rerun.add(post_id)
+            return
+        _queued.add(post_id)
+    _get_executor().submit(_worker, post_id)
+
+
+def _worker(post_id):
+    try:
+        while True:
+            run_overview_job(post_id)
+            with _lock:
+                if post_id not in _rerun:
+                    _queued.discard(post_id)
+                    return
+                _rerun.discard(post_id)
+    except Exception:
+        with _lock:
+            _queued.discard(post_id)
+            _rerun.discard(post_id)
+        logger.exception(f'AI overview worker crashed for post {post_id}')
+    finally:
+        close_old_connections()
+
+
+def run_overview_job(post_id):
+    """
+    Generate and store the overview for one post, retrying transient failures
+
+    Returns:
+        str: Final status ('ready' or 'failed'), or None if the post no longer exists
+    """
+    from .ai_service import get_ai_service, overview_input_hash
+    from .models import BlogPost
+
+    max_attempts = _setting('AI_OVERVIEW_MAX_ATTEMPTS', 3)
+    retry_delay = _setting('AI_OVERVIEW_RETRY_DELAY', 2.0)
+
+    post = BlogPost.objects.filter(pk=post_id).only(
+        'id', 'title', 'content', 'ai_overview', 'ai_overview_hash'
+    ).first()
+    if post is None:
+        return None
+
+    input_hash = overview_input_hash(post.title, post.content)
+    if post.ai_overview and post.ai_overview_hash == input_hash:
+        BlogPost.objects.filter(pk=post_id).update(
+            ai_overview_status='ready', ai_overview_error='', ai_overview_updated_at=timezone.now(),
+        )
+        return 'ready'
+
+    error = ''
+    for attempt in range(1, max_attempts + 1):
+        try:
+            overview = get_ai_service().generate_overview(post.title, post.content)
+            if not overview:
+                raise ValueError('Empty overview returned')
+        except Exception as e:
+            error = str(e)
+            logger.warning(f'AI overview attempt {attempt}/{max_attempts} failed for post {post_id}: {e}')
+            BlogPost.objects.filter(pk=post_id).update(ai_overview_attempts=attempt)
+            if attempt < max_attempts:
+                time.sleep(retry_delay * (2 ** (attempt - 1)))
+            continue
+
+        store_overview(post_id, overview, input_hash, ai_overview_attempts=attempt)
+        return 'ready'
+
+    BlogPost.objects.filter(pk=post_id).update(
+        ai_overview_status='failed', ai_overview_error=error[:1000],
+        ai_overview_updated_at=timezone.now(),
+    )
+    logger.error(f'AI overview generation failed for post {post_id}: {error}')
+    return 'failed'
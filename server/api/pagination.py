@@ -0,0 +1,158 @@
+"""
+Pagination for list endpoints
+
+KeysetPagination pages on a fixed ordering such as (-created_at, -id) using
+WHERE predicates on the last row seen instead of OFFSET, so deep pages cost
+the same as the first one. The predicate is shaped so the database can start
+an index range scan at the cursor: a row-value comparison (a, b) < (x, y)
+when every key sorts the same way, otherwise a bound on the first key ANDed
+with the expanded comparison. Each ordering needs a matching index. Endpoints switch to it when the client sends
+`?cursor=<token>` or `?pagination=cursor`; without those they keep their
+existing response shape.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from django.db.models.fields.tuple_lookups import Tuple, TupleGreaterThan, TupleLessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination with a client-adjustable but capped page size
+    """
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+
+def wants_cursor_pagination(request):
+    """Check if the client asked for keyset (cursor) pagination"""
+    params = request.query_params
+    return 'cursor' in params or params.get('pagination') == 'cursor'
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over a fixed ordering
+
+    Args:
+        ordering: Ordering keys, e.g. ('-created_at', '-id'). The last key must be
+            unique so every row has a distinct position. Keys may be annotations.
+    """
+    page_size = DEFAULT_PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            values = self.decode_cursor(queryset, token)
+            queryset = queryset.filter(self._after(values))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(self.page[-1]) if self.has_next else None
+        return self.page
+
+    def _after(self, values):
+        """
+        Build the predicate selecting rows strictly after `values` in the ordering
+
+        (k1, k2, ...) < (v1, v2, ...) when all keys share a direction (> when
+        ascending). Mixed directions can't be one row comparison, so they use
+        k1 <= v1 AND ((k1 < v1) OR (k1 = v1 AND k2 > v2) OR ...), with the
+        comparisons flipped per key; the first conjunct bounds the index scan.
+        """
+        fields = [key.lstrip('-') for key in self.ordering]
+        descending = [key.startswith('-') for key in self.ordering]
+
+        if len(set(descending)) == 1:
+            lookup = TupleLessThan if descending[0] else TupleGreaterThan
+            return Q(lookup(Tuple(*(F(field) for field in fields)), tuple(values)))
+
+        predicate = Q()
+        equal_so_far = Q()
+        for field, desc, value in zip(fields, descending, values):
+            predicate |= equal_so_far & Q(**{f'{field}__{"lt" if desc else "gt"}': value})
+            equal_so_far &= Q(**{field: value})
+        bound = Q(**{f'{fields[0]}__{"lte" if descending[0] else "gte"}': values[0]})
+        return bound & predicate
+
+    def _output_field(self, queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def encode_cursor(self, instance):
+        values = []
+        for key in self.ordering:
+            value = getattr(instance, key.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, queryset, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self._output_field(queryset, key.lstrip('-')).to_python(value)
+                for key, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = remove_query_param(self.base_url, 'pagination')
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('next_cursor', self.next_cursor),
+            ('page_size', self.page_size),
+            ('results', data),
+        ]))
+
+
+def keyset_paginated_response(request, queryset, serializer_class, ordering):
+    """
+    Serialize one keyset page of `queryset` and return the paginated Response
+    """
+    paginator = KeysetPagination(ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
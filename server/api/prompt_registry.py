@@ -0,0 +1,113 @@
+"""
+Prompt registry for the AI service
+
+Every prompt lives in api/prompts/<name>.txt as a small header followed by
+the template body:
+
+    version: 2
+    ---
+    You are Solo, ...
+
+All templates are read once, when this module is imported, and kept as
+immutable strings. Static system prompts (the Solo firm profile, the blog
+assistant roles) are therefore byte-identical on every request, which lets
+the provider reuse its cached prefix. Per-request data (retrieved context,
+titles, transcripts) is rendered from separate templates with `$name`
+placeholders and sent as its own message after the static prefix.
+
+Bump `version` whenever a template's wording changes; it is recorded with
+chat analytics so answers can be compared across prompt revisions.
+"""
+
+import hashlib
+from pathlib import Path
+from string import Template
+
+PROMPTS_DIR = Path(__file__).resolve().parent / 'prompts'
+HEADER_SEPARATOR = '\n---\n'
+
+
+class PromptTemplate:
+    """
+    One named, versioned prompt
+    """
+
+    def __init__(self, name, version, text):
+        self.name = name
+        self.version = version
+        self.text = text
+        self.fingerprint = hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+        self._template = Template(text)
+
+    @property
+    def label(self):
+        """Identifier stored with analytics, e.g. 'solo_system@v2'"""
+        return f'{self.name}@v{self.version}'
+
+    def render(self, **values):
+        """
+        Fill in `$name` placeholders
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        return self._template.substitute(values)
+
+    def __repr__(self):
+        return f'<PromptTemplate {self.label}>'
+
+
+def parse_template(name, raw):
+    """
+    Split a template file into its header fields and body
+
+    Raises:
+        ValueError: If the header or its version is missing
+    """
+    header, separator, body = raw.partition(HEADER_SEPARATOR)
+    if not separator:
+        raise ValueError(f"Prompt '{name}' is missing its '---' header separator")
+
+    fields = {}
+    for line in header.splitlines():
+        key, _, value = line.partition(':')
+        fields[key.strip()] = value.strip()
+    if not fields.get('version'):
+        raise ValueError(f"Prompt '{name}' has no version")
+
+    # The final newline is a file convention, not part of the prompt
+    if body.endswith('\n'):
+        body = body[:-1]
+    return PromptTemplate(name, fields['version'], body)
+
+
+class PromptRegistry:
+    """
+    All templates of a directory, loaded once
+    """
+
+    def __init__(self, directory=PROMPTS_DIR):
+        self.directory = Path(directory)
+        self.templates = {}
+        for path in sorted(self.directory.glob('*.txt')):
+            raw = path.read_text(encoding='utf-8').replace('\r\n', '\n')
+            self.templates[path.stem] = parse_template(path.stem, raw)
+
+    def get(self, name):
+        try:
+            return self.templates[name]
+        except KeyError:
+            raise KeyError(f"Unknown prompt template '{name}'") from None
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def __contains__(self, name):
+        return name in self.templates
+
+    def versions(self):
+        """{name: version} for every loaded template"""
+        return {name: template.version for name, template in self.templates.items()}
+
+
+prompts = PromptRegistry()
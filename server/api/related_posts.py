@@ -0,0 +1,233 @@
+"""
+Related posts index
+
+Related posts are precomputed into the RelatedPost table whenever a post is
+published or edited, so the blog detail endpoint only needs one indexed
+lookup. Candidates are ranked by category overlap (Jaccard) plus a TF-IDF
+cosine similarity over title and excerpt.
+
+Refreshes run after the edit commits, on a single background worker so the
+admin request doesn't pay for loading the corpus and concurrent edits are
+applied one at a time (inline when RELATED_POSTS_ASYNC is off). Signals only
+schedule one when a field the ranking reads actually changed.
+"""
+
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .response_cache import purge_tags, tag_for_model
+
+logger = logging.getLogger(__name__)
+
+RELATED_POSTS_STORED = 6  # Rows kept per post
+RELATED_POSTS_SHOWN = 3   # Rows returned by the detail endpoint
+
+CATEGORY_WEIGHT = 1.0
+TEXT_WEIGHT = 1.0
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='related-posts')
+
+STOP_WORDS = {
+    'the', 'and', 'for', 'with', 'from', 'are', 'was', 'were', 'been', 'being', 'have',
+    'has', 'had', 'does', 'did', 'will', 'would', 'should', 'can', 'could', 'may', 'might',
+    'what', 'which', 'who', 'when', 'where', 'why', 'how', 'you', 'your', 'our', 'their',
+    'this', 'that', 'these', 'those', 'into', 'about', 'over', 'under', 'its', 'not', 'but',
+    'all', 'any', 'more', 'most', 'other', 'some', 'such', 'than', 'too', 'very', 'also',
+}
+
+
+def tokenize(text):
+    """Lowercase word tokens of 3+ characters, without stop words"""
+    return [
+        word for word in re.findall(r'[a-z0-9]{3,}', (text or '').lower())
+        if word not in STOP_WORDS
+    ]
+
+
+class RelatedPostsCorpus:
+    """
+    TF-IDF vectors and category sets for all published posts
+    """
+
+    def __init__(self, documents):
+        """
+        Args:
+            documents: Iterable of (post_id, text, set of category ids)
+        """
+        term_counts = {}
+        self.categories = {}
+        document_frequency = Counter()
+
+        for post_id, text, category_ids in documents:
+            counts = Counter(tokenize(text))
+            term_counts[post_id] = counts
+            self.categories[post_id] = set(category_ids)
+            document_frequency.update(counts.keys())
+
+        total = len(term_counts)
+        self.vectors = {}
+        for post_id, counts in term_counts.items():
+            length = sum(counts.values()) or 1
+            vector = {
+                term: (count / length) * (math.log((total + 1) / (document_frequency[term] + 1)) + 1)
+                for term, count in counts.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            self.vectors[post_id] = {term: weight / norm for term, weight in vector.items()}
+
+    def __contains__(self, post_id):
+        return post_id in self.vectors
+
+    @property
+    def post_ids(self):
+        return self.vectors.keys()
+
+    def score(self, a, b):
+        """Similarity between two posts in the corpus"""
+        cats_a, cats_b = self.categories[a], self.categories[b]
+        union = cats_a | cats_b
+        category_overlap = len(cats_a & cats_b) / len(union) if union else 0.0
+
+        vec_a, vec_b = self.vectors[a], self.vectors[b]
+        if len(vec_a) > len(vec_b):
+            vec_a, vec_b = vec_b, vec_a
+        cosine = sum(weight * vec_b.get(term, 0.0) for term, weight in vec_a.items())
+
+        return CATEGORY_WEIGHT * category_overlap + TEXT_WEIGHT * cosine
+
+    def top_related(self, post_id, limit=RELATED_POSTS_STORED):
+        """Return [(score, related_id), ...] best first"""
+        scored = []
+        for other in self.post_ids:
+            if other == post_id:
+                continue
+            score = self.score(post_id, other)
+            if score > 0:
+                scored.append((score, other))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:limit]
+
+
+def load_corpus():
+    """
+    Build the corpus from published posts in two queries
+    """
+    from .models import BlogPost
+
+    posts = BlogPost.objects.filter(is_published=True).values_list('id', 'title', 'excerpt')
+    category_ids = defaultdict(set)
+    for post_id, category_id in BlogPost.categories.through.objects.filter(
+        blogpost__is_published=True
+    ).values_list('blogpost_id', 'blogcategory_id'):
+        category_ids[post_id].add(category_id)
+
+    return RelatedPostsCorpus(
+        (post_id, f'{title} {excerpt}', category_ids[post_id])
+        for post_id, title, excerpt in posts
+    )
+
+
+def _write_lists(lists):
+    from .models import BlogPost, RelatedPost
+
+    RelatedPost.objects.filter(post_id__in=lists.keys()).delete()
+    RelatedPost.objects.bulk_create([
+        RelatedPost(post_id=post_id, related_id=related_id, score=score, rank=rank)
+        for post_id, entries in lists.items()
+        for rank, (score, related_id) in enumerate(entries)
+    ])
+    # bulk_create sends no signals, and the edit's own purge ran before this
+    # (possibly background) rewrite: purge again so blog details drop the old lists
+    purge_tags(tag_for_model(BlogPost))
+
+
+def refresh_related_posts(post_id):
+    """
+    Recompute related posts after a post was published, edited or unpublished
+
+    The changed post gets a fresh list. Every other post only has the changed
+    post inserted, re-scored or removed in its existing list, so one edit costs
+    a single pass over the corpus instead of a full rebuild.
+    """
+    from .models import RelatedPost
+
+    corpus = load_corpus()
+    lists = {post_id: corpus.top_related(post_id) if post_id in corpus else []}
+
+    existing = defaultdict(list)
+    for owner_id, related_id, score in RelatedPost.objects.exclude(post_id=post_id).values_list(
+        'post_id', 'related_id', 'score'
+    ):
+        existing[owner_id].append((score, related_id))
+
+    for other in set(corpus.post_ids) | set(existing):
+        if other == post_id:
+            continue
+        previous = existing.get(other, [])
+        entries = [entry for entry in previous if entry[1] != post_id]
+        if other in corpus and post_id in corpus:
+            score = corpus.score(other, post_id)
+            if score > 0:
+                entries.append((score, post_id))
+        entries.sort(key=lambda item: (-item[0], item[1]))
+        entries = entries[:RELATED_POSTS_STORED]
+        if entries != sorted(previous, key=lambda item: (-item[0], item[1])):
+            lists[other] = entries
+
+    with transaction.atomic():
+        _write_lists(lists)
+
+
+def recompute_related_posts(post_ids):
+    """
+    Fully recompute the lists of specific posts (e.g. ones that lost an entry)
+    """
+    corpus = load_corpus()
+    lists = {
+        post_id: corpus.top_related(post_id) if post_id in corpus else []
+        for post_id in post_ids
+    }
+    with transaction.atomic():
+        _write_lists(lists)
+
+
+def rebuild_all_related_posts():
+    """
+    Recompute the related posts table from scratch
+
+    Returns:
+        int: Number of posts indexed
+    """
+    from .models import RelatedPost
+
+    corpus = load_corpus()
+    lists = {post_id: corpus.top_related(post_id) for post_id in corpus.post_ids}
+    with transaction.atomic():
+        RelatedPost.objects.exclude(post_id__in=lists.keys()).delete()
+        _write_lists(lists)
+    return len(lists)
+
+
+def schedule_related_posts(func, *args):
+    """
+    Run a refresh (refresh_related_posts or recompute_related_posts) in the
+    background, or inline when RELATED_POSTS_ASYNC is off
+    """
+    def run():
+        try:
+            func(*args)
+        except Exception as e:
+            logger.warning(f'Related posts refresh failed: {e}')
+        finally:
+            close_old_connections()
+
+    if not getattr(settings, 'RELATED_POSTS_ASYNC', True):
+        func(*args)
+        return
+    _executor.submit(run)
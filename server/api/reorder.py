@@ -0,0 +1,67 @@
+"""
+Bulk reorder service shared by the reorder endpoints
+
+A reorder request is applied atomically: the rows are locked, every ID is
+checked, and only rows whose priority actually changes are written with a
+single UPDATE ... SET order_priority = CASE id WHEN ... END statement.
+"""
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+
+from .response_cache import purge_tags, tag_for_model
+
+
+class ReorderError(Exception):
+    """
+    Raised when a reorder request references rows that do not exist
+    """
+
+    def __init__(self, missing_ids):
+        self.missing_ids = missing_ids
+        super().__init__(f"Unknown ids: {', '.join(str(pk) for pk in missing_ids)}")
+
+
+def apply_reorder(model, items, field='order_priority'):
+    """
+    Set the ordering field of many rows in one transaction
+
+    Args:
+        model: Model class with an integer ordering field
+        items: Validated [{"id": ..., "order_priority": ...}, ...]
+        field: Name of the ordering field
+
+    Returns:
+        int: Number of rows whose priority changed
+
+    Raises:
+        ReorderError: If any id does not exist (nothing is written)
+    """
+    priorities = {item['id']: item['order_priority'] for item in items}
+    if not priorities:
+        return 0
+
+    with transaction.atomic():
+        current = dict(
+            model.objects.select_for_update()
+            .filter(id__in=priorities)
+            .values_list('id', field)
+        )
+        missing = sorted(set(priorities) - set(current))
+        if missing:
+            raise ReorderError(missing)
+
+        changed = {pk: value for pk, value in priorities.items() if current[pk] != value}
+        if not changed:
+            return 0
+
+        updated = model.objects.filter(id__in=changed).update(**{
+            field: Case(
+                *[When(id=pk, then=Value(value)) for pk, value in changed.items()],
+                output_field=IntegerField(),
+            )
+        })
+        # .update() skips model signals, so purge cached listings explicitly
+        purge_tags(tag_for_model(model))
+
+    return updated
@@ -0,0 +1,129 @@
+"""
+Tag-invalidated response cache for public read endpoints
+
+Cached GET responses are keyed on the view, path, normalized query string and
+viewer class (public vs staff), plus the current version of every tag the
+view depends on. Tags are per-model labels (e.g. 'api.blogpost'); purging a
+tag bumps its version so every entry built from the old version is skipped
+and later expires, without having to enumerate keys.
+
+Tag versions live in the configured cache, so a purge only reaches the
+processes that share it. The default locmem backend is private to each
+worker: a purge there clears that worker's entries only, and the others keep
+serving their copies until RESPONSE_CACHE_TIMEOUT. Production deployments
+with more than one worker need a shared backend (CACHE_BACKEND=redis, or
+file on a single host).
+"""
+
+import functools
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+KEY_PREFIX = 'response-cache'
+
+
+def tag_for_model(model):
+    """Cache tag for a model class, e.g. 'api.blogpost'"""
+    return model._meta.label_lower
+
+
+def _tag_key(tag):
+    return f'{KEY_PREFIX}:tag:{tag}'
+
+
+def get_tag_versions(tags):
+    """
+    Return {tag: version} for the given tags, initializing missing ones
+    """
+    keys = {tag: _tag_key(tag) for tag in tags}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for tag, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(key)
+        versions[tag] = version
+    return versions
+
+
+def purge_tags(*tags):
+    """
+    Invalidate every cached response depending on any of the tags
+    Runs after the current transaction commits so readers never re-cache stale rows.
+    Reaches every worker only when they share the cache backend (see module docstring).
+    """
+    def purge():
+        cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+    transaction.on_commit(purge)
+
+
+def is_staff_viewer(request):
+    user = request.user
+    return bool(user and user.is_authenticated and (user.is_staff or user.is_superuser))
+
+
+def make_cache_key(request, view_name, tags):
+    """
+    Build the cache key for a request
+    """
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    viewer = 'staff' if is_staff_viewer(request) else 'public'
+    versions = get_tag_versions(tags)
+    raw = '|'.join([
+        view_name, request.path, query, viewer,
+        ','.join(f'{tag}:{versions[tag]}' for tag in sorted(tags)),
+    ])
+    return f'{KEY_PREFIX}:{hashlib.sha256(raw.encode("utf-8")).hexdigest()}'
+
+
+def cache_response(*models, timeout=None, on_hit=None):
+    """
+    Cache successful GET responses of a function view, tagged by model
+
+    Apply below @api_view/@permission_classes so permission checks still run.
+
+    Args:
+        models: Model classes whose changes invalidate the cached response
+        timeout: Cache TTL in seconds (defaults to RESPONSE_CACHE_TIMEOUT)
+        on_hit: Optional callback(request, data) run when serving from cache,
+            for side effects the view would otherwise perform (e.g. view counting)
+    """
+    tags = [tag_for_model(model) for model in models]
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not getattr(settings, 'RESPONSE_CACHE_ENABLED', True):
+                return view_func(request, *args, **kwargs)
+
+            key = make_cache_key(request, view_func.__name__, tags)
+            cached = cache.get(key)
+            if cached is not None:
+                if on_hit:
+                    on_hit(request, cached)
+                response = Response(cached)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and isinstance(response, Response):
+                ttl = timeout if timeout is not None else getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+                cache.set(key, response.data, ttl)
+                response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
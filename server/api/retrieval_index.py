@@ -0,0 +1,389 @@
+"""
+In-memory BM25 index for Solo context retrieval
+
+Published blog posts, active associates and active grants are tokenized,
+stemmed and kept in per-kind inverted indexes inside each worker process, so
+ranking a chat message against them is a dictionary walk instead of a chain
+of icontains scans. Title-like fields are weighted by repeating their terms
+(a simple BM25F approximation).
+
+The index is built on first use (or warmed at startup, see
+warm_retrieval_index) and updated incrementally from model signals after each
+commit. Writes made by other processes are picked up by comparing a version
+read from the database (row count and latest updated_at per table) at most
+every VERSION_CHECK_INTERVAL seconds; the index is also rebuilt after
+MAX_INDEX_AGE seconds, for writes that bypass updated_at (queryset updates).
+A rebuild happens outside the lock, so other requests keep searching the
+previous index meanwhile.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from .related_posts import STOP_WORDS as RELATED_STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_INTERVAL = 5  # Seconds between cross-process staleness checks
+MAX_INDEX_AGE = 300  # Seconds before a full rebuild regardless of the version
+
+STOP_WORDS = RELATED_STOP_WORDS | {
+    'a', 'an', 'or', 'in', 'on', 'at', 'to', 'of', 'by', 'is', 'be', 'do', 'i', 'me', 'my',
+    'tell', 'need', 'want', 'please', 'hi', 'hello', 'thanks', 'know', 'get',
+}
+
+BLOG_FIELD_WEIGHTS = {'title': 3, 'excerpt': 2, 'content': 1}
+ASSOCIATE_FIELD_WEIGHTS = {'name': 3, 'title': 2, 'expertise': 2, 'bio': 1}
+GRANT_FIELD_WEIGHTS = {'title': 3, 'short_description': 2, 'target_audience': 2, 'full_description': 1}
+
+
+def _has_vowel(word):
+    return any(char in 'aeiouy' for char in word)
+
+
+def stem(word):
+    """
+    Light suffix-stripping stemmer (a small subset of Porter's rules)
+
+    Maps common inflections to one form, e.g. 'contracts', 'contracting' and
+    'contracted' all become 'contract'; 'regulation' and 'regulated' become 'regul'.
+    """
+    if len(word) <= 3:
+        return word
+
+    # Plurals
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    # Verb inflections
+    for suffix in ('ingly', 'edly', 'ing', 'ed'):
+        base = word[:-len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3 and _has_vowel(base):
+            word = base
+            if word.endswith(('at', 'bl', 'iz')):
+                word += 'e'
+            elif len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]
+            break
+
+    # Derivational suffixes
+    for suffix in ('ization', 'ational', 'ation', 'atory', 'ator', 'ate', 'ment', 'ness', 'ity', 'ize', 'ise', 'ly'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            break
+
+    if word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def analyze(text):
+    """Tokenize, drop stop words and stem"""
+    return [
+        stem(token) for token in re.findall(r'[a-z0-9]+', (text or '').lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def weighted_terms(fields, weights):
+    """Term frequencies over several fields, with each field's terms counted `weight` times"""
+    counts = Counter()
+    for name, weight in weights.items():
+        for term in analyze(fields.get(name)):
+            counts[term] += weight
+    return counts
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring and incremental add/remove
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {doc_id: tf}
+        self.doc_terms = {}                # doc_id -> Counter
+        self.doc_length = {}               # doc_id -> weighted term count
+        self.documents = {}                # doc_id -> payload
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, terms, payload):
+        self.remove(doc_id)
+        self.doc_terms[doc_id] = terms
+        self.documents[doc_id] = payload
+        self.doc_length[doc_id] = sum(terms.values())
+        self.total_length += self.doc_length[doc_id]
+        for term, tf in terms.items():
+            self.postings[term][doc_id] = tf
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self.documents.pop(doc_id, None)
+        self.total_length -= self.doc_length.pop(doc_id)
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+
+    def rank(self, query_terms, limit):
+        """
+        Return the ids of the `limit` best matching documents, best first
+        """
+        if not self.documents:
+            return []
+
+        total = len(self.documents)
+        avg_length = self.total_length / total or 1.0
+        scores = defaultdict(float)
+        for term in set(query_terms):
+            # Snapshot the postings: a concurrent refresh_instance may add or remove documents
+            docs = list(self.postings.get(term, {}).items())
+            if not docs:
+                continue
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs:
+                length = self.doc_length.get(doc_id)
+                if length is None:
+                    continue  # Removed meanwhile
+                norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [doc_id for doc_id, _ in ranked]
+
+    def search(self, query_terms, limit):
+        """
+        Return the `limit` best matching payloads, best first
+        """
+        documents = self.documents
+        return [documents[doc_id] for doc_id in self.rank(query_terms, limit) if doc_id in documents]
+
+
+def fuse_rankings(rankings, limit, k=60):
+    """
+    Reciprocal rank fusion of several best-first id lists
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for position, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + position + 1)
+    return [doc_id for doc_id, _ in sorted(scores.items(), key=lambda item: -item[1])[:limit]]
+
+
+class RetrievalIndex:
+    """
+    BM25 indexes for the three kinds of context Solo can cite
+    """
+    KINDS = ('blog_posts', 'associates', 'grants')
+
+    def __init__(self):
+        self.indexes = {kind: BM25Index() for kind in self.KINDS}
+        self.versions = None
+        self.checked_at = 0.0
+        self.built_at = 0.0
+
+    @staticmethod
+    def models():
+        from .models import Associate, BlogPost, Grant
+        return {'blog_posts': BlogPost, 'associates': Associate, 'grants': Grant}
+
+    @classmethod
+    def kind_for_model(cls, model):
+        for kind, kind_model in cls.models().items():
+            if kind_model is model:
+                return kind
+        return None
+
+    @classmethod
+    def db_version(cls, kind):
+        """(row count, latest updated_at) of one table; changes on every save or delete"""
+        from django.db.models import Count, Max
+
+        model = cls.models()[kind]
+        return tuple(model.objects.aggregate(count=Count('id'), updated=Max('updated_at')).values())
+
+    @classmethod
+    def db_versions(cls):
+        return {kind: cls.db_version(kind) for kind in cls.KINDS}
+
+    @staticmethod
+    def querysets():
+        from .models import Associate, BlogPost, Grant
+        return {
+            'blog_posts': BlogPost.objects.filter(is_published=True).only(
+                'id', 'title', 'slug', 'excerpt', 'content', 'created_at'
+            ),
+            'associates': Associate.objects.filter(is_active=True),
+            'grants': Grant.objects.filter(is_active=True),
+        }
+
+    @staticmethod
+    def terms_for(kind, instance):
+        if kind == 'blog_posts':
+            fields = {'title': instance.title, 'excerpt': instance.excerpt, 'content': instance.content}
+            return weighted_terms(fields, BLOG_FIELD_WEIGHTS)
+        if kind == 'associates':
+            fields = {
+                'name': instance.name, 'title': instance.title, 'bio': instance.bio,
+                'expertise': ' '.join(instance.expertise or []),
+            }
+            return weighted_terms(fields, ASSOCIATE_FIELD_WEIGHTS)
+        fields = {
+            'title': instance.title, 'short_description': instance.short_description,
+            'target_audience': instance.target_audience, 'full_description': instance.full_description,
+        }
+        return weighted_terms(fields, GRANT_FIELD_WEIGHTS)
+
+    def build(self):
+        versions = self.db_versions()
+        for kind, queryset in self.querysets().items():
+            index = BM25Index()
+            for instance in queryset.iterator():
+                if kind == 'blog_posts':
+                    # Only title/excerpt/slug are needed once the terms are extracted
+                    terms = self.terms_for(kind, instance)
+                    instance.content = ''
+                    index.add(instance.pk, terms, instance)
+                else:
+                    index.add(instance.pk, self.terms_for(kind, instance), instance)
+            self.indexes[kind] = index
+        self.versions = versions
+        self.checked_at = self.built_at = time.monotonic()
+
+    def is_stale(self):
+        now = time.monotonic()
+        if now - self.built_at >= MAX_INDEX_AGE:
+            return True
+        if now - self.checked_at < VERSION_CHECK_INTERVAL:
+            return False
+        self.checked_at = now
+        return self.db_versions() != self.versions
+
+    def refresh_instance(self, model, pk):
+        """
+        Re-index one row after it was saved or deleted
+        """
+        kind = self.kind_for_model(model)
+        if kind is None:
+            return
+        instance = self.querysets()[kind].filter(pk=pk).first()
+        if instance is None:
+            self.indexes[kind].remove(pk)
+        else:
+            terms = self.terms_for(kind, instance)
+            if kind == 'blog_posts':
+                instance.content = ''
+            self.indexes[kind].add(pk, terms, instance)
+        # Adopt the version this write produced so it doesn't trigger a rebuild
+        if self.versions is not None:
+            self.versions = {**self.versions, kind: self.db_version(kind)}
+
+    def search(self, kind, text, limit, extra_ranking=None):
+        """
+        Best matching payloads of one kind
+
+        Args:
+            extra_ranking: Optional best-first ids from another retriever (e.g. semantic
+                search), fused with the BM25 ranking. Ids no longer indexed are ignored.
+        """
+        index = self.indexes[kind]
+        ranked = index.rank(analyze(text), limit * 2 if extra_ranking else limit)
+        documents = index.documents
+        if extra_ranking:
+            extra = [doc_id for doc_id in extra_ranking if doc_id in documents]
+            ranked = fuse_rankings([ranked, extra], limit)
+        return [documents[doc_id] for doc_id in ranked[:limit] if doc_id in documents]
+
+    def all(self, kind):
+        return list(self.indexes[kind].documents.values())
+
+
+_index = None
+_lock = threading.Lock()  # Guards swapping and incremental updates of _index
+_build_lock = threading.Lock()  # One build at a time
+
+
+def retrieval_index_ready():
+    return _index is not None
+
+
+def get_retrieval_index():
+    """
+    Return the process-wide index, building or rebuilding it if needed
+
+    While one thread rebuilds a stale index, the others keep using it; only
+    the very first build is waited for.
+    """
+    global _index
+    index = _index
+    if index is not None and not index.is_stale():
+        return index
+    if index is None:
+        _build_lock.acquire()
+    elif not _build_lock.acquire(blocking=False):
+        return index  # Another thread is already rebuilding
+    try:
+        if _index is index:
+            fresh = RetrievalIndex()
+            fresh.build()
+            with _lock:
+                _index = fresh
+        return _index
+    finally:
+        _build_lock.release()
+
+
+def warm_retrieval_index():
+    """
+    Build the index in a background thread (called at server startup) so the
+    first chat of a worker doesn't pay for it
+    """
+    from django.db import close_old_connections
+
+    def run():
+        try:
+            get_retrieval_index()
+        except Exception as e:
+            logger.warning(f'Failed to warm the retrieval index: {e}')
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, daemon=True, name='retrieval-index-warmup').start()
+
+
+def refresh_retrieval_index(model, pk):
+    """
+    Apply one saved/deleted row to the index if it has been built in this process
+    """
+    with _lock:
+        if _index is None:
+            return
+        try:
+            _index.refresh_instance(model, pk)
+        except Exception as e:
+            logger.error(f'Failed to update retrieval index for {model.__name__} {pk}: {e}')
+            _index.versions = None  # Force a rebuild on the next lookup
+            _index.checked_at = 0.0
+
+
+def reset_retrieval_index():
+    """Drop the in-process index (it is rebuilt on next use)"""
+    global _index
+    with _lock:
+        _index = None
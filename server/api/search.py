@@ -0,0 +1,68 @@
+"""
+Full-text search for blog posts
+
+Uses a weighted PostgreSQL tsvector (title A, excerpt B, content C) stored on
+BlogPost.search_vector and backed by a GIN index. Other database backends
+(e.g. SQLite in local development) fall back to icontains matching.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+SEARCH_CONFIG = 'english'
+
+# Fields that feed the search vector, with their weights
+SEARCH_FIELD_WEIGHTS = (
+    ('title', 'A'),
+    ('excerpt', 'B'),
+    ('content', 'C'),
+)
+
+SEARCH_FIELDS = tuple(field for field, _ in SEARCH_FIELD_WEIGHTS)
+
+
+def full_text_search_supported():
+    """Check if the active database supports PostgreSQL full-text search"""
+    return connection.vendor == 'postgresql'
+
+
+def blog_search_vector():
+    """
+    Build the weighted search vector expression for BlogPost
+    """
+    vector = None
+    for field, weight in SEARCH_FIELD_WEIGHTS:
+        part = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def icontains_search(queryset, term):
+    """
+    Legacy substring search across title, excerpt and content
+    """
+    return queryset.filter(
+        Q(title__icontains=term) |
+        Q(excerpt__icontains=term) |
+        Q(content__icontains=term)
+    )
+
+
+def search_blog_posts(queryset, term):
+    """
+    Filter a BlogPost queryset by a search term and annotate a `rank`
+
+    On PostgreSQL this uses the stored search vector with websearch syntax
+    (quoted phrases, OR, -exclusions). Elsewhere it falls back to icontains
+    with a constant rank so callers can always order by `-rank`.
+    """
+    if not full_text_search_supported():
+        return icontains_search(queryset, term).annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+    query = SearchQuery(term, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    )
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import (
-    Associate, BlogCategory, BlogPost, AIConversation,
+    Associate, BlogCategory, BlogPost, AIConversation, ChatMessage,
     ContactSubmission, Testimonial, Grant,
     ConsultationService, ConsultationBooking
 )
@@ -86,6 +86,10 @@ class BlogCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'slug']
 
     def get_blog_count(self, obj):
+        # Prefer the count annotated by BlogCategory.objects.with_published_count()
+        published_count = getattr(obj, 'published_count', None)
+        if published_count is not None:
+            return published_count
         return obj.blog_posts.filter(is_published=True).count()
 
 
@@ -105,7 +109,6 @@ class BlogPostListSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
     categories = BlogCategorySerializer(many=True, read_only=True)
-    read_time = serializers.SerializerMethodField()
 
     class Meta:
         model = BlogPost
@@ -115,12 +118,6 @@ class BlogPostListSerializer(serializers.ModelSerializer):
             'is_featured', 'view_count', 'publish_date', 'created_at', 'read_time'
         ]
 
-    def get_read_time(self, obj):
-        # Estimate read time (assuming 200 words per minute)
-        word_count = len(obj.content.split())
-        read_time = max(1, round(word_count / 200))
-        return read_time
-
 
 class BlogPostDetailSerializer(serializers.ModelSerializer):
     """
@@ -129,28 +126,27 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
     categories = BlogCategorySerializer(many=True, read_only=True)
-    read_time = serializers.SerializerMethodField()
     related_posts = serializers.SerializerMethodField()
 
     class Meta:
         model = BlogPost
-        fields = '__all__'
-        read_only_fields = ['id', 'slug', 'view_count', 'created_at', 'updated_at']
-
-    def get_read_time(self, obj):
-        word_count = len(obj.content.split())
-        read_time = max(1, round(word_count / 200))
-        return read_time
+        exclude = ['search_vector', 'ai_overview_attempts', 'ai_overview_error', 'ai_overview_updated_at']
+        read_only_fields = [
+            'id', 'slug', 'view_count', 'word_count', 'read_time', 'ai_overview_status',
+            'created_at', 'updated_at',
+        ]
 
     def get_related_posts(self, obj):
-        # Get related posts from the same categories
-        if obj.categories.exists():
-            related = BlogPost.objects.filter(
-                categories__in=obj.categories.all(),
-                is_published=True
-            ).exclude(id=obj.id).distinct()[:3]
-            return BlogPostListSerializer(related, many=True).data
-        return []
+        # Read the precomputed related posts index (see api/related_posts.py)
+        from .related_posts import RELATED_POSTS_SHOWN
+        related = (
+            BlogPost.objects
+            .filter(related_by_links__post=obj, is_published=True)
+            .order_by('related_by_links__rank')
+            .defer('content', 'search_vector')
+            .with_list_relations()[:RELATED_POSTS_SHOWN]
+        )
+        return BlogPostListSerializer(related, many=True).data
 
 
 class BlogPostWriteSerializer(serializers.ModelSerializer):
@@ -175,7 +171,12 @@ class BlogPostWriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = BlogPost
-        exclude = ['slug', 'view_count', 'created_at', 'updated_at']
+        exclude = [
+            'slug', 'view_count', 'word_count', 'read_time', 'search_vector',
+            'ai_overview_attempts', 'ai_overview_error', 'ai_overview_updated_at',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = ['ai_overview_status']
 
     def validate(self, data):
         # Ensure publish_date is set if is_published is True
@@ -216,14 +217,27 @@ class BlogPostWriteSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ChatMessageSerializer(serializers.ModelSerializer):
+    """
+    Serializer for stored Solo chat messages
+    """
+    timestamp = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = ChatMessage
+        fields = ['seq', 'role', 'content', 'timestamp']
+
+
 class AIConversationSerializer(serializers.ModelSerializer):
     """
     Serializer for AI conversations
     """
+    messages = ChatMessageSerializer(source='chat_messages', many=True, read_only=True)
+
     class Meta:
         model = AIConversation
         fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'message_count', 'created_at', 'updated_at']
 
 
 class AIMessageSerializer(serializers.Serializer):
@@ -317,6 +331,9 @@ class ReorderSerializer(serializers.Serializer):
                 raise serializers.ValidationError(
                     "Each item must have 'id' and 'order_priority' fields"
                 )
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each id may only appear once")
         return value
 
 
@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from .models import (
+    Associate, BlogCategory, BlogPost, ConsultationService, Grant, RelatedPost, Testimonial,
+)
+from .related_posts import recompute_related_posts, refresh_related_posts, schedule_related_posts
+from .response_cache import purge_tags, tag_for_model
+from .retrieval_index import refresh_retrieval_index
+
+# The fields the related posts ranking reads (categories are handled by m2m_changed)
+RELATED_POSTS_FIELDS = ('title', 'excerpt', 'is_published')
+
+
+def blog_post_saving(sender, instance, update_fields=None, **kwargs):
+    # Remember the stored values so post_save can tell whether the ranking changed
+    instance._related_posts_before = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(RELATED_POSTS_FIELDS) & set(update_fields):
+        return
+    instance._related_posts_before = (
+        BlogPost.objects.filter(pk=instance.pk).values_list(*RELATED_POSTS_FIELDS).first()
+    )
+
+
+def blog_post_saved(sender, instance, created=False, **kwargs):
+    before = getattr(instance, '_related_posts_before', None)
+    if created or before is None:
+        # New posts only matter once published; updates that skipped the snapshot touched none of the fields
+        changed = created and instance.is_published
+    else:
+        changed = before != tuple(getattr(instance, field) for field in RELATED_POSTS_FIELDS)
+    if not changed:
+        return
+    post_id = instance.pk
+    transaction.on_commit(lambda: schedule_related_posts(refresh_related_posts, post_id))
+
+
+def blog_post_categories_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # A category's posts were changed from the category side
+        post_ids = list(pk_set or [])
+    else:
+        post_ids = [instance.pk]
+    for post_id in post_ids:
+        transaction.on_commit(
+            lambda post_id=post_id: schedule_related_posts(refresh_related_posts, post_id)
+        )
+
+
+def blog_post_deleted(sender, instance, **kwargs):
+    # Rows pointing at the post cascade away; refill the lists that contained it
+    owner_ids = list(
+        RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True)
+    )
+    if owner_ids:
+        transaction.on_commit(lambda: schedule_related_posts(recompute_related_posts, owner_ids))
+
+
+pre_save.connect(blog_post_saving, sender=BlogPost, dispatch_uid='related_posts_pre_save')
+post_save.connect(blog_post_saved, sender=BlogPost, dispatch_uid='related_posts_save')
+m2m_changed.connect(
+    blog_post_categories_changed,
+    sender=BlogPost.categories.through,
+    dispatch_uid='related_posts_categories',
+)
+pre_delete.connect(blog_post_deleted, sender=BlogPost, dispatch_uid='related_posts_delete')
+
+
+# ==================== Response Cache ====================
+
+CACHED_MODELS = (BlogPost, BlogCategory, Grant, Testimonial, Associate, ConsultationService)
+
+
+def purge_model_cache(sender, **kwargs):
+    purge_tags(tag_for_model(sender))
+
+
+def purge_blog_categories_cache(sender, **kwargs):
+    if kwargs.get('action', '').startswith('post_'):
+        purge_tags(tag_for_model(BlogPost), tag_for_model(BlogCategory))
+
+
+for model in CACHED_MODELS:
+    post_save.connect(purge_model_cache, sender=model, dispatch_uid=f'response_cache_save_{model.__name__}')
+    post_delete.connect(purge_model_cache, sender=model, dispatch_uid=f'response_cache_delete_{model.__name__}')
+
+m2m_changed.connect(
+    purge_blog_categories_cache,
+    sender=BlogPost.categories.through,
+    dispatch_uid='response_cache_blog_categories',
+)
+
+
+# ==================== Solo Retrieval Index ====================
+# Connected after the cache purge so the index adopts the bumped tag versions
+
+RETRIEVAL_MODELS = (BlogPost, Associate, Grant)
+
+
+def update_retrieval_index(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: refresh_retrieval_index(sender, pk))
+
+
+for model in RETRIEVAL_MODELS:
+    post_save.connect(update_retrieval_index, sender=model, dispatch_uid=f'retrieval_index_save_{model.__name__}')
+    post_delete.connect(update_retrieval_index, sender=model, dispatch_uid=f'retrieval_index_delete_{model.__name__}')
@@ -0,0 +1,170 @@
+"""
+Coalescing of identical in-flight AI requests ("singleflight")
+
+When many clients ask for the same thing at once (a viral post's overview,
+a double-submitted editor request, the same opening question) only the
+first caller talks to the provider; the others wait for its result.
+
+- SingleFlight coalesces blocking calls: followers get the leader's return
+  value, or its exception.
+- StreamFlights coalesces streams: the upstream stream is pumped once into
+  a buffer, and every subscriber replays the buffer from the start and then
+  follows it live, so a caller who joins late still gets the full answer.
+  The pump runs on its own task, so a subscriber disconnecting
+  never cuts the stream off for the others.
+
+Keys come from request_key() over everything that determines the answer
+(model, messages, sampling parameters). A finished flight is forgotten, so
+only requests that overlap in time are coalesced.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(**parts):
+    """Stable hash of a request's model, messages and parameters"""
+    raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Run a function once per key among concurrent callers
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Returns:
+            tuple: (result of fn, whether it was shared from another caller)
+
+        Raises:
+            Whatever fn raised, in the leader and in every follower
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+
+# ==================== Streams ====================
+
+class AsyncStreamBroadcast:
+    """
+    One upstream async iterator pumped by its own task, replayable by many subscribers
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self._changed = asyncio.Event()
+        self._on_finish = None
+        self.task = None
+
+    def start(self, source, on_finish=None):
+        self._on_finish = on_finish
+        self.task = asyncio.get_running_loop().create_task(self._pump(source))
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _pump(self, source):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            logger.warning(f'Shared stream failed: {e}')
+            self.error = e
+        finally:
+            if self._on_finish:
+                self._on_finish()
+            self.finished = True
+            self._notify()
+
+    async def subscribe(self):
+        position = 0
+        while True:
+            if position < len(self.chunks):
+                chunk = self.chunks[position]
+                position += 1
+                yield chunk
+            elif self.finished:
+                break
+            else:
+                await self._changed.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class StreamFlights:
+    """
+    Registry of in-flight shared streams, per event loop
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._async_streams = weakref.WeakKeyDictionary()  # event loop -> {key: broadcast}
+
+    def ajoin(self, key, factory):
+        """
+        Subscribe to the stream for `key`, starting it with factory() (an async
+        iterator) if none is in flight on this event loop
+
+        Returns:
+            tuple: (async iterator of chunks, whether an in-flight stream was joined)
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            streams = self._async_streams.setdefault(loop, {})
+            broadcast = streams.get(key)
+            joined = broadcast is not None
+            if not joined:
+                broadcast = streams[key] = AsyncStreamBroadcast()
+                broadcast.start(factory(), on_finish=lambda: self._forget(streams, key, broadcast))
+        return broadcast.subscribe(), joined
+
+    def _forget(self, streams, key, broadcast):
+        with self._lock:
+            if streams.get(key) is broadcast:
+                del streams[key]
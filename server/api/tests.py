@@ -1,3 +1,1456 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import view_counter
+from .admission import (
+    ANONYMOUS_PRIORITY, STAFF_PRIORITY, AdmissionRejected, ConcurrencyLimiter, admit, client_ip, get_limiter,
+    reset_limiters, take_token,
+)
+from .ai_service import BLOG_INTENT_MATCHER, GRANT_QUERY, SOLO_TOPIC_MATCHER, GeminiAIService
+from .chat_history import build_history, message_tokens, refresh_summary
+from .checks import check_shared_cache
+from .embeddings import (
+    EmbeddingStore, HashingEmbedder, get_embedding_store, invalidate_embedding_store, semantic_search,
+    sync_embeddings,
+)
+from .llm_client import (
+    CircuitBreaker, LLMError, LLMMetrics, LLMUnavailableError, Operation, ResilientLLMClient,
+)
+from .models import (
+    AIConversation, Associate, BlogCategory, BlogPost, BlogPostDailyView, ChatAnalytics,
+    ConsultationBooking, ContactSubmission, Grant, RelatedPost, Testimonial, User,
+)
+from .prompt_registry import parse_template, prompts
+from .related_posts import rebuild_all_related_posts
+from .retrieval_index import (
+    BM25Index, analyze, get_retrieval_index, refresh_retrieval_index, reset_retrieval_index,
+)
+from .singleflight import StreamFlights
+
+
+class BlogListQueryCountTests(TestCase):
+    """
+    The blog listing must cost a fixed number of queries regardless of page size
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author', email='author@example.com', first_name='Ada')
+        categories = [BlogCategory.objects.create(name=f'Category {i}') for i in range(3)]
+        for i in range(12):
+            post = BlogPost.objects.create(
+                title=f'Post {i}',
+                excerpt='Excerpt',
+                content='word ' * 400,
+                author=author,
+                is_published=True,
+                publish_date=timezone.now() - timezone.timedelta(days=i + 1),
+            )
+            post.categories.set(categories)
+        rebuild_all_related_posts()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _count_queries(self, page_size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/v1/blogs/', {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), page_size)
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant_across_page_sizes(self):
+        self.assertEqual(self._count_queries(1), self._count_queries(10))
+
+    def test_list_serializes_author_and_category_counts(self):
+        response = self.client.get('/api/v1/blogs/', {'page_size': 2})
+        post = response.data['results'][0]
+        self.assertEqual(post['author_name'], 'Ada')
+        self.assertEqual(post['read_time'], 2)
+        self.assertEqual([c['blog_count'] for c in post['categories']], [12, 12, 12])
+
+    @override_settings(BLOG_VIEW_BUFFERED=True)  # Count serialization queries, not view write-through
+    def test_detail_query_count_is_bounded(self):
+        slug = BlogPost.objects.first().slug
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/v1/blogs/{slug}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['related_posts']), 3)
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+
+
+class BlogSearchTests(TestCase):
+    """
+    ?search= filters the public listing; on SQLite it falls back to icontains
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author', email='author@example.com')
+        cls.crypto = BlogCategory.objects.create(name='Crypto')
+        cls.privacy = BlogCategory.objects.create(name='Privacy')
+
+        def post(title, excerpt, content, days_ago, categories, is_published=True):
+            post = BlogPost.objects.create(
+                title=title, excerpt=excerpt, content=content, author=author, is_published=is_published,
+                publish_date=timezone.now() - timezone.timedelta(days=days_ago),
+            )
+            post.categories.set(categories)
+            return post
+
+        cls.title_hit = post('Token Offerings in Nigeria', 'SEC rules', 'Body', 3, [cls.crypto, cls.privacy])
+        cls.content_hit = post('Exchange licensing', 'Licences', 'Rules for token custody', 1, [cls.crypto])
+        cls.excerpt_hit = post('Data protection', 'Tokenised records', 'Body', 2, [cls.privacy])
+        cls.miss = post('NDPA compliance', 'Duties', 'Body', 4, [cls.privacy])
+        cls.draft = post('Token draft', 'Unpublished', 'Body', 5, [cls.crypto], is_published=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _ids(self, **params):
+        response = self.client.get('/api/v1/blogs/', params)
+        self.assertEqual(response.status_code, 200)
+        return [post['id'] for post in response.data['results']]
+
+    def test_matches_title_excerpt_and_content_case_insensitively(self):
+        self.assertEqual(
+            self._ids(search='TOKEN'),
+            [self.content_hit.id, self.excerpt_hit.id, self.title_hit.id],  # Equal rank, newest first
+        )
+
+    def test_search_combines_with_category_filter(self):
+        self.assertEqual(self._ids(search='token', category='crypto'), [self.content_hit.id, self.title_hit.id])
+
+    def test_explicit_ordering_overrides_rank(self):
+        self.assertEqual(
+            self._ids(search='token', ordering='title'),
+            [self.excerpt_hit.id, self.content_hit.id, self.title_hit.id],
+        )
+
+    def test_no_match_returns_empty_page(self):
+        self.assertEqual(self._ids(search='stablecoin'), [])
+
+
+@override_settings(DASHBOARD_STATS_ASYNC=False)
+class DashboardStatsTests(TestCase):
+    """
+    Dashboard counters cost one query per table and are served from a snapshot
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+        for i in range(3):
+            BlogPost.objects.create(
+                title=f'Post {i}', excerpt='Excerpt', content='Body', author=cls.staff,
+                is_published=i > 0, view_count=10,
+            )
+        Associate.objects.create(name='Ada', title='Partner', bio='Bio')
+        Associate.objects.create(name='Bola', title='Associate', bio='Bio', is_active=False)
+        ContactSubmission.objects.create(name='C', email='c@example.com', subject='Hi', message='Hello')
+        Testimonial.objects.create(client_name='T', client_title='CEO', testimonial_text='Great')
+        Grant.objects.create(title='Award')
+        for verified in (True, False):
+            ConsultationBooking.objects.create(
+                client_name='B', client_email='b@example.com', client_phone='123',
+                preferred_date=timezone.localdate(), preferred_time='10:00', amount='50.00',
+                payment_verified=verified,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def _get(self):
+        response = self.client.get('/api/v1/admin/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_one_query_per_table_then_snapshot(self):
+        with CaptureQueriesContext(connection) as ctx:
+            stats = self._get().data
+        self.assertEqual(len(ctx.captured_queries), 6)
+        self.assertEqual(
+            (stats['total_blogs'], stats['published_blogs'], stats['draft_blogs'], stats['total_views']),
+            (3, 2, 1, 30),
+        )
+        self.assertEqual((stats['total_associates'], stats['active_associates']), (2, 1))
+        self.assertEqual((stats['total_bookings'], stats['paid_bookings']), (2, 1))
+        self.assertEqual(stats['consultation_revenue'], 50.0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self._get()
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_stale_snapshot_is_served_then_refreshed(self):
+        self._get()
+        Grant.objects.create(title='Second award')
+        snapshot = cache.get('dashboard:stats')
+        snapshot['computed_at'] -= 3600
+        cache.set('dashboard:stats', snapshot)
+
+        self.assertEqual(self._get().data['total_grants'], 1)  # Stale figures, refresh scheduled
+        response = self._get()
+        self.assertEqual(response.data['total_grants'], 2)
+        self.assertEqual(response['X-Snapshot-Age'], '0')
+
+
+@override_settings(BLOG_VIEW_BUFFERED=True, BLOG_VIEW_FLUSH_THRESHOLD=3, BLOG_VIEW_FLUSH_INTERVAL=3600)
+class BlogViewCounterTests(TestCase):
+    """
+    Blog views are buffered and flushed in batches into view_count and the daily table
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)  # Don't leave buffered hits for other tests
+        view_counter.flush_views()
+        author = User.objects.create(username='author', email='author@example.com')
+        self.post = BlogPost.objects.create(
+            title='Counted', excerpt='Excerpt', content='Body', author=author,
+            is_published=True, publish_date=timezone.now() - timezone.timedelta(days=1),
+        )
+        self.client = APIClient()
+
+    def test_views_are_buffered_until_threshold(self):
+        for _ in range(2):
+            self.client.get(f'/api/v1/blogs/{self.post.slug}/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+
+        self.client.get(f'/api/v1/blogs/{self.post.slug}/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+        daily = BlogPostDailyView.objects.get(post=self.post)
+        self.assertEqual((daily.date, daily.views), (timezone.localdate(), 3))
+
+    def test_flush_increments_existing_rows(self):
+        for _ in range(5):
+            self.post.increment_view_count()
+        view_counter.flush_views()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 5)
+        self.assertEqual(BlogPostDailyView.objects.get(post=self.post).views, 5)
+
+    def test_flush_keeps_hits_recorded_after_the_snapshot(self):
+        self.post.increment_view_count()
+        pending = view_counter.pending_views()
+        self.post.increment_view_count()  # Lands between the snapshot and the flush
+        with mock.patch('api.view_counter.pending_views', return_value=pending):
+            self.assertEqual(view_counter.flush_views(), 1)
+        self.assertEqual(sum(view_counter.pending_views().values()), 1)
+
+    def test_flush_reads_only_viewed_counters_from_any_day(self):
+        older = timezone.localdate() - timezone.timedelta(days=3)
+        view_counter._count(self.post.id, older, 2)
+        self.post.increment_view_count()
+        with mock.patch('api.models.BlogPost.objects.values_list') as values_list:
+            self.assertEqual(view_counter.flush_views(), 3)
+        values_list.assert_not_called()  # No scan of the archive
+        daily = dict(BlogPostDailyView.objects.filter(post=self.post).values_list('date', 'views'))
+        self.assertEqual(daily, {older: 2, timezone.localdate(): 1})
+        self.assertEqual(view_counter.pending_views(), {})
+
+    @override_settings(BLOG_VIEW_BUFFERED=False)
+    def test_views_are_written_through_without_a_shared_cache(self):
+        self.client.get(f'/api/v1/blogs/{self.post.slug}/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 1)
+        self.assertEqual(view_counter.pending_views(), {})
+
+    @override_settings(BLOG_VIEW_BUFFERED=False)
+    def test_write_through_is_one_update_and_one_upsert(self):
+        self.post.increment_view_count()
+        with CaptureQueriesContext(connection) as ctx:
+            self.post.increment_view_count()
+        statements = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(BlogPostDailyView.objects.get(post=self.post).views, 2)
+
+
+@override_settings(RELATED_POSTS_ASYNC=False)
+class RelatedPostsIndexTests(TestCase):
+    """
+    Related posts are precomputed on publish/edit and ranked by category and text similarity
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author', email='author@example.com')
+        self.crypto = BlogCategory.objects.create(name='Crypto')
+        self.privacy = BlogCategory.objects.create(name='Privacy')
+
+    def _publish(self, title, excerpt, categories):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.create(
+                title=title, excerpt=excerpt, content='Body', author=self.author,
+                is_published=True, publish_date=timezone.now() - timezone.timedelta(days=1),
+            )
+            post.categories.set(categories)
+        return post
+
+    def test_ranks_by_category_overlap_and_text(self):
+        tokens = self._publish('Token offerings in Nigeria', 'Regulating token offerings', [self.crypto])
+        exchanges = self._publish('Crypto exchange licensing', 'SEC rules for exchanges', [self.crypto])
+        privacy = self._publish('NDPA compliance guide', 'Data protection duties', [self.privacy])
+        offerings = self._publish('Token offerings after the SEC rules', 'What token issuers need', [self.crypto])
+
+        ranked = list(RelatedPost.objects.filter(post=offerings).values_list('related_id', flat=True))
+        self.assertEqual(ranked, [tokens.id, exchanges.id])
+        self.assertFalse(RelatedPost.objects.filter(post=offerings, related=privacy).exists())
+        # Earlier posts pick up the new one incrementally
+        self.assertTrue(RelatedPost.objects.filter(post=tokens, related=offerings, rank=0).exists())
+
+    def test_unpublishing_removes_post_from_other_lists(self):
+        first = self._publish('Smart contract audits', 'Audit duties', [self.crypto])
+        second = self._publish('Smart contract disputes', 'Litigating code', [self.crypto])
+        with self.captureOnCommitCallbacks(execute=True):
+            second.is_published = False
+            second.save()
+        self.assertFalse(RelatedPost.objects.filter(related=second).exists())
+        self.assertFalse(RelatedPost.objects.filter(post=first).exists())
+
+        response = APIClient().get(f'/api/v1/blogs/{first.slug}/')
+        self.assertEqual(response.data['related_posts'], [])
+
+    def test_background_rewrite_purges_cached_details(self):
+        first = self._publish('Smart contract audits', 'Audit duties', [self.crypto])
+        self._publish('Smart contract disputes', 'Litigating code', [self.crypto])
+        client = APIClient()
+        self.assertEqual(len(client.get(f'/api/v1/blogs/{first.slug}/').data['related_posts']), 1)
+
+        with mock.patch('api.signals.schedule_related_posts') as schedule:
+            self._publish('Smart contract insurance', 'Covering code', [self.crypto])
+        # A read between the edit's purge and the background rewrite caches the old list
+        self.assertEqual(len(client.get(f'/api/v1/blogs/{first.slug}/').data['related_posts']), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            for call in schedule.call_args_list:
+                func, *args = call.args
+                func(*args)
+        self.assertEqual(len(client.get(f'/api/v1/blogs/{first.slug}/').data['related_posts']), 2)
+
+    def test_only_ranking_fields_trigger_a_refresh(self):
+        post = self._publish('Smart contract audits', 'Audit duties', [self.crypto])
+        with mock.patch('api.signals.schedule_related_posts') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                post.content = 'A longer body'
+                post.is_featured = True
+                post.save()
+            schedule.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                post.title = 'Smart contract audit duties'
+                post.save()
+            schedule.assert_called_once()
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Cursor pagination walks a listing in order without gaps or duplicates
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+        created_at = timezone.now()
+        contacts = ContactSubmission.objects.bulk_create([
+            ContactSubmission(name=f'Client {i}', email=f'c{i}@example.com', subject='Hi', message='Hello')
+            for i in range(7)
+        ])
+        # Two rows share a timestamp so the id tie-breaker is exercised
+        for i, contact in enumerate(contacts):
+            ContactSubmission.objects.filter(pk=contact.pk).update(
+                created_at=created_at - timezone.timedelta(minutes=i // 2)
+            )
+
+    def test_walks_all_pages_in_order(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+
+        response = client.get('/api/v1/contact/list/', {'pagination': 'cursor', 'page_size': 3})
+        seen = [row['id'] for row in response.data['results']]
+        while response.data['next_cursor']:
+            response = client.get('/api/v1/contact/list/', {'cursor': response.data['next_cursor'], 'page_size': 3})
+            seen.extend(row['id'] for row in response.data['results'])
+
+        expected = list(ContactSubmission.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_walks_mixed_direction_ordering(self):
+        created_at = timezone.now()
+        for i in range(7):
+            grant = Grant.objects.create(title=f'Award {i}', order_priority=i % 2)
+            Grant.objects.filter(pk=grant.pk).update(created_at=created_at - timezone.timedelta(minutes=i // 3))
+        client = APIClient()
+
+        response = client.get('/api/v1/grants/', {'pagination': 'cursor', 'page_size': 2})
+        seen = [row['id'] for row in response.data['results']]
+        while response.data['next_cursor']:
+            response = client.get('/api/v1/grants/', {'cursor': response.data['next_cursor'], 'page_size': 2})
+            seen.extend(row['id'] for row in response.data['results'])
+
+        expected = list(Grant.objects.order_by('order_priority', '-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_legacy_shape_without_cursor(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/v1/contact/list/')
+        self.assertEqual(len(response.data), 7)
+
+    def test_page_size_is_capped(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/v1/contact/list/', {'pagination': 'cursor', 'page_size': 10000})
+        self.assertEqual(response.data['page_size'], 100)
+
+    def test_invalid_cursor_is_404(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/v1/contact/list/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ResponseCacheTests(TestCase):
+    """
+    Public read endpoints are cached per viewer class and purged by model signals
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.grant = Grant.objects.create(title='Student Judge Award', is_featured=True)
+
+    def test_hit_then_purge_on_save(self):
+        client = APIClient()
+        first = client.get('/api/v1/grants/featured/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(client.get('/api/v1/grants/featured/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grant.title = 'Renamed Award'
+            self.grant.save()
+
+        response = client.get('/api/v1/grants/featured/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['title'], 'Renamed Award')
+
+    def test_query_string_is_normalized_and_viewer_is_part_of_key(self):
+        client = APIClient()
+        client.get('/api/v1/testimonials/?is_featured=&is_active=true')
+        self.assertEqual(client.get('/api/v1/testimonials/?is_active=true&is_featured=')['X-Cache'], 'HIT')
+
+        staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+        client.force_authenticate(staff)
+        self.assertEqual(client.get('/api/v1/testimonials/?is_active=true&is_featured=')['X-Cache'], 'MISS')
+
+
+@override_settings(
+    AI_OVERVIEW_ASYNC=False, AI_OVERVIEW_MAX_ATTEMPTS=2, AI_OVERVIEW_RETRY_DELAY=0, RELATED_POSTS_ASYNC=False,
+)
+class OverviewJobTests(TestCase):
+    """
+    Blog writes return before the AI overview is generated; the job records its outcome
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def _create(self):
+        return self.client.post('/api/v1/blogs/', {
+            'title': 'Background overviews', 'excerpt': 'Excerpt', 'content': 'Body ' * 50,
+            'author': self.staff.id,
+        }, format='json')
+
+    @mock.patch('api.ai_service.get_ai_service')
+    def test_write_returns_pending_then_job_completes(self, get_ai_service):
+        get_ai_service.return_value.generate_overview.return_value = 'A short overview.'
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self._create()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['ai_overview_status'], 'pending')
+        get_ai_service.return_value.generate_overview.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        post = BlogPost.objects.get()
+        status_response = self.client.get(f'/api/v1/blogs/{post.slug}/ai-overview/')
+        self.assertEqual(status_response.data['status'], 'ready')
+        self.assertEqual(status_response.data['overview'], 'A short overview.')
+
+    @mock.patch('api.ai_service.get_ai_service')
+    def test_failures_are_retried_then_marked_failed(self, get_ai_service):
+        get_ai_service.return_value.generate_overview.side_effect = RuntimeError('upstream timeout')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create()
+        post = BlogPost.objects.get()
+        self.assertEqual(post.ai_overview_status, 'failed')
+        self.assertEqual(post.ai_overview_attempts, 2)
+        self.assertIn('upstream timeout', post.ai_overview_error)
+
+    @mock.patch('api.ai_service.get_ai_service')
+    def test_unchanged_input_reuses_stored_overview(self, get_ai_service):
+        generate = get_ai_service.return_value.generate_overview
+        generate.return_value = 'A short overview.'
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create()
+        post = BlogPost.objects.get()
+
+        # Only markup changed, so the model input is the same
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/v1/blogs/{post.slug}/', {'content': f'<p>{post.content}</p>'}, format='json')
+        post.refresh_from_db()
+        self.assertEqual(post.ai_overview_status, 'ready')
+        self.assertEqual(generate.call_count, 1)
+
+        BlogPost.objects.filter(pk=post.pk).update(is_published=True)
+        response = APIClient().post('/api/v1/blogs/ai-overview/', {'slug': post.slug}, format='json')
+        self.assertEqual(response.data['overview'], 'A short overview.')
+        self.assertEqual(generate.call_count, 1)
+
+    @mock.patch('api.management.commands.generate_ai_overviews.get_ai_service')
+    def test_bulk_command_resumes_from_checkpoint(self, get_ai_service):
+        generate = get_ai_service.return_value.generate_overview
+        generate.side_effect = lambda title, content: f'Overview of {title}.'
+        posts = [
+            BlogPost.objects.create(title=f'Post {i}', excerpt='Excerpt', content='Body ' * 20, author=self.staff)
+            for i in range(3)
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'overviews.checkpoint')
+            with open(checkpoint, 'w') as f:
+                f.write(f'{posts[0].id}\n')
+
+            out = io.StringIO()
+            call_command(
+                'generate_ai_overviews', '--regenerate', '--workers', '2', '--batch-size', '2', '--rpm', '0',
+                '--checkpoint', checkpoint, stdout=out,
+            )
+            # A clean run leaves no checkpoint behind
+            self.assertFalse(os.path.exists(checkpoint))
+
+        self.assertEqual(generate.call_count, 2)
+        self.assertFalse(BlogPost.objects.get(pk=posts[0].pk).ai_overview)
+        for post in posts[1:]:
+            post.refresh_from_db()
+            self.assertEqual(post.ai_overview, f'Overview of {post.title}.')
+            self.assertEqual(post.ai_overview_status, 'ready')
+        self.assertIn('Skipped (done in an earlier run): 1', out.getvalue())
+        self.assertIn('p95', out.getvalue())
+
+
+class ReorderTests(TestCase):
+    """
+    Reorder endpoints apply the whole batch in one statement or not at all
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+        self.grants = [Grant.objects.create(title=f'Grant {i}', order_priority=i) for i in range(4)]
+
+    def test_single_update_and_changed_count(self):
+        # The first grant keeps its priority, so only three rows change
+        priorities = [0, 2, 1, 0]
+        items = [{'id': grant.id, 'order_priority': p} for grant, p in zip(self.grants, priorities)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/v1/grants/reorder/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 3)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            list(Grant.objects.order_by('id').values_list('order_priority', flat=True)), priorities
+        )
+
+    def test_unknown_id_rejects_whole_batch(self):
+        response = self.client.post('/api/v1/grants/reorder/', {'items': [
+            {'id': self.grants[0].id, 'order_priority': 9},
+            {'id': 999, 'order_priority': 0},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['missing_ids'], [999])
+        self.grants[0].refresh_from_db()
+        self.assertEqual(self.grants[0].order_priority, 0)
+
+
+@override_settings(RELATED_POSTS_ASYNC=False)
+class RetrievalIndexTests(TestCase):
+    """
+    Solo context retrieval ranks by BM25 relevance and follows model changes
+    """
+
+    def setUp(self):
+        cache.clear()
+        reset_retrieval_index()
+        self.author = User.objects.create(username='author', email='author@example.com')
+        self.addCleanup(reset_retrieval_index)
+
+    def _post(self, title, content, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return BlogPost.objects.create(
+                title=title, excerpt=kwargs.pop('excerpt', 'Excerpt'), content=content,
+                author=self.author, is_published=kwargs.pop('is_published', True), **kwargs
+            )
+
+    def test_stemming_normalizes_inflections(self):
+        self.assertEqual(analyze('contracts contracting contracted'), ['contract'] * 3)
+        self.assertEqual(analyze('the regulation of regulated tokens'), ['regul', 'regul', 'token'])
+
+    def test_ranks_by_relevance(self):
+        passing = self._post('Company news', 'We mention smart contracts once among many other topics ' * 5)
+        focused = self._post('Smart contract disputes', 'Litigating smart contracts and contract code')
+        self._post('Draft on smart contracts', 'Smart contracts', is_published=False)
+
+        results = get_retrieval_index().search('blog_posts', 'How are smart contracts litigated?', 3)
+        self.assertEqual([post.id for post in results], [focused.id, passing.id])
+
+    def test_ranking_tolerates_concurrent_updates(self):
+        index = BM25Index()
+        for doc_id in range(200):
+            index.add(doc_id, Counter({'contract': 1, f'term{doc_id}': 1}), doc_id)
+        stop = threading.Event()
+        errors = []
+
+        def churn():
+            doc_id = 200
+            while not stop.is_set():
+                index.add(doc_id, Counter({'contract': 2}), doc_id)
+                index.remove(doc_id - 100)
+                doc_id += 1
+
+        writer = threading.Thread(target=churn)
+        writer.start()
+        try:
+            for _ in range(300):
+                index.search(['contract'], 5)
+        except RuntimeError as e:
+            errors.append(e)
+        finally:
+            stop.set()
+            writer.join()
+        self.assertEqual(errors, [])
+
+    def test_incremental_update_checks_only_the_changed_table(self):
+        post = self._post('Smart contract disputes', 'Litigating smart contracts')
+        get_retrieval_index()
+        with CaptureQueriesContext(connection) as ctx:
+            refresh_retrieval_index(BlogPost, post.pk)
+        self.assertEqual(len(ctx.captured_queries), 2)  # The row, and the blog table's version
+
+    def test_incremental_updates_from_signals(self):
+        index = get_retrieval_index()
+        post = self._post('Data protection compliance', 'NDPA duties for controllers')
+        self.assertEqual([p.id for p in index.search('blog_posts', 'NDPA compliance', 3)], [post.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.is_published = False
+            post.save()
+        self.assertEqual(index.search('blog_posts', 'NDPA compliance', 3), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            associate = Associate.objects.create(name='Ada Obi', title='Partner', bio='Fintech licensing lead')
+        self.assertEqual(get_retrieval_index().search('associates', 'fintech licenses', 2), [associate])
+        self.assertIs(get_retrieval_index(), index)
+
+    @mock.patch('api.retrieval_index.VERSION_CHECK_INTERVAL', 0)
+    def test_writes_from_another_process_trigger_a_rebuild(self):
+        post = self._post('Data protection compliance', 'NDPA duties for controllers')
+        self.assertEqual(len(get_retrieval_index().search('blog_posts', 'NDPA compliance', 3)), 1)
+
+        # No signal reaches this process; only the table changes
+        BlogPost.objects.filter(pk=post.pk).update(is_published=False, updated_at=timezone.now())
+        self.assertEqual(get_retrieval_index().search('blog_posts', 'NDPA compliance', 3), [])
+
+
+class EmbeddingStoreTests(TestCase):
+    """
+    Embeddings are synced incrementally and searched with batched cosine top-k
+    """
+
+    def setUp(self):
+        cache.clear()
+        invalidate_embedding_store()
+        self.addCleanup(invalidate_embedding_store)
+        self.author = User.objects.create(username='author', email='author@example.com')
+        self.embedder = HashingEmbedder(dimensions=256)
+
+    def _post(self, title, content):
+        return BlogPost.objects.create(
+            title=title, excerpt='Excerpt', content=content, author=self.author, is_published=True,
+        )
+
+    def test_hashing_embedder_is_deterministic(self):
+        first = self.embedder.embed(['token offerings regulation'])
+        second = HashingEmbedder(dimensions=256).embed(['token offerings regulation'])
+        self.assertEqual(list(first[0]), list(second[0]))
+        self.assertAlmostEqual(math.sqrt(sum(x * x for x in first[0])), 1.0, places=5)
+
+    def test_sync_only_embeds_changed_documents(self):
+        post = self._post('Token offerings', 'Rules for token issuers')
+        self._post('Land disputes', 'Tenancy and lease litigation')
+        self.assertEqual(sync_embeddings(self.embedder)['embedded'], 4)
+
+        self.assertEqual(sync_embeddings(self.embedder), {'embedded': 0, 'unchanged': 4, 'deleted': 0})
+
+        BlogPost.objects.filter(pk=post.pk).update(content='Rules for token issuers and exchanges')
+        self.assertEqual(sync_embeddings(self.embedder), {'embedded': 1, 'unchanged': 3, 'deleted': 0})
+
+        BlogPost.objects.filter(pk=post.pk).update(is_published=False)
+        self.assertEqual(sync_embeddings(self.embedder)['deleted'], 2)
+
+    def test_batched_top_k(self):
+        tokens = self._post('Token offerings', 'Rules for token issuers raising funds')
+        land = self._post('Land disputes', 'Tenancy and lease litigation')
+        sync_embeddings(self.embedder)
+
+        store = EmbeddingStore(self.embedder.key, self.embedder.dimensions)
+        queries = self.embedder.embed(['token issuers', 'lease litigation'])
+        results = store.search_many(queries, 1, kind='blog_posts')
+        self.assertEqual([[object_id for object_id, _ in hits] for hits in results], [[tokens.id], [land.id]])
+
+    def test_search_without_numpy_matches(self):
+        self._post('Token offerings', 'Rules for token issuers raising funds')
+        self._post('Land disputes', 'Tenancy and lease litigation')
+        self._post('Token exchanges', 'Licensing exchanges that list tokens')
+        sync_embeddings(self.embedder)
+
+        def search():
+            store = EmbeddingStore(self.embedder.key, self.embedder.dimensions)
+            queries = self.embedder.embed(['token issuers', 'lease litigation'])
+            return store.search_many(queries, 2, min_score=0.05)
+
+        expected = search()
+        with mock.patch('api.embeddings.np', None):
+            results = search()
+        self.assertEqual(
+            [[key for key, _ in hits] for hits in results], [[key for key, _ in hits] for hits in expected],
+        )
+        for hits, expected_hits in zip(results, expected):
+            for (_, score), (_, expected_score) in zip(hits, expected_hits):
+                self.assertAlmostEqual(score, expected_score, places=5)
+
+    def test_unrelated_message_retrieves_no_context(self):
+        tokens = self._post('Token offerings', 'Rules for token issuers raising funds')
+        Associate.objects.create(name='Ada', title='Partner', bio='Advises token issuers')
+        Grant.objects.create(title='Founders award', short_description='Funding for founders')
+        sync_embeddings()
+        reset_retrieval_index()
+        self.addCleanup(reset_retrieval_index)
+        with mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'test-key'}):
+            service = GeminiAIService()
+
+        with override_settings(SOLO_RETRIEVAL_TIMEOUT=None):
+            context = service.retrieve_relevant_context('hi there')
+        self.assertEqual(
+            {kind: context[kind] for kind in ('blog_posts', 'associates', 'grants')},
+            {'blog_posts': [], 'associates': [], 'grants': []},
+        )
+        self.assertEqual(semantic_search('token issuers')['blog_posts'], [tokens.id])
+
+    @override_settings(SOLO_EMBEDDINGS_RECHECK=0)
+    def test_store_reloads_vectors_written_by_another_process(self):
+        self._post('Token offerings', 'Rules for token issuers')
+        sync_embeddings()
+        self.assertEqual(len(get_embedding_store()), 2)
+
+        self._post('Land disputes', 'Tenancy and lease litigation')
+        with mock.patch('api.embeddings.invalidate_embedding_store'):  # No in-process signal
+            sync_embeddings()
+        self.assertEqual(len(get_embedding_store()), 4)
+
+
+def fake_stream(*parts, completion_tokens=None):
+    """Chunks shaped like an OpenAI streaming response, ending in a usage chunk if given a count"""
+    chunks = [mock.Mock(choices=[mock.Mock(delta=mock.Mock(content=part))], usage=None) for part in parts]
+    if completion_tokens is not None:
+        chunks.append(mock.Mock(choices=[], usage=mock.Mock(completion_tokens=completion_tokens)))
+    return iter(chunks)
+
+
+async def afake_stream(*parts, completion_tokens=None):
+    """Async variant of fake_stream, as returned by AsyncOpenAI"""
+    for chunk in fake_stream(*parts, completion_tokens=completion_tokens):
+        yield chunk
+
+
+@override_settings(SOLO_RETRIEVAL_TIMEOUT=None)  # Retrieve inline, inside the test transaction
+class AnswerCacheTests(TestCase):
+    """
+    Repeated first-turn questions are answered from cache until content changes
+    """
+
+    def setUp(self):
+        cache.clear()
+        reset_retrieval_index()
+        self.addCleanup(reset_retrieval_index)
+        with mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'test-key'}):
+            self.service = GeminiAIService()
+        self.service.llm.awarm = mock.AsyncMock()
+        self.service.llm.async_client = mock.Mock()
+        self.create = self.service.llm.async_client.return_value.chat.completions.create = mock.AsyncMock(
+            side_effect=lambda **kwargs: afake_stream('We advise on ', 'blockchain law.')
+        )
+
+    async def _ask(self, message, history=None):
+        stream, context = await self.service.solo_chat_stream_async(message, history)
+        return ''.join([chunk async for chunk in stream]), context
+
+    async def test_normalized_repeat_is_replayed(self):
+        answer, _ = await self._ask('What services do you offer?')
+        replayed, context = await self._ask('  what SERVICES do you offer ')
+        self.assertEqual(replayed, answer)
+        self.assertEqual(context['answer_cache'], 'hit')
+        self.assertEqual(self.create.call_count, 1)
+
+    async def test_provider_usage_is_reported_for_fresh_answers_only(self):
+        self.create.side_effect = lambda **kwargs: afake_stream('We advise on ', 'blockchain law.', completion_tokens=9)
+        _, context = await self._ask('What services do you offer?')
+        self.assertEqual(self.create.call_args.kwargs['stream_options'], {'include_usage': True})
+        self.assertEqual(context['usage'], {'completion_tokens': 9})
+
+        _, context = await self._ask('What services do you offer?')
+        self.assertEqual(context['answer_cache'], 'hit')
+        self.assertNotIn('usage', context)
+
+    async def test_failed_stream_raises_and_is_not_cached(self):
+        self.create.side_effect = RuntimeError('upstream down')
+        with self.assertRaises(LLMError):
+            await self._ask('What services do you offer?')
+
+        self.create.side_effect = lambda **kwargs: afake_stream('We advise on ', 'blockchain law.')
+        answer, context = await self._ask('What services do you offer?')
+        self.assertEqual(answer, 'We advise on blockchain law.')
+        self.assertNotIn('answer_cache', context)
+
+    async def test_follow_up_turns_are_not_cached(self):
+        history = [{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'Hello'}]
+        await self._ask('What services do you offer?', history)
+        await self._ask('What services do you offer?', history)
+        self.assertEqual(self.create.call_count, 2)
+
+    async def test_content_change_invalidates(self):
+        await self._ask('What services do you offer?')
+
+        def add_grant():
+            with self.captureOnCommitCallbacks(execute=True):
+                Grant.objects.create(title='New Award')
+
+        await sync_to_async(add_grant)()
+        await self._ask('What services do you offer?')
+        self.assertEqual(self.create.call_count, 2)
+
+
+@override_settings(SOLO_RETRIEVAL_TIMEOUT=0.05)
+class SoloRetrievalDeadlineTests(TestCase):
+    """
+    Context retrieval overlaps the provider warm-up and gives up at its deadline
+    """
+
+    def setUp(self):
+        cache.clear()
+        with mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'test-key'}):
+            self.service = GeminiAIService()
+        self.service.llm = mock.Mock()
+        self.service.llm.awarm = mock.AsyncMock()
+        self.service.llm.astream = mock.AsyncMock(side_effect=lambda operation, **params: afake_stream('Hello.'))
+        index_ready = mock.patch('api.ai_service.retrieval_index_ready', return_value=True)
+        self.retrieval_index_ready = index_ready.start()
+        self.addCleanup(index_ready.stop)
+
+    async def test_slow_retrieval_degrades_to_context_free_answer(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_retrieval(message):
+            release.wait(5)
+            return {'blog_posts': [], 'associates': [], 'grants': [], 'services': []}
+
+        started = time.monotonic()
+        with mock.patch.object(self.service, 'retrieve_relevant_context', side_effect=slow_retrieval):
+            stream, context = await self.service.solo_chat_stream_async('What services do you offer?')
+            answer = ''.join([chunk async for chunk in stream])
+
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertEqual(answer, 'Hello.')
+            self.assertEqual(context['retrieval'], 'timeout')
+            self.service.llm.awarm.assert_called_once()
+            # Only the system prompt and the question: no context message, and nothing cached
+            messages = self.service.llm.astream.call_args.kwargs['messages']
+            self.assertEqual([message['role'] for message in messages], ['system', 'user'])
+            _, context = await self.service.solo_chat_stream_async('What services do you offer?')
+            self.assertNotIn('answer_cache', context)
+
+    async def test_cold_index_build_is_bounded_by_the_deadline(self):
+        self.retrieval_index_ready.return_value = False
+        built = threading.Event()
+
+        def cold_retrieval(message):
+            time.sleep(0.2)  # Building the index takes longer than the deadline
+            built.set()
+            return {'blog_posts': [], 'associates': [], 'grants': [], 'services': ['litigation']}
+
+        started = time.monotonic()
+        with mock.patch.object(self.service, 'retrieve_relevant_context', side_effect=cold_retrieval):
+            context = await self.service.aretrieve_solo_context('Any litigation news?')
+            self.assertLess(time.monotonic() - started, 0.2)
+            self.assertEqual(context['retrieval'], 'index_cold')
+            self.assertTrue(await asyncio.to_thread(built.wait, 1))  # The build finishes in the background
+
+    async def test_async_retrieval_runs_alongside_warm_up(self):
+        warmed = asyncio.Event()
+        self.service.llm.awarm = mock.AsyncMock(side_effect=lambda: warmed.set())
+
+        def retrieval(message):
+            return {'blog_posts': [], 'associates': [], 'grants': [], 'services': ['litigation']}
+
+        with mock.patch.object(self.service, 'retrieve_relevant_context', side_effect=retrieval):
+            with mock.patch.object(self.service, '_streams') as streams:
+                streams.ajoin.return_value = (mock.Mock(), False)
+                _, context = await self.service.solo_chat_stream_async('Any litigation news?')
+
+        await asyncio.wait_for(warmed.wait(), 1)
+        self.assertEqual(context['services'], ['litigation'])
+        self.assertNotIn('retrieval', context)
+
+
+@override_settings(SOLO_SUMMARY_ASYNC=False)
+class AsyncSoloChatTests(TestCase):
+    """
+    The async chat view streams chunks and persists the turn with async ORM calls
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_streams_and_saves_turn(self):
+        async def chunks():
+            for part in ('Hello ', 'from ', 'Solo.'):
+                yield part
+
+        service = mock.Mock()
+        service.solo_chat_stream_async = mock.AsyncMock(return_value=(chunks(), {'services': ['litigation']}))
+
+        with mock.patch('api.views.get_ai_service', return_value=service):
+            response = await AsyncClient().post(
+                '/api/v1/solo/chat/', {'message': 'Hi', 'session_id': 'abc'}, content_type='application/json'
+            )
+            body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+        self.assertEqual(body, 'Hello from Solo.')
+        self.assertEqual(response['X-Session-Id'], 'abc')
+        conversation = await AIConversation.objects.aget(session_id='abc')
+        self.assertEqual(conversation.message_count, 2)
+        self.assertEqual(
+            await conversation.aget_history(),
+            [{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'Hello from Solo.'}],
+        )
+        analytics = await ChatAnalytics.objects.aget(session_id='abc')
+        self.assertEqual(analytics.ai_response, 'Hello from Solo.')
+        self.assertIsNotNone(analytics.time_to_first_token_ms)
+        self.assertEqual(analytics.completion_tokens, 5)
+
+    async def test_provider_usage_replaces_the_estimate(self):
+        context = {}
+
+        async def chunks():
+            yield 'Hello from Solo.'
+            context['usage'] = {'completion_tokens': 12}
+
+        service = mock.Mock()
+        service.solo_chat_stream_async = mock.AsyncMock(return_value=(chunks(), context))
+
+        with mock.patch('api.views.get_ai_service', return_value=service):
+            response = await AsyncClient().post(
+                '/api/v1/solo/chat/', {'message': 'Hi', 'session_id': 'usage'}, content_type='application/json'
+            )
+            [chunk async for chunk in response.streaming_content]
+
+        analytics = await ChatAnalytics.objects.aget(session_id='usage')
+        self.assertEqual(analytics.completion_tokens, 12)
+
+    @staticmethod
+    def _events(body):
+        """(event, data) pairs and the number of heartbeat comments in an SSE body"""
+        events, heartbeats = [], 0
+        for frame in body.strip().split('\n\n'):
+            if frame.startswith(':'):
+                heartbeats += 1
+                continue
+            fields = dict(line.split(': ', 1) for line in frame.split('\n'))
+            events.append((fields['event'], json.loads(fields['data'])))
+        return events, heartbeats
+
+    @override_settings(SOLO_SSE_HEARTBEAT_SECONDS=0.01)
+    async def test_event_stream_sends_typed_events_and_heartbeats(self):
+        async def chunks():
+            await asyncio.sleep(0.05)  # Model thinking: heartbeats go out meanwhile
+            for part in ('Hello ', 'there.'):
+                yield part
+
+        service = mock.Mock()
+        service.solo_chat_stream_async = mock.AsyncMock(return_value=(chunks(), {'prompt_version': 'solo_system@v1'}))
+
+        with mock.patch('api.views.get_ai_service', return_value=service):
+            response = await AsyncClient().post(
+                '/api/v1/solo/chat/', {'message': 'Hi', 'session_id': 'sse'}, content_type='application/json',
+                headers={'Accept': 'text/event-stream'},
+            )
+            body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events, heartbeats = self._events(body)
+        self.assertGreater(heartbeats, 0)
+        self.assertEqual([name for name, _ in events], ['context', 'token', 'token', 'done'])
+        self.assertEqual(events[0][1]['context']['prompt_version'], 'solo_system@v1')
+        self.assertEqual(''.join(data['text'] for name, data in events if name == 'token'), 'Hello there.')
+
+        done = events[-1][1]
+        self.assertEqual(done['session_id'], 'sse')
+        self.assertGreaterEqual(done['timing']['ttft_ms'], 50)
+        analytics = await ChatAnalytics.objects.aget(session_id='sse')
+        self.assertEqual(analytics.time_to_first_token_ms, done['timing']['ttft_ms'])
+        self.assertEqual(analytics.completion_tokens, done['usage']['completion_tokens'])
+
+    async def test_event_stream_reports_errors_as_events(self):
+        async def chunks():
+            yield 'Partial'
+            raise LLMUnavailableError('AI service is temporarily unavailable')
+
+        service = mock.Mock()
+        service.solo_chat_stream_async = mock.AsyncMock(return_value=(chunks(), {}))
+
+        with mock.patch('api.views.get_ai_service', return_value=service):
+            response = await AsyncClient().post(
+                '/api/v1/solo/chat/', {'message': 'Hi', 'session_id': 'err', 'stream': 'sse'},
+                content_type='application/json',
+            )
+            body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+        events, _ = self._events(body)
+        self.assertEqual([name for name, _ in events], ['context', 'token', 'error'])
+        self.assertTrue(events[-1][1]['retryable'])
+        self.assertFalse(await AIConversation.objects.filter(session_id='err', message_count__gt=0).aexists())
+
+    async def test_rejects_empty_message(self):
+        response = await AsyncClient().post('/api/v1/solo/chat/', {'message': ' '}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ChatMessageTests(TestCase):
+    """
+    Conversation turns are appended as rows and history is read with one indexed query
+    """
+
+    def test_append_and_read_last_messages(self):
+        conversation = AIConversation.objects.create(session_id='long')
+        for turn in range(8):
+            conversation.append_messages([('user', f'q{turn}'), ('assistant', f'a{turn}')])
+
+        with CaptureQueriesContext(connection) as ctx:
+            conversation.append_messages([('user', 'q8'), ('assistant', 'a8')])
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+        with self.assertNumQueries(1):
+            history = conversation.get_history(10)
+        self.assertEqual(history[0], {'role': 'user', 'content': 'q4'})
+        self.assertEqual(history[-1], {'role': 'assistant', 'content': 'a8'})
+        self.assertEqual(AIConversation.objects.get(pk=conversation.pk).message_count, 18)
+
+    def test_appends_from_a_stale_copy_take_the_next_seqs(self):
+        conversation = AIConversation.objects.create(session_id='concurrent')
+        stale = AIConversation.objects.get(pk=conversation.pk)  # Loaded by a concurrent request
+        conversation.append_messages([('user', 'q1'), ('assistant', 'a1')])
+        stale.append_messages([('user', 'q2'), ('assistant', 'a2')])
+
+        self.assertEqual(stale.message_count, 4)
+        self.assertEqual(
+            list(conversation.chat_messages.order_by('seq').values_list('seq', 'content')),
+            [(1, 'q1'), (2, 'a1'), (3, 'q2'), (4, 'a2')],
+        )
+
+
+class ChatHistoryBudgetTests(TestCase):
+    """
+    History is bounded by estimated tokens, and older turns fold into a rolling summary
+    """
+
+    def setUp(self):
+        self.conversation = AIConversation.objects.create(session_id='budget')
+        for turn in range(6):
+            self.conversation.append_messages([('user', f'question {turn} ' + 'x' * 200), ('assistant', f'answer {turn} ' + 'y' * 200)])
+
+    def test_history_fits_budget_and_starts_with_user(self):
+        history = build_history(self.conversation, budget=200)
+        self.assertLessEqual(sum(message_tokens(m) for m in history), 200)
+        self.assertEqual(history[0]['role'], 'user')
+        self.assertTrue(history[-1]['content'].startswith('answer 5'))
+
+    def test_refresh_folds_older_messages_into_summary(self):
+        summarize = mock.Mock(return_value='Visitor asked about questions 0-4.')
+
+        self.assertTrue(refresh_summary(self.conversation, summarize, budget=300))
+        previous, folded = summarize.call_args[0]
+        self.assertEqual(previous, '')
+        self.assertTrue(folded[0]['content'].startswith('question 0'))
+
+        conversation = AIConversation.objects.get(pk=self.conversation.pk)
+        self.assertEqual(conversation.summary, 'Visitor asked about questions 0-4.')
+        history = build_history(conversation, budget=300)
+        self.assertEqual(history[0]['role'], 'system')
+        self.assertIn('questions 0-4', history[0]['content'])
+        self.assertFalse(any(m['content'].startswith(folded[-1]['content'][:10]) for m in history[1:]))
+
+        # Within budget again: no second summarization call
+        summarize.reset_mock()
+        self.assertFalse(refresh_summary(conversation, summarize, budget=300))
+        summarize.assert_not_called()
+
+    def test_summary_failure_keeps_messages(self):
+        summarize = mock.Mock(side_effect=RuntimeError('upstream down'))
+        self.assertFalse(refresh_summary(self.conversation, summarize, budget=300))
+        self.assertEqual(AIConversation.objects.get(pk=self.conversation.pk).summary_through_seq, 0)
+
+
+class PromptRegistryTests(TestCase):
+    """
+    Prompts are loaded once, versioned, and keep a byte-stable prefix
+    """
+
+    def setUp(self):
+        cache.clear()
+        with mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'test-key'}):
+            self.service = GeminiAIService()
+
+    def test_templates_are_versioned_and_rendered(self):
+        self.assertTrue(all(prompts.versions().values()))
+        rendered = prompts['overview_request'].render(title='AI Act', content='Body')
+        self.assertIn('Title: AI Act', rendered)
+        with self.assertRaises(ValueError):
+            parse_template('broken', 'no header here')
+
+    def test_solo_prefix_is_stable_and_context_trails(self):
+        history = [{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'Hello'}]
+        first = self.service._build_solo_messages('Who are you?', history, 'Blog A')
+        second = self.service._build_solo_messages('Any grants?', history, 'Grant B')
+
+        self.assertEqual(first[:3], second[:3])
+        self.assertIs(first[0]['content'], prompts['solo_system'].text)
+        self.assertIn('Grant B', second[-2]['content'])
+        self.assertEqual(second[-1], {'role': 'user', 'content': 'Any grants?'})
+
+        _, context, _, _ = self.service._prepare_solo_chat('Hello', inject_context=False)
+        self.assertEqual(context['prompt_version'], prompts['solo_system'].label)
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """
+    Serves queued (status, delay) responses in the OpenAI chat completion format
+    """
+
+    def do_HEAD(self):
+        self.server.warmups += 1
+        self.send_response(200)
+        self.end_headers()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.hits += 1
+        status_code, delay = self.server.responses.pop(0) if self.server.responses else (200, 0)
+        time.sleep(delay)
+        body = json.dumps({
+            'id': 'stub', 'object': 'chat.completion', 'created': 0, 'model': 'stub',
+            'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'ok'}}],
+        } if status_code == 200 else {'error': {'message': 'stub failure'}}).encode()
+        try:
+            self.send_response(status_code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client timed out and hung up
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(LLM_RETRY_BASE_DELAY=0, LLM_RETRY_MAX_DELAY=0)
+class ResilientLLMClientTests(TestCase):
+    """
+    Timeouts, retries and the circuit breaker, against a local stub server
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubLLMHandler)
+        self.server.responses = []
+        self.server.hits = 0
+        self.server.warmups = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.breaker = CircuitBreaker('stub', failure_threshold=2, reset_timeout=0.2)
+        self.metrics = LLMMetrics()
+        self.llm = ResilientLLMClient(
+            'test-key', f'http://127.0.0.1:{self.server.server_address[1]}/',
+            breaker=self.breaker, metrics=self.metrics,
+            operations={'quick': Operation('quick', connect=1.0, read=0.2, max_attempts=1)},
+        )
+
+    def _complete(self, operation='chat'):
+        return self.llm.complete(operation, model='stub', messages=[{'role': 'user', 'content': 'Hi'}])
+
+    def test_warm_up_only_when_no_connection_is_pooled(self):
+        self.assertTrue(self.llm.warm())
+        self.assertFalse(self.llm.warm())
+        self.assertEqual(self.server.warmups, 1)
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.llm._last_used = 0.0
+        self.assertFalse(self.llm.warm())  # Nothing to warm while the circuit is open
+
+    def test_transient_failure_is_retried(self):
+        self.server.responses = [(503, 0)]
+        self.assertEqual(self._complete().choices[0].message.content, 'ok')
+        self.assertEqual(self.server.hits, 2)
+        self.assertEqual(self.metrics.snapshot()['chat']['retries'], 1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.responses = [(400, 0)]
+        with self.assertRaises(LLMError):
+            self._complete()
+        self.assertEqual(self.server.hits, 1)
+
+    def test_read_timeout_per_operation(self):
+        self.server.responses = [(200, 0.5)]
+        with self.assertRaises(LLMError):
+            self._complete('quick')
+        self.assertEqual(self.metrics.snapshot()['quick']['failures'], 1)
+
+    def test_breaker_fails_fast_then_recovers(self):
+        self.server.responses = [(503, 0), (503, 0)]
+        with self.assertRaises(LLMError):
+            self._complete()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(LLMUnavailableError):
+            self._complete()
+        self.assertEqual(self.server.hits, 2)
+        self.assertEqual(self.metrics.snapshot()['chat']['rejected'], 1)
+
+        time.sleep(0.25)
+        self._complete()  # Half-open trial succeeds
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+class AdmissionControlTests(TestCase):
+    """
+    AI endpoints are rate limited per IP/session and capped in concurrency, staff first
+    """
+
+    def setUp(self):
+        cache.clear()
+        reset_limiters()
+        self.addCleanup(reset_limiters)
+
+    def test_token_bucket_refills(self):
+        self.assertEqual(take_token('bucket', per_minute=60, burst=2, now=100.0), 0)
+        self.assertEqual(take_token('bucket', per_minute=60, burst=2, now=100.0), 0)
+        self.assertAlmostEqual(take_token('bucket', per_minute=60, burst=2, now=100.0), 1.0)
+        self.assertEqual(take_token('bucket', per_minute=60, burst=2, now=101.0), 0)
+
+    def test_staff_waiters_are_served_first(self):
+        limiter = ConcurrencyLimiter('test', limit=1, max_queue=2)
+        limiter.acquire()
+        order = []
+
+        def wait(label, priority):
+            limiter.acquire(priority, timeout=2)
+            order.append(label)
+            limiter.release()
+
+        anonymous = threading.Thread(target=wait, args=('anonymous', ANONYMOUS_PRIORITY))
+        anonymous.start()
+        while limiter.snapshot()['queued'] < 1:
+            time.sleep(0.001)
+        staff = threading.Thread(target=wait, args=('staff', STAFF_PRIORITY))
+        staff.start()
+        while limiter.snapshot()['queued'] < 2:
+            time.sleep(0.001)
+
+        with self.assertRaises(AdmissionRejected):
+            limiter.acquire(timeout=0)  # Queue is full
+
+        limiter.release()
+        anonymous.join()
+        staff.join()
+        self.assertEqual(order, ['staff', 'anonymous'])
+        self.assertEqual(limiter.snapshot(), {'limit': 1, 'in_use': 0, 'queued': 0})
+
+    @override_settings(AI_RATE_LIMITS={'ai_overview': {'ip': (1, 1)}})
+    @mock.patch('api.views.get_ai_service')
+    def test_overview_over_budget_gets_429(self, get_ai_service):
+        get_ai_service.return_value.generate_overview.return_value = 'Overview.'
+        client = APIClient()
+
+        first = client.post('/api/v1/blogs/ai-overview/', {'title': 'A', 'content': 'One'}, format='json')
+        second = client.post('/api/v1/blogs/ai-overview/', {'title': 'B', 'content': 'Two'}, format='json')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 429)
+        self.assertGreaterEqual(int(second['Retry-After']), 1)
+
+    def test_client_ip_ignores_client_supplied_forwarded_entries(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.7', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '203.0.113.7')  # Appended by the platform proxy
+        with override_settings(AI_TRUSTED_PROXIES=0):
+            self.assertEqual(client_ip(request), '10.0.0.1')
+
+    def test_concurrent_release_frees_each_slot_once(self):
+        admission = admit('solo_chat')
+        threads = [threading.Thread(target=admission.release) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(get_limiter('solo_chat').snapshot()['in_use'], 0)
+        self.assertEqual(get_limiter('upstream').snapshot()['in_use'], 0)
+
+    def test_locmem_cache_is_flagged_at_startup(self):
+        with override_settings(CACHE_BACKEND='locmem'):
+            self.assertEqual([issue.id for issue in check_shared_cache(None)], ['api.W001'])
+        with override_settings(CACHE_BACKEND='redis'):
+            self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(AI_CONCURRENCY={'solo_chat': 0}, AI_QUEUE_SIZE=0)
+    async def test_chat_without_capacity_gets_429(self):
+        response = await AsyncClient().post(
+            '/api/v1/solo/chat/', {'message': 'Hi', 'session_id': 'busy'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(await AIConversation.objects.filter(session_id='busy').aexists())
+
+
+class KeywordMatcherTests(TestCase):
+    """
+    Intents and practice areas are found in one pass, on word boundaries
+    """
+
+    def test_word_boundaries_and_plurals(self):
+        self.assertEqual(SOLO_TOPIC_MATCHER.labels('Do you handle shipping partnerships?'), [])
+        self.assertEqual(
+            SOLO_TOPIC_MATCHER.labels('Protecting IP and patents for my AI startup'),
+            ['artificial intelligence', 'intellectual property', 'corporate law'],
+        )
+        self.assertEqual(SOLO_TOPIC_MATCHER.labels('Any open grants?'), [GRANT_QUERY, 'grants and scholarships'])
+
+    def test_longer_keywords_imply_contained_ones(self):
+        found = BLOG_INTENT_MATCHER.find('Write a SEO description')
+        self.assertEqual(found, {'seo description', 'seo'})
+        self.assertEqual(BLOG_INTENT_MATCHER.labels(found=found), ['blog_meta_description', 'seo'])
+
+
+class SingleFlightTests(TestCase):
+    """
+    Identical concurrent AI requests share one upstream call
+    """
+
+    def setUp(self):
+        cache.clear()
+        with mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'test-key'}):
+            self.service = GeminiAIService()
+        self.release = threading.Event()
+
+    def test_concurrent_completions_share_one_call(self):
+        def complete(operation, **params):
+            self.release.wait(2)
+            return mock.Mock(choices=[mock.Mock(message=mock.Mock(content='Shared overview.'))])
+
+        self.service.llm.complete = mock.Mock(side_effect=complete)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.service.generate_overview('Title', 'Body')))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        while not self.service.llm.complete.called:
+            time.sleep(0.001)
+        time.sleep(0.05)  # Let the followers join the flight
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['Shared overview.'] * 3)
+        self.assertEqual(self.service.llm.complete.call_count, 1)
+
+    async def test_identical_streams_fan_out(self):
+        release = asyncio.Event()
+
+        async def gated_stream(operation, **params):
+            async def chunks():
+                async for chunk in afake_stream('Hello '):
+                    yield chunk
+                await release.wait()
+                async for chunk in afake_stream('there.'):
+                    yield chunk
+            return chunks()
+
+        self.service.llm.astream = mock.AsyncMock(side_effect=gated_stream)
+
+        first, _ = await self.service.solo_chat_stream_async('Hi', inject_context=False)
+        self.assertEqual(await first.__anext__(), 'Hello ')
+        second, context = await self.service.solo_chat_stream_async('Hi', inject_context=False)
+        release.set()
+
+        self.assertEqual(''.join([c async for c in second]), 'Hello there.')  # Late joiner gets the full answer
+        self.assertEqual(''.join([c async for c in first]), 'there.')
+        self.assertTrue(context['coalesced'])
+        self.assertEqual(self.service.llm.astream.call_count, 1)
+
+    async def test_async_stream_fan_out(self):
+        release = asyncio.Event()
+
+        async def upstream():
+            yield 'Hello '
+            await release.wait()
+            yield 'there.'
+
+        flights = StreamFlights()
+        first, joined_first = flights.ajoin('key', upstream)
+        second, joined_second = flights.ajoin('key', upstream)
+        release.set()
+
+        self.assertEqual(([c async for c in first], joined_first), (['Hello ', 'there.'], False))
+        self.assertEqual(([c async for c in second], joined_second), (['Hello ', 'there.'], True))
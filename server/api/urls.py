@@ -27,11 +27,13 @@ urlpatterns = [
     path('blogs/ai-assist/', views.blog_ai_assistant, name='blog-ai-assistant'),
     path('blogs/ai-overview/', views.generate_ai_overview, name='generate-ai-overview'),
     path('blogs/<slug:slug>/', views.blog_detail, name='blog-detail'),
+    path('blogs/<slug:slug>/ai-overview/', views.blog_ai_overview_status, name='blog-ai-overview-status'),
 
     # AI Features
     path('solo/chat/', views.solo_chat, name='solo-chat'),
     path('solo/analytics/', views.solo_analytics, name='solo-analytics'),
     path('solo/analytics/trends/', views.solo_analytics_trends, name='solo-analytics-trends'),
+    path('solo/llm-metrics/', views.llm_client_metrics, name='llm-client-metrics'),
 
     # Contact
     path('contact/submit/', views.submit_contact, name='submit-contact'),
@@ -0,0 +1,246 @@
+"""
+Buffered blog view counter
+
+Public blog reads call record_view() instead of writing to the database.
+Hits are counted in the cache with cache.incr() under one key per (post,
+day), so every worker adds to the same buffer, and nothing is lost when a
+serverless instance is frozen or killed (use redis: the file backend's
+incr is not atomic across processes). The buffer is flushed once it holds
+BLOG_VIEW_FLUSH_THRESHOLD hits, or by the first hit arriving
+BLOG_VIEW_FLUSH_INTERVAL seconds after it started filling.
+
+A flush only reads the counters that exist. The hit that creates a counter
+registers its (post, day) in a numbered index slot (the slot number comes
+from cache.incr, so concurrent workers never overwrite each other), and the
+flusher folds new slots into a tracked list and drops entries whose counters
+have expired. Flush cost follows the posts actually viewed, not the size of
+the archive, and hits from any day are kept until flushed.
+
+Each write is one UPDATE with F() increments for BlogPost.view_count plus
+one INSERT ... ON CONFLICT DO UPDATE adding to the daily BlogPostDailyView
+rows, so concurrent workers never lose hits.
+
+Buffering needs a cache shared by all workers (BLOG_VIEW_BUFFERED defaults
+to on only for the file and redis backends). With the per-process locmem
+cache each view is written through immediately instead, with the same two
+statements.
+"""
+
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'blog-views'
+PENDING_KEY = f'{KEY_PREFIX}:pending'
+BUFFER_STARTED_KEY = f'{KEY_PREFIX}:started'
+FLUSH_LOCK_KEY = f'{KEY_PREFIX}:flushing'
+INDEX_SEQ_KEY = f'{KEY_PREFIX}:index:seq'    # Last slot handed out
+INDEX_READ_KEY = f'{KEY_PREFIX}:index:read'  # Last slot folded into the tracked list
+TRACKED_KEY = f'{KEY_PREFIX}:index:tracked'
+COUNTER_TIMEOUT = 60 * 60 * 48  # Counters outlive the day they count, until a flush picks them up
+
+
+def _flush_threshold():
+    return getattr(settings, 'BLOG_VIEW_FLUSH_THRESHOLD', 50)
+
+
+def _flush_interval():
+    return getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 30)
+
+
+def _buffered():
+    return getattr(settings, 'BLOG_VIEW_BUFFERED', False)
+
+
+def _counter_key(post_id, day):
+    return f'{KEY_PREFIX}:{post_id}:{day.isoformat()}'
+
+
+def _slot_key(slot):
+    return f'{KEY_PREFIX}:index:{slot}'
+
+
+def _incr(key, delta=1):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:  # Missing (or just expired) key
+        cache.add(key, 0, timeout=COUNTER_TIMEOUT)
+        return cache.incr(key, delta)
+
+
+def _count(post_id, day, hits=1):
+    """Add hits to a (post, day) counter, registering the counter when this creates it"""
+    key = _counter_key(post_id, day)
+    try:
+        cache.incr(key, hits)
+        return
+    except ValueError:
+        pass
+    if cache.add(key, 0, timeout=COUNTER_TIMEOUT):
+        cache.add(INDEX_SEQ_KEY, 0, timeout=None)
+        cache.set(_slot_key(cache.incr(INDEX_SEQ_KEY)), (post_id, day), timeout=COUNTER_TIMEOUT)
+    cache.incr(key, hits)
+
+
+def _read_index():
+    """
+    Returns:
+        tuple: (last contiguous slot read, list of (post_id, date) that may have hits)
+    """
+    read = cache.get(INDEX_READ_KEY) or 0
+    latest = cache.get(INDEX_SEQ_KEY) or 0
+    if read > latest:  # The sequence was evicted and restarted
+        read = 0
+    slots = cache.get_many([_slot_key(slot) for slot in range(read + 1, latest + 1)])
+    entries = list(cache.get(TRACKED_KEY) or [])
+    # Stop at the first gap: a slot is numbered before its entry is stored
+    while _slot_key(read + 1) in slots:
+        read += 1
+        entries.append(slots[_slot_key(read)])
+    return read, list(dict.fromkeys(entries))
+
+
+def _compact_index():
+    """Fold new slots into the tracked list and drop expired counters (call under the flush lock)"""
+    previous = cache.get(INDEX_READ_KEY) or 0
+    read, entries = _read_index()
+    alive = cache.get_many([_counter_key(*entry) for entry in entries])
+    cache.set(TRACKED_KEY, [entry for entry in entries if _counter_key(*entry) in alive], timeout=COUNTER_TIMEOUT)
+    cache.set(INDEX_READ_KEY, read, timeout=None)
+    first = previous if previous <= read else 0  # 0 when the sequence restarted
+    cache.delete_many([_slot_key(slot) for slot in range(first + 1, read + 1)])
+
+
+def record_view(post_id):
+    """
+    Buffer one view of a blog post, flushing if the buffer is due
+    """
+    if not _buffered():
+        _write_batch({(post_id, timezone.localdate()): 1})
+        return
+
+    _count(post_id, timezone.localdate())
+    pending = _incr(PENDING_KEY)
+    cache.add(BUFFER_STARTED_KEY, time.time(), timeout=COUNTER_TIMEOUT)
+    started = cache.get(BUFFER_STARTED_KEY) or time.time()
+    due = (
+        pending >= _flush_threshold() or
+        time.time() - started >= _flush_interval()
+    )
+
+    if due:
+        flush_views()
+
+
+def pending_views():
+    """Return a snapshot of unflushed hits as {(post_id, date): count}"""
+    _, entries = _read_index()
+    counters = cache.get_many([_counter_key(*entry) for entry in entries])
+    return {
+        entry: counters[_counter_key(*entry)]
+        for entry in entries
+        if counters.get(_counter_key(*entry))
+    }
+
+
+def flush_views():
+    """
+    Write buffered hits to the database
+
+    Returns:
+        int: Number of hits flushed
+    """
+    # One flusher at a time, or two could write the same hits
+    if not cache.add(FLUSH_LOCK_KEY, True, timeout=60):
+        return 0
+    try:
+        cache.delete(BUFFER_STARTED_KEY)  # The next hit starts a new interval
+        _compact_index()
+        batch = pending_views()
+        if not batch:
+            return 0
+        # Take the hits out of the buffer; hits recorded meanwhile stay for the next flush
+        for (post_id, day), hits in batch.items():
+            cache.decr(_counter_key(post_id, day), hits)
+        _incr(PENDING_KEY, -sum(batch.values()))
+        return _write_batch(batch)
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def _write_batch(batch):
+    """
+    Add {(post_id, date): hits} to view_count and the daily rows in one transaction
+
+    Returns:
+        int: Number of hits written
+    """
+    from .models import BlogPost
+
+    per_post = Counter()
+    for (post_id, _), hits in batch.items():
+        per_post[post_id] += hits
+
+    try:
+        with transaction.atomic():
+            updated = BlogPost.objects.filter(id__in=per_post).update(
+                view_count=F('view_count') + Case(
+                    *[When(id=post_id, then=Value(hits)) for post_id, hits in per_post.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+            rows = batch
+            if updated < len(per_post):
+                # Some posts were deleted since their views were recorded
+                existing = set(BlogPost.objects.filter(id__in=per_post).values_list('id', flat=True))
+                rows = {key: hits for key, hits in batch.items() if key[0] in existing}
+            _add_daily_views(rows)
+    except Exception as e:
+        # Put the hits back so the next flush retries them
+        if _buffered():
+            for (post_id, day), hits in batch.items():
+                _count(post_id, day, hits)
+            _incr(PENDING_KEY, sum(batch.values()))
+        logger.error(f'Failed to flush {sum(batch.values())} blog views: {e}')
+        return 0
+
+    return sum(batch.values())
+
+
+def _add_daily_views(rows):
+    """
+    Add {(post_id, date): hits} to the daily rows with a single upsert
+
+    The ORM can't express "insert, or add to the existing row", so this is
+    INSERT ... ON CONFLICT (post, date) DO UPDATE SET views = views + excluded
+    (PostgreSQL, and SQLite 3.24+).
+    """
+    from .models import BlogPostDailyView
+
+    if not rows:
+        return
+    meta = BlogPostDailyView._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    post, date, views = (qn(meta.get_field(name).column) for name in ('post', 'date', 'views'))
+    date_field = meta.get_field('date')
+
+    params = []
+    for (post_id, day), hits in rows.items():
+        params.extend([post_id, date_field.get_db_prep_value(day, connection), hits])
+    values = ', '.join(['(%s, %s, %s)'] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({post}, {date}, {views}) VALUES {values} '
+            f'ON CONFLICT ({post}, {date}) DO UPDATE SET {views} = {table}.{views} + EXCLUDED.{views}',
+            params,
+        )
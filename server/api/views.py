@@ -2,17 +2,21 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.pagination import PageNumberPagination
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.db.models import Q, Count, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from django.http import StreamingHttpResponse
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
 import json
 
 from .models import (
-    Associate, BlogCategory, BlogPost, AIConversation,
+    Associate, BlogCategory, BlogPost, BlogPostDailyView, AIConversation,
     ContactSubmission, Testimonial, User, Grant,
     ConsultationService, ConsultationBooking
 )
@@ -32,6 +36,26 @@ from .serializers import (
     BookingAdminListSerializer, BookingAdminDetailSerializer, BookingAdminUpdateSerializer,
 )
 from .permissions import IsAdminOrReadOnly, IsStaffOrSuperUser
+from .search import search_blog_posts
+from .overview_jobs import (
+    AI_OVERVIEW_MEMO_TIMEOUT, enqueue_overview, needs_overview, overview_is_current, store_overview,
+)
+from .dashboard import get_dashboard_stats
+from .reorder import ReorderError, apply_reorder
+from .response_cache import cache_response, is_staff_viewer
+from .pagination import (
+    StandardPageNumberPagination, keyset_paginated_response, wants_cursor_pagination,
+)
+from .ai_service import get_ai_service, overview_input_hash
+from .chat_history import build_history, schedule_summary_refresh
+from .chat_stream import (
+    EVENT_STREAM, HEARTBEAT, StreamTiming, heartbeat_interval, sse_event, wants_event_stream, with_heartbeats,
+)
+from .admission import (
+    AdmissionRejected, AdmittedStream, aadmit, admission_control, admit_request, check_rate_limits,
+    client_ip, limiter_snapshots, rejected_response,
+)
+from .llm_client import LLMUnavailableError, llm_metrics, provider_breaker
 
 
 # ==================== Authentication Views ====================
@@ -93,10 +117,31 @@ def logout_view(request):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+# ==================== Reorder Helper ====================
+
+def _reorder_response(request, model, message):
+    """
+    Validate a reorder payload and apply it in one statement (see api/reorder.py)
+    Returns: { "message": ..., "updated": <rows changed> }
+    """
+    serializer = ReorderSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        updated = apply_reorder(model, serializer.validated_data['items'])
+    except ReorderError as e:
+        return Response(
+            {'error': str(e), 'missing_ids': e.missing_ids},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response({'message': message, 'updated': updated})
+
+
 # ==================== Associates Views ====================
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAdminOrReadOnly])
+@cache_response(Associate)
 def associates_list_create(request):
     """
     GET: List all active associates (public)
@@ -167,12 +212,7 @@ def reorder_associates(request):
     Reorder associates by updating their order_priority
     Expects: { "items": [{"id": 1, "order_priority": 0}, {"id": 2, "order_priority": 1}, ...] }
     """
-    serializer = ReorderSerializer(data=request.data)
-    if serializer.is_valid():
-        for item in serializer.validated_data['items']:
-            Associate.objects.filter(id=item['id']).update(order_priority=item['order_priority'])
-        return Response({'message': 'Associates reordered successfully'})
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return _reorder_response(request, Associate, 'Associates reordered successfully')
 
 
 # ==================== Blog Categories Views ====================
@@ -185,7 +225,7 @@ def categories_list_create(request):
     POST: Create new category (admin only)
     """
     if request.method == 'GET':
-        categories = BlogCategory.objects.all()
+        categories = BlogCategory.objects.with_published_count()
         serializer = BlogCategorySerializer(categories, many=True)
         return Response(serializer.data)
 
@@ -231,18 +271,14 @@ def reorder_categories(request):
     Reorder categories by updating their order_priority
     Expects: { "items": [{"id": 1, "order_priority": 0}, {"id": 2, "order_priority": 1}, ...] }
     """
-    serializer = ReorderSerializer(data=request.data)
-    if serializer.is_valid():
-        for item in serializer.validated_data['items']:
-            BlogCategory.objects.filter(id=item['id']).update(order_priority=item['order_priority'])
-        return Response({'message': 'Categories reordered successfully'})
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return _reorder_response(request, BlogCategory, 'Categories reordered successfully')
 
 
 # ==================== Blog Posts Views ====================
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAdminOrReadOnly])
+@cache_response(BlogPost, BlogCategory)
 def blogs_list_create(request):
     """
     GET: List published blogs (public) or all blogs (admin)
@@ -255,8 +291,8 @@ def blogs_list_create(request):
         is_featured = request.query_params.get('is_featured', '')
         ordering = request.query_params.get('ordering', '-publish_date')
 
-        # Build queryset
-        queryset = BlogPost.objects.all()
+        # Build queryset (the body is never needed for listings)
+        queryset = BlogPost.objects.defer('content', 'search_vector').with_list_relations()
 
         # If not admin, show only published posts
         if not (request.user.is_authenticated and (request.user.is_staff or request.user.is_superuser)):
@@ -264,11 +300,7 @@ def blogs_list_create(request):
 
         # Filters
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(excerpt__icontains=search) |
-                Q(content__icontains=search)
-            )
+            queryset = search_blog_posts(queryset, search)
 
         if category:
             queryset = queryset.filter(categories__slug=category)
@@ -276,12 +308,21 @@ def blogs_list_create(request):
         if is_featured:
             queryset = queryset.filter(is_featured=True)
 
-        # Ordering
-        queryset = queryset.order_by(ordering).distinct()
+        # Keyset pagination on (publish date, id); drafts without a publish date use created_at
+        if wants_cursor_pagination(request) and not search and 'ordering' not in request.query_params:
+            queryset = queryset.annotate(sort_date=Coalesce('publish_date', 'created_at')).distinct()
+            return keyset_paginated_response(
+                request, queryset, BlogPostListSerializer, ('-sort_date', '-id')
+            )
+
+        # Ordering (search results are ranked by relevance unless an explicit ordering is requested)
+        if search and 'ordering' not in request.query_params:
+            queryset = queryset.order_by('-rank', ordering).distinct()
+        else:
+            queryset = queryset.order_by(ordering).distinct()
 
         # Pagination
-        paginator = PageNumberPagination()
-        paginator.page_size = request.query_params.get('page_size', 20)
+        paginator = StandardPageNumberPagination()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
 
         serializer = BlogPostListSerializer(paginated_queryset, many=True)
@@ -293,18 +334,9 @@ def blogs_list_create(request):
             # Author will be set by serializer to default "LightField LP" if not provided
             blog_post = serializer.save()
 
-            # Auto-generate AI overview if not provided and content exists
-            if not blog_post.ai_overview and blog_post.content:
-                try:
-                    ai_service = get_ai_service()
-                    blog_post.ai_overview = ai_service.generate_overview(
-                        blog_post.title,
-                        blog_post.content
-                    )
-                    blog_post.save(update_fields=['ai_overview'])
-                except Exception as e:
-                    # Log error but don't fail the request
-                    print(f"Failed to generate AI overview: {str(e)}")
+            # Auto-generate AI overview in the background if not provided and content exists
+            if needs_overview(blog_post):
+                enqueue_overview(blog_post)
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -319,15 +351,23 @@ def blogs_list_create(request):
         return Response(formatted_errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _count_cached_blog_view(request, data):
+    # Cached detail responses skip the view body, so count the public read here
+    if not is_staff_viewer(request):
+        from .view_counter import record_view
+        record_view(data['id'])
+
+
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAdminOrReadOnly])
+@cache_response(BlogPost, BlogCategory, on_hit=_count_cached_blog_view)
 def blog_detail(request, slug):
     """
     GET: Retrieve blog detail and increment view count (public)
     PUT/PATCH: Update blog (admin only)
     DELETE: Delete blog (admin only)
     """
-    blog = get_object_or_404(BlogPost, slug=slug)
+    blog = get_object_or_404(BlogPost.objects.defer('search_vector').with_list_relations(), slug=slug)
 
     # Check if blog is published for non-admin users
     if request.method == 'GET':
@@ -359,17 +399,9 @@ def blog_detail(request, slug):
             regenerate = request.data.get('regenerate_ai_overview', False)
             content_changed = old_content != updated_blog.content
 
-            if (not updated_blog.ai_overview or regenerate or (content_changed and len(updated_blog.content) > 100)):
-                try:
-                    ai_service = get_ai_service()
-                    updated_blog.ai_overview = ai_service.generate_overview(
-                        updated_blog.title,
-                        updated_blog.content
-                    )
-                    updated_blog.save(update_fields=['ai_overview'])
-                except Exception as e:
-                    # Log error but don't fail the request
-                    print(f"Failed to regenerate AI overview: {str(e)}")
+            # The overview is generated in the background; poll blog_ai_overview_status for it
+            if needs_overview(updated_blog, content_changed=content_changed, regenerate=regenerate):
+                enqueue_overview(updated_blog, force=bool(regenerate))
 
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -379,18 +411,36 @@ def blog_detail(request, slug):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['GET'])
+@permission_classes([IsStaffOrSuperUser])
+def blog_ai_overview_status(request, slug):
+    """
+    Poll the background AI overview job for a blog post (admin only)
+    Returns: { "status": "pending|ready|failed", "overview": ..., "attempts": ..., "error": ..., "updated_at": ... }
+    """
+    blog = get_object_or_404(
+        BlogPost.objects.only(
+            'id', 'slug', 'ai_overview', 'ai_overview_status', 'ai_overview_attempts',
+            'ai_overview_error', 'ai_overview_updated_at',
+        ),
+        slug=slug,
+    )
+    return Response({
+        'status': blog.ai_overview_status,
+        'overview': blog.ai_overview,
+        'attempts': blog.ai_overview_attempts,
+        'error': blog.ai_overview_error,
+        'updated_at': blog.ai_overview_updated_at,
+    })
+
+
 @api_view(['POST'])
 @permission_classes([IsStaffOrSuperUser])
 def reorder_blogs(request):
     """
     Reorder blogs by updating their order_priority
     """
-    serializer = ReorderSerializer(data=request.data)
-    if serializer.is_valid():
-        for item in serializer.validated_data['items']:
-            BlogPost.objects.filter(id=item['id']).update(order_priority=item['order_priority'])
-        return Response({'message': 'Blogs reordered successfully'})
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return _reorder_response(request, BlogPost, 'Blogs reordered successfully')
 
 
 # ==================== Contact Submissions Views ====================
@@ -432,6 +482,11 @@ def list_contacts(request):
             Q(subject__icontains=search)
         )
 
+    if wants_cursor_pagination(request):
+        return keyset_paginated_response(
+            request, queryset, ContactSubmissionListSerializer, ('-created_at', '-id')
+        )
+
     serializer = ContactSubmissionListSerializer(queryset, many=True)
     return Response(serializer.data)
 
@@ -465,6 +520,7 @@ def contact_detail(request, pk):
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAdminOrReadOnly])
+@cache_response(Testimonial)
 def testimonials_list_create(request):
     """
     GET: List all active testimonials (public) or all testimonials (admin)
@@ -491,6 +547,11 @@ def testimonials_list_create(request):
         elif is_active.lower() == 'false':
             queryset = queryset.filter(is_active=False)
 
+        if wants_cursor_pagination(request):
+            return keyset_paginated_response(
+                request, queryset, TestimonialListSerializer, ('order_priority', '-created_at', '-id')
+            )
+
         serializer = TestimonialListSerializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -544,12 +605,7 @@ def reorder_testimonials(request):
     Reorder testimonials by updating their order_priority
     Expects: { "items": [{"id": 1, "order_priority": 0}, {"id": 2, "order_priority": 1}, ...] }
     """
-    serializer = ReorderSerializer(data=request.data)
-    if serializer.is_valid():
-        for item in serializer.validated_data['items']:
-            Testimonial.objects.filter(id=item['id']).update(order_priority=item['order_priority'])
-        return Response({'message': 'Testimonials reordered successfully'})
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return _reorder_response(request, Testimonial, 'Testimonials reordered successfully')
 
 
 # ==================== Dashboard Stats View ====================
@@ -559,31 +615,13 @@ def reorder_testimonials(request):
 def dashboard_stats(request):
     """
     Get dashboard statistics (admin only)
+    Served from a snapshot refreshed in the background (see api/dashboard.py)
     """
-    # Consultation stats
-    paid_bookings = ConsultationBooking.objects.filter(payment_verified=True)
-    consultation_revenue = paid_bookings.aggregate(Sum('amount'))['amount__sum'] or 0
-
-    stats = {
-        'total_blogs': BlogPost.objects.count(),
-        'published_blogs': BlogPost.objects.filter(is_published=True).count(),
-        'draft_blogs': BlogPost.objects.filter(is_published=False).count(),
-        'total_associates': Associate.objects.count(),
-        'active_associates': Associate.objects.filter(is_active=True).count(),
-        'total_contacts': ContactSubmission.objects.count(),
-        'unread_contacts': ContactSubmission.objects.filter(status='unread').count(),
-        'total_views': BlogPost.objects.aggregate(Sum('view_count'))['view_count__sum'] or 0,
-        'total_testimonials': Testimonial.objects.count(),
-        'active_testimonials': Testimonial.objects.filter(is_active=True).count(),
-        'total_grants': Grant.objects.count(),
-        'active_grants': Grant.objects.filter(is_active=True).count(),
-        'total_bookings': ConsultationBooking.objects.count(),
-        'paid_bookings': paid_bookings.count(),
-        'consultation_revenue': float(consultation_revenue),
-        'pending_confirmations': ConsultationBooking.objects.filter(status='paid').count(),
-    }
+    stats, age = get_dashboard_stats()
 
-    return Response(stats)
+    response = Response(stats)
+    response['X-Snapshot-Age'] = str(int(age))
+    return response
 
 
 @api_view(['GET'])
@@ -591,23 +629,24 @@ def dashboard_stats(request):
 def blog_views_over_time(request):
     """
     Get blog views data over time for area chart
-    Returns aggregated view counts by date
+    Returns actual page views per day from the daily view table
     """
-    from django.db.models.functions import TruncDate
     from datetime import timedelta
+    from .view_counter import flush_views
 
     # Get date range (last 30 days by default)
     days = int(request.GET.get('days', 30))
-    end_date = timezone.now()
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=days)
 
-    # Aggregate by publish_date
+    # Include this worker's buffered hits
+    flush_views()
+
     views_data = (
-        BlogPost.objects
-        .filter(publish_date__gte=start_date, publish_date__lte=end_date, is_published=True)
-        .annotate(date=TruncDate('publish_date'))
+        BlogPostDailyView.objects
+        .filter(date__gte=start_date, date__lte=end_date)
         .values('date')
-        .annotate(views=Sum('view_count'))
+        .annotate(views=Sum('views'))
         .order_by('date')
     )
 
@@ -718,63 +757,77 @@ def contacts_by_status(request):
 
 # ==================== AI Features Views ====================
 
-from .ai_service import get_ai_service
-
-
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def solo_chat(request):
+@csrf_exempt
+@require_POST
+async def solo_chat(request):
     """
     Solo AI assistant chat endpoint with streaming support (public)
-    Expects: { "message": "user question", "session_id": "session_id" (optional) }
-    Returns: Streaming text response
+    Expects: { "message": "user question", "session_id": "session_id" (optional),
+               "stream": "sse" (optional) }
+    Returns: Streaming text response, or Server-Sent Events when the client sends
+    `Accept: text/event-stream` or "stream": "sse" (see api/chat_stream.py)
+
+    Async view: under ASGI (lightfield/asgi.py) a stream waiting on Gemini holds no
+    worker thread, so one process can serve many concurrent chats.
     """
-    import time
     from .models import AIConversation, ChatAnalytics
 
+    # Timed from arrival, so time to first token includes any queueing
+    timing = StreamTiming()
+
     try:
         # Parse request body
         data = json.loads(request.body) if request.body else {}
     except json.JSONDecodeError:
-        return Response(
+        return JsonResponse(
             {'error': 'Invalid JSON'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    user_message = data.get('message', '').strip()
+    user_message = str(data.get('message', '')).strip()
+    event_stream = wants_event_stream(request, data)
 
     if not user_message:
-        return Response(
+        return JsonResponse(
             {'error': 'Message is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    # Rate limit by IP and by the client's session, then wait for a chat slot
+    try:
+        await sync_to_async(check_rate_limits)(
+            'solo_chat', ip=client_ip(request), session_id=data.get('session_id')
+        )
+        admission = await aadmit('solo_chat')
+    except AdmissionRejected as e:
+        response = JsonResponse({'error': e.reason}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+
     # Get or create session_id
     session_id = data.get('session_id')
     if not session_id:
         import uuid
         session_id = str(uuid.uuid4())
 
-    # Get or create conversation
-    conversation, created = AIConversation.objects.get_or_create(
-        session_id=session_id,
-        defaults={'messages': []}
-    )
-
-    # Get conversation history (last 10 messages)
-    conversation_history = conversation.messages[-10:] if conversation.messages else []
+    try:
+        # Get or create conversation
+        conversation, created = await AIConversation.objects.aget_or_create(session_id=session_id)
 
-    # Track start time for analytics
-    start_time = time.time()
+        # Recent messages within the token budget, preceded by the rolling summary
+        conversation_history = [] if created else await sync_to_async(build_history)(conversation)
+    except BaseException:
+        admission.release()
+        raise
 
-    def stream_response():
-        """Generator function to stream AI responses and collect for analytics"""
+    async def stream_response():
+        """Async generator to stream AI responses and collect for analytics"""
         full_response = []
         context_used = {}
 
         try:
             ai_service = get_ai_service()
-            stream_generator, context = ai_service.solo_chat_stream(
+            stream_generator, context = await ai_service.solo_chat_stream_async(
                 user_message,
                 conversation_history,
                 inject_context=True
@@ -782,47 +835,87 @@ def solo_chat(request):
 
             context_used = context
 
-            for chunk in stream_generator:
+            if event_stream:
+                yield sse_event('context', {'session_id': session_id, 'context': context_used})
+                chunks = with_heartbeats(stream_generator, heartbeat_interval())
+            else:
+                chunks = stream_generator
+
+            async for chunk in chunks:
+                if chunk is None:
+                    yield HEARTBEAT
+                    continue
+                timing.token()
                 full_response.append(chunk)
-                yield chunk
+                yield sse_event('token', {'text': chunk}) if event_stream else chunk
 
             # After streaming completes, save to conversation and analytics
+            timing.finish()
             final_response = ''.join(full_response)
-            response_time_ms = int((time.time() - start_time) * 1000)
+            metrics = timing.metrics(final_response, context_used.get('usage', {}).get('completion_tokens'))
 
-            # Save messages to conversation
-            conversation.add_message('user', user_message)
-            conversation.add_message('assistant', final_response)
+            # Save the turn to the conversation (one INSERT of two rows)
+            await conversation.aappend_messages([
+                ('user', user_message),
+                ('assistant', final_response),
+            ])
 
             # Save analytics
-            ChatAnalytics.objects.create(
+            await ChatAnalytics.objects.acreate(
                 session_id=session_id,
                 user_message=user_message,
                 ai_response=final_response,
-                response_time_ms=response_time_ms,
-                context_used=context_used
+                response_time_ms=metrics['total_ms'],
+                time_to_first_token_ms=metrics['ttft_ms'],
+                completion_tokens=metrics['completion_tokens'],
+                tokens_per_second=metrics['tokens_per_second'],
+                context_used=context_used,
+                prompt_version=context_used.get('prompt_version', '')
             )
 
+            # Fold turns that no longer fit the history budget into the summary
+            await sync_to_async(schedule_summary_refresh)(conversation, ai_service.summarize_conversation)
+
+            if event_stream:
+                yield sse_event('done', {
+                    'session_id': session_id,
+                    'usage': {'completion_tokens': metrics['completion_tokens']},
+                    'timing': {
+                        'ttft_ms': metrics['ttft_ms'],
+                        'total_ms': metrics['total_ms'],
+                        'tokens_per_second': metrics['tokens_per_second'],
+                    },
+                })
+
         except Exception as e:
+            timing.finish()
             error_msg = f"Error: {str(e)}"
-            yield error_msg
+            if event_stream:
+                yield sse_event('error', {'error': str(e), 'retryable': isinstance(e, LLMUnavailableError)})
+            else:
+                yield error_msg
 
             # Still try to save error to analytics
             try:
-                ChatAnalytics.objects.create(
+                metrics = timing.metrics('')
+                await ChatAnalytics.objects.acreate(
                     session_id=session_id,
                     user_message=user_message,
                     ai_response=error_msg,
-                    response_time_ms=int((time.time() - start_time) * 1000),
-                    context_used=context_used
+                    response_time_ms=metrics['total_ms'],
+                    time_to_first_token_ms=metrics['ttft_ms'],
+                    context_used=context_used,
+                    prompt_version=context_used.get('prompt_version', '')
                 )
-            except:
+            except Exception:
                 pass
+        finally:
+            admission.release()
 
-    # Return streaming response
+    # Return streaming response (the slots are also released if it is never iterated)
     response = StreamingHttpResponse(
-        stream_response(),
-        content_type='text/plain',
+        AdmittedStream(stream_response(), admission),
+        content_type=EVENT_STREAM if event_stream else 'text/plain',
         status=200
     )
     response['Cache-Control'] = 'no-cache'
@@ -834,6 +927,7 @@ def solo_chat(request):
 
 @api_view(['POST'])
 @permission_classes([IsStaffOrSuperUser])
+@admission_control('blog_assistant')
 def blog_ai_assistant(request):
     """
     AI assistant for blog writing (admin only)
@@ -867,6 +961,11 @@ def blog_ai_assistant(request):
             'prompt': prompt
         })
 
+    except LLMUnavailableError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -889,7 +988,9 @@ def generate_ai_overview(request):
     # If slug is provided, fetch the blog post
     if slug:
         try:
-            blog_post = BlogPost.objects.get(slug=slug, is_published=True)
+            blog_post = BlogPost.objects.only(
+                'id', 'title', 'content', 'ai_overview', 'ai_overview_hash'
+            ).get(slug=slug, is_published=True)
             title = blog_post.title
             content = blog_post.content
         except BlogPost.DoesNotExist:
@@ -898,6 +999,13 @@ def generate_ai_overview(request):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        # Serve the stored overview while it still matches the post
+        if overview_is_current(blog_post):
+            return Response({
+                'overview': blog_post.ai_overview,
+                'title': title
+            })
+
     # Validate required fields
     if not title or not content:
         return Response(
@@ -905,25 +1013,50 @@ def generate_ai_overview(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    # Ad-hoc title/content is memoized by input hash so repeated requests are free
+    input_hash = overview_input_hash(title, content)
+    memo_key = f'ai-overview:{input_hash}'
+    if not slug:
+        overview = cache.get(memo_key)
+        if overview:
+            return Response({
+                'overview': overview,
+                'title': title
+            })
+
+    # Only requests that reach the model count against the rate limits and slots
+    try:
+        admission = admit_request(request, 'ai_overview')
+    except AdmissionRejected as e:
+        return rejected_response(e)
+
     try:
         ai_service = get_ai_service()
         overview = ai_service.generate_overview(title, content)
 
-        # If blog post exists, optionally update it
+        # If blog post exists, store it with the hash of its input
         if slug:
-            blog_post.ai_overview = overview
-            blog_post.save(update_fields=['ai_overview'])
+            store_overview(blog_post.id, overview, input_hash)
+        else:
+            cache.set(memo_key, overview, AI_OVERVIEW_MEMO_TIMEOUT)
 
         return Response({
             'overview': overview,
             'title': title
         })
 
+    except LLMUnavailableError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    finally:
+        admission.release()
 
 
 # ==================== Image Upload View ====================
@@ -986,7 +1119,12 @@ def solo_analytics(request):
     # Overall stats
     total_chats = ChatAnalytics.objects.count()
     total_sessions = AIConversation.objects.count()
-    avg_response_time = ChatAnalytics.objects.aggregate(avg_time=Avg('response_time_ms'))['avg_time'] or 0
+    averages = ChatAnalytics.objects.aggregate(
+        avg_time=Avg('response_time_ms'),
+        avg_ttft=Avg('time_to_first_token_ms'),
+        avg_tokens_per_second=Avg('tokens_per_second'),
+    )
+    avg_response_time = averages['avg_time'] or 0
 
     # Get recent data (last 30 days)
     thirty_days_ago = timezone.now() - timedelta(days=30)
@@ -1022,6 +1160,8 @@ def solo_analytics(request):
             'total_chats': total_chats,
             'total_sessions': total_sessions,
             'avg_response_time_ms': round(avg_response_time, 2),
+            'avg_time_to_first_token_ms': round(averages['avg_ttft'] or 0, 2),
+            'avg_tokens_per_second': round(averages['avg_tokens_per_second'] or 0, 2),
             'recent_chats_30d': recent_chats.count(),
             'engagement_rate': round(engagement_rate, 2),
         },
@@ -1053,7 +1193,8 @@ def solo_analytics_trends(request):
         date=TruncDate('created_at')
     ).values('date').annotate(
         count=Count('id'),
-        avg_response_time=Avg('response_time_ms')
+        avg_response_time=Avg('response_time_ms'),
+        avg_ttft=Avg('time_to_first_token_ms'),
     ).order_by('date')
 
     # Format for frontend
@@ -1062,6 +1203,7 @@ def solo_analytics_trends(request):
             'date': item['date'].isoformat(),
             'chats': item['count'],
             'avg_response_time': round(item['avg_response_time'], 2) if item['avg_response_time'] else 0,
+            'avg_time_to_first_token': round(item['avg_ttft'], 2) if item['avg_ttft'] else 0,
         }
         for item in daily_volumes
     ]
@@ -1072,6 +1214,21 @@ def solo_analytics_trends(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsStaffOrSuperUser])
+def llm_client_metrics(request):
+    """
+    LLM client health for this process (admin only)
+    Returns: Circuit breaker state, per-operation call counts and p50/p95 latency,
+    and the admission limiters' in-flight and queued requests
+    """
+    return Response({
+        'breaker': provider_breaker.snapshot(),
+        'operations': llm_metrics.snapshot(),
+        'admission': limiter_snapshots(),
+    })
+
+
 # ==================== Grants & Scholarships Views ====================
 
 @api_view(['GET', 'POST'])
@@ -1115,6 +1272,11 @@ def grants_list_create(request):
         if is_featured:
             queryset = queryset.filter(is_featured=True)
 
+        if wants_cursor_pagination(request):
+            return keyset_paginated_response(
+                request, queryset, serializer_class, ('order_priority', '-created_at', '-id')
+            )
+
         serializer = serializer_class(queryset, many=True)
         return Response(serializer.data)
 
@@ -1170,16 +1332,12 @@ def reorder_grants(request):
     Reorder grants by updating their order_priority
     Expects: { "items": [{"id": 1, "order_priority": 0}, {"id": 2, "order_priority": 1}, ...] }
     """
-    serializer = ReorderSerializer(data=request.data)
-    if serializer.is_valid():
-        for item in serializer.validated_data['items']:
-            Grant.objects.filter(id=item['id']).update(order_priority=item['order_priority'])
-        return Response({'message': 'Grants reordered successfully'})
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return _reorder_response(request, Grant, 'Grants reordered successfully')
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response(Grant)
 def featured_grants(request):
     """
     Get featured grants for homepage display (public)
@@ -1196,6 +1354,7 @@ def featured_grants(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response(Grant)
 def open_grants(request):
     """
     Get currently open grants (public)
@@ -1289,6 +1448,7 @@ def consultation_service_detail(request, slug):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response(ConsultationService)
 def featured_consultation_services(request):
     """
     Get featured consultation services for homepage
@@ -1306,14 +1466,7 @@ def reorder_consultation_services(request):
     """
     Reorder consultation services (admin only)
     """
-    serializer = ReorderSerializer(data=request.data)
-    if serializer.is_valid():
-        for item in serializer.validated_data['items']:
-            ConsultationService.objects.filter(id=item['id']).update(
-                order_priority=item['order_priority']
-            )
-        return Response({'message': 'Services reordered successfully'})
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return _reorder_response(request, ConsultationService, 'Services reordered successfully')
 
 
 # ==================== Consultation Booking Views ====================
@@ -1557,6 +1710,11 @@ def admin_bookings_list(request):
     if service_id:
         queryset = queryset.filter(service_id=service_id)
 
+    if wants_cursor_pagination(request):
+        return keyset_paginated_response(
+            request, queryset, BookingAdminListSerializer, ('-created_at', '-id')
+        )
+
     serializer = BookingAdminListSerializer(queryset, many=True)
     return Response(serializer.data)
 
@@ -2,6 +2,8 @@
 ASGI config for lightfield project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. `uvicorn lightfield.asgi:application`) so the
+async Solo chat view can stream many conversations from one process.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +16,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lightfield.settings')
 
 application = get_asgi_application()
+
+# Build Solo's retrieval index before the first chat needs it
+from api.retrieval_index import warm_retrieval_index  # noqa: E402
+
+warm_retrieval_index()
+
+app = application
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party apps
     'rest_framework',
@@ -82,6 +83,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'lightfield.wsgi.application'
+ASGI_APPLICATION = 'lightfield.asgi.application'
 
 
 # Database
@@ -104,6 +106,41 @@ if db_config:
     DATABASES['default'] = cast(dict[str, Any], dict(db_config))
 
 
+# Cache
+# CACHE_BACKEND selects the backend: 'locmem' (default), 'file' or 'redis'.
+# CACHE_LOCATION is the file directory or Redis URL (redis://host:6379/0).
+# The redis backend needs the `redis` package installed.
+# locmem is private to each worker process, so cache purges, view buffers and
+# rate limit buckets are per worker; use redis in multi-worker production.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'lightfield'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/0'),
+}
+
+_cache_backend, _cache_location = _CACHE_BACKENDS[CACHE_BACKEND]
+
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.getenv('CACHE_LOCATION') or _cache_location,
+        'TIMEOUT': 300,
+    }
+}
+
+# Public read endpoints cache their responses for this long (seconds);
+# model signals purge entries as soon as the underlying data changes
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+# Admin dashboard counters are served from a snapshot at most this old before a
+# background refresh (seconds)
+DASHBOARD_STATS_TTL = int(os.getenv('DASHBOARD_STATS_TTL', '30'))
+DASHBOARD_STATS_ASYNC = os.getenv('DASHBOARD_STATS_ASYNC', 'True') == 'True'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -208,6 +245,61 @@ DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
+# LLM client resilience (see api/llm_client.py)
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv('LLM_BREAKER_FAILURE_THRESHOLD', '5'))
+LLM_BREAKER_RESET_TIMEOUT = float(os.getenv('LLM_BREAKER_RESET_TIMEOUT', '30'))
+LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', '0.5'))
+LLM_RETRY_MAX_DELAY = float(os.getenv('LLM_RETRY_MAX_DELAY', '4'))
+
+# Admission control for AI endpoints (see api/admission.py)
+AI_UPSTREAM_CONCURRENCY = int(os.getenv('AI_UPSTREAM_CONCURRENCY', '10'))
+AI_CONCURRENCY = {
+    'solo_chat': int(os.getenv('AI_SOLO_CHAT_CONCURRENCY', '8')),
+    'blog_assistant': int(os.getenv('AI_BLOG_ASSISTANT_CONCURRENCY', '4')),
+    'ai_overview': int(os.getenv('AI_OVERVIEW_CONCURRENCY', '2')),
+}
+AI_QUEUE_SIZE = int(os.getenv('AI_QUEUE_SIZE', '16'))
+AI_QUEUE_TIMEOUT = float(os.getenv('AI_QUEUE_TIMEOUT', '5'))
+# Proxies in front of the app that append to X-Forwarded-For (1 on Vercel); the
+# client IP used for rate limits is the entry the outermost trusted proxy added
+AI_TRUSTED_PROXIES = int(os.getenv('AI_TRUSTED_PROXIES', '1'))
+
+# Solo semantic retrieval (vectors are built by `manage.py embed_documents`)
+SOLO_EMBEDDER = os.getenv('SOLO_EMBEDDER', 'api.embeddings.HashingEmbedder')
+SOLO_SEMANTIC_RETRIEVAL = os.getenv('SOLO_SEMANTIC_RETRIEVAL', 'True') == 'True'
+# Cosine similarity below which semantic hits are ignored (raise it for dense embedders like Gemini)
+SOLO_SEMANTIC_MIN_SCORE = float(os.getenv('SOLO_SEMANTIC_MIN_SCORE', '0.2'))
+# Seconds between checks for vectors written by `embed_documents` in another process
+SOLO_EMBEDDINGS_RECHECK = int(os.getenv('SOLO_EMBEDDINGS_RECHECK', '60'))
+# Seconds Solo waits for context before answering without it
+SOLO_RETRIEVAL_TIMEOUT = float(os.getenv('SOLO_RETRIEVAL_TIMEOUT', '1.5'))
+
+# Solo conversation history sent with each turn (older turns fold into a rolling summary)
+SOLO_HISTORY_TOKEN_BUDGET = int(os.getenv('SOLO_HISTORY_TOKEN_BUDGET', '1500'))
+SOLO_SUMMARY_ASYNC = os.getenv('SOLO_SUMMARY_ASYNC', 'True') == 'True'
+
+# Keep-alive comment interval for Solo chats streamed as Server-Sent Events
+SOLO_SSE_HEARTBEAT_SECONDS = float(os.getenv('SOLO_SSE_HEARTBEAT_SECONDS', '15'))
+
+# Solo answer cache for repeated first-turn questions
+SOLO_ANSWER_CACHE_ENABLED = os.getenv('SOLO_ANSWER_CACHE_ENABLED', 'True') == 'True'
+SOLO_ANSWER_CACHE_TTL = int(os.getenv('SOLO_ANSWER_CACHE_TTL', str(60 * 60 * 6)))
+
+# AI overview jobs (generated in the background after blog writes)
+AI_OVERVIEW_ASYNC = os.getenv('AI_OVERVIEW_ASYNC', 'True') == 'True'
+AI_OVERVIEW_WORKERS = int(os.getenv('AI_OVERVIEW_WORKERS', '2'))
+AI_OVERVIEW_MAX_ATTEMPTS = int(os.getenv('AI_OVERVIEW_MAX_ATTEMPTS', '3'))
+AI_OVERVIEW_RETRY_DELAY = float(os.getenv('AI_OVERVIEW_RETRY_DELAY', '2'))
+
+# Related posts are recomputed in the background after blog edits
+RELATED_POSTS_ASYNC = os.getenv('RELATED_POSTS_ASYNC', 'True') == 'True'
+
+# Blog view counter. Hits are buffered in the cache and flushed in batches, which
+# needs a cache shared by all workers; with locmem every view is written through.
+BLOG_VIEW_BUFFERED = os.getenv('BLOG_VIEW_BUFFERED', str(CACHE_BACKEND != 'locmem')) == 'True'
+BLOG_VIEW_FLUSH_THRESHOLD = int(os.getenv('BLOG_VIEW_FLUSH_THRESHOLD', '50'))
+BLOG_VIEW_FLUSH_INTERVAL = int(os.getenv('BLOG_VIEW_FLUSH_INTERVAL', '30'))
+
 # Paystack Configuration
 PAYSTACK_SECRET_KEY = os.getenv('PAYSTACK_SECRET_KEY', '')
 PAYSTACK_PUBLIC_KEY = os.getenv('PAYSTACK_PUBLIC_KEY', '')
@@ -3,10 +3,17 @@ WSGI config for lightfield project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+Streaming requires ASGI. The Solo chat view streams from an async generator;
+under WSGI (including `manage.py runserver`) Django has to consume the whole
+stream before sending it, so chats arrive in one piece, with no heartbeats
+and no time-to-first-token benefit. Serve lightfield.asgi in production
+(vercel.json routes to it; locally `uvicorn lightfield.asgi:application`).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
+import logging
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -15,4 +22,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lightfield.settings')
 
 application = get_wsgi_application()
 
+logging.getLogger(__name__).warning(
+    'Serving under WSGI: Solo chat responses are buffered instead of streamed; use lightfield.asgi'
+)
+
+# Build Solo's retrieval index before the first chat needs it
+from api.retrieval_index import warm_retrieval_index  # noqa: E402
+
+warm_retrieval_index()
+
 app = application